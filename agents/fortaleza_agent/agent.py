@@ -26,6 +26,7 @@ from src.core.errors import (
 )
 from src.core.logging import get_logger
 from src.core.notify import send_notification
+from src.core.secrets import PURCHASE_SECRET_NAMES, get_secret_manager
 from src.tools.navigate import navigate_to_product
 from src.tools.login import login_to_account
 from src.tools.cart import add_to_cart
@@ -170,9 +171,10 @@ def create_adk_tools(product_name: str = "", event_id: str = "", effective_mode:
                 direct_link=url,
                 product_name=product_name,
             )
-            # Close old page before assigning new one to prevent memory leak
+            # Return old page to the pool before assigning the new one (the next
+            # navigation reuses it instead of creating a page)
             if browser.page:
-                await browser.page.close()
+                await browser.release_page(browser.page)
             browser.page = result["page"]
             return {
                 "status": result["status"],
@@ -544,6 +546,12 @@ async def run_purchase_agent(
         f"Mode: {effective_mode.value}\nProduct: {product_name}\nEvent: {event_id}"
     )
 
+    # Warm the secret cache while the browser starts, so the login, age gate and
+    # checkout tools read their credentials from memory
+    prefetch = asyncio.create_task(
+        asyncio.to_thread(get_secret_manager().prefetch, PURCHASE_SECRET_NAMES)
+    )
+
     try:
         async with managed_browser():
             # Create tools with product_name for search fallback, event_id for approval,
@@ -593,6 +601,8 @@ Important:
 
 Begin the purchase process now."""
 
+            await prefetch
+
             logger.info("Sending prompt to agent")
 
             # Run agent with debug mode (creates session automatically)
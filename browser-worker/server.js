@@ -2,6 +2,7 @@ const express = require('express');
 const { chromium } = require('playwright');
 const rateLimit = require('express-rate-limit');
 const fs = require('fs');
+const path = require('path');
 
 // Environment
 const PORT = process.env.PORT || 3001;
@@ -9,6 +10,11 @@ const HEADLESS = process.env.HEADLESS !== 'false';
 const CHROME_PATH = process.env.CHROME_PATH || process.env.PLAYWRIGHT_CHROMIUM_PATH;
 const WORKER_AUTH_TOKEN = process.env.WORKER_AUTH_TOKEN;
 const NODE_ENV = process.env.NODE_ENV || 'development';
+// Cookies/local storage persisted between runs, so a still-valid session skips login
+const STORAGE_STATE_PATH = process.env.STORAGE_STATE_PATH;
+// Shopify sets this cookie only for a logged-in customer (_secure_session_id is set for every visitor)
+const CUSTOMER_SESSION_COOKIE = '_secure_customer_sig';
+const SESSION_COOKIE_MIN_TTL_SECONDS = 60;
 
 // Validate CHROME_PATH if set
 if (CHROME_PATH) {
@@ -74,12 +80,145 @@ const SHORT_TIMEOUT = 1000;
 const MEDIUM_TIMEOUT = 2000;
 const AGE_VERIFICATION_TIMEOUT = 5000;
 const CART_DRAWER_TIMEOUT = 5000;
-const ORDER_SUBMISSION_DELAY = 5000;
+const SEARCH_PAGE_TIMEOUT = 10000;  // Max wait for the search results page after pressing Enter
+const CHECKOUT_NAVIGATION_TIMEOUT = 10000;  // Max wait for the checkout page after clicking CHECKOUT
+const LOGIN_SUBMIT_TIMEOUT = 20000;  // Max wait for the login result (B&B takes ~14s server-side)
+const ORDER_SUBMISSION_TIMEOUT = 10000;  // Max wait for 3DS / payment error / confirmation after Pay now
 const TRACKING_REDIRECT_WAIT_MS = 5000;
+const LOGIN_RESULT_CHECK_TIMEOUT = 500;  // 2FA/error checks, after the login outcome wait already waited for them
 const AGE_GATE_HIDE_TIMEOUT = 10000;
-const CARD_FIELD_INITIAL_DELAY = 200;
-const CARD_FIELD_TRANSITION_DELAY = 500;
-const TYPING_DELAY = 30;
+const CARD_FIELD_FOCUS_TIMEOUT = 3000;  // Max wait for focus to land in the next card field
+const CARD_FIELD_PROBE_TIMEOUT = 1000;  // Remaining card fields render with the card number field
+const PAYMENT_SECTION_SELECTOR =
+  "[data-testid*='payment' i], section[aria-labelledby*='payment' i], section[aria-label*='payment' i], #payment-section";
+// Shopify PCI card field iframes (number, expiry, CVV, name), filled directly when found
+const CARD_FIELD_IFRAME_SELECTORS = [
+  "iframe[title*='Field container for: Card number' i], iframe[name*='number' i]",
+  "iframe[title*='Field container for: Expiration date' i], iframe[name*='card-fields-expiry' i]",
+  "iframe[title*='Field container for: Security code' i], iframe[name*='card-fields-verification_value' i]",
+  "iframe[title*='Field container for: Name on card' i], iframe[name*='card-fields-name' i]",
+];
+// HUMANIZE_TYPING=true types card details key by key (for keystroke-timing checks)
+// instead of filling each field in one call
+const HUMANIZE_TYPING = process.env.HUMANIZE_TYPING === 'true';
+const TYPING_DELAY = HUMANIZE_TYPING ? 30 : 0;
+const CONFIRMATION_URL_PATTERN = /thank|confirmation|order/i;  // Order placed page
+// Text indicating which pickup location is selected (regex sources, most specific first)
+const PICKUP_TEXT_PATTERNS = [
+  'South San Francisco.*240 Grand',
+  'San Francisco.*Fell Street',
+  'South San Francisco',
+  '1275 Fell Street',
+  '240 Grand Ave',
+];
+// Analytics/tracking requests, web fonts and media, aborted at the context level (same list as
+// the Python agent's blocked_request_domains default)
+const BLOCKED_REQUEST_PATTERN = new RegExp(
+  [
+    'google-analytics\\.com',
+    'googletagmanager\\.com',
+    'doubleclick\\.net',
+    'facebook\\.net',
+    'facebook\\.com/tr',
+    'klaviyo\\.com',
+    'hotjar\\.com',
+    'intercom\\.io',
+    'fullstory\\.com',
+    'segment\\.io',
+    'segment\\.com',
+    'monorail-edge\\.shopifysvc\\.com',
+    '\\.(?:woff2?|ttf|otf)(?:[?#]|$)',
+    // Raster images and media (SVG is kept: icon buttons may be <img src="*.svg">)
+    '\\.(?:png|jpe?g|gif|webp|avif|ico|mp4|webm|mp3)(?:[?#]|$)',
+  ].join('|'),
+  'i',
+);
+
+// Search icon variants and the search box it reveals (same as src/tools/navigate.py)
+const SEARCH_BUTTON_SELECTORS = [
+  'svg.icon-search',
+  '.icon-search',
+  '[data-search-toggle]',
+  "button:has(svg[class*='search'])",
+  "a:has(svg[class*='search'])",
+  '.header__search',
+  "[aria-label='Search']",
+  "button[aria-label='Search']",
+];
+const SEARCH_INPUT_SELECTOR = "input[type='search'], input[name='q'], .search__input, input[placeholder*='Search' i]";
+
+// Login form selectors (same lists as src/tools/login.py), built once at startup
+// CAPTCHA variants pre-joined into one selector so the check is a single query
+const CAPTCHA_SELECTOR = [
+  "iframe[src*='recaptcha']",
+  '.g-recaptcha',
+  '#g-recaptcha',
+  "iframe[src*='hcaptcha']",
+  '.h-captcha',
+  '#h-captcha',
+  '.captcha',
+  '#captcha',
+  "img[alt*='captcha' i]",
+  "img[src*='captcha' i]",
+].join(', ');
+const EMAIL_SELECTORS = [
+  "input[name='customer[email]']",
+  "input[type='email']",
+  "input[id*='email' i]",
+  "input[placeholder*='email' i]",
+];
+const PASSWORD_SELECTORS = [
+  "input[name='customer[password]']",
+  "input[type='password']",
+  "input[id*='password' i]",
+  "input[placeholder*='password' i]",
+];
+const LOGIN_SUBMIT_SELECTORS = [
+  "button[type='submit']",
+  "input[type='submit']",
+  "button:has-text('Sign In')",
+  "button:has-text('Log In')",
+  "button:has-text('Login')",
+  '.login-button',
+  "[data-action='login']",
+];
+const TWO_FACTOR_SELECTORS = [
+  "input[name*='code' i]",
+  "input[placeholder*='code' i]",
+  'text=/verification code|authenticator|two.factor/i',  // One text scan for all phrases
+  '.two-factor-form',
+  '[data-2fa]',
+];
+// Login error messages: message elements, and page text lines matching the phrases
+const LOGIN_ERROR_ARG = {
+  selector: ".error-message, .alert-error, .form-error, [role='alert']",
+  pattern: 'incorrect password|invalid email|login failed',
+};
+
+// Recorded just before submitting: error elements and phrases already on the login page
+// (e.g. a generic alert region or a previous attempt's message) are not new errors
+function markLoginErrors({ selector, pattern }) {
+  document.querySelectorAll(selector).forEach((el) => {
+    if (el.getClientRects().length > 0) el.dataset.preSubmitText = (el.innerText || '').trim();
+  });
+  const re = new RegExp(pattern, 'i');
+  const text = document.body ? document.body.innerText || '' : '';
+  window.__preSubmitLines = text.split('\n').filter((line) => re.test(line));
+}
+
+// Text of the first login error that appeared or changed since markLoginErrors ran, or
+// null (a new document after navigation has no baseline). Runs in the page
+function newLoginError({ selector, pattern }) {
+  const el = Array.from(document.querySelectorAll(selector)).find((e) => {
+    const text = (e.innerText || '').trim();
+    return text && e.getClientRects().length > 0 && e.dataset.preSubmitText !== text;
+  });
+  if (el) return el.innerText.trim();
+  const re = new RegExp(pattern, 'i');
+  const baseline = new Set(window.__preSubmitLines || []);
+  const text = document.body ? document.body.innerText || '' : '';
+  return text.split('\n').find((line) => re.test(line) && !baseline.has(line)) || null;
+}
 
 let browser;
 let context;
@@ -144,11 +283,17 @@ async function ensurePage() {
 
   browser = await chromium.launch(launchOptions);
 
+  const storageState = STORAGE_STATE_PATH && fs.existsSync(STORAGE_STATE_PATH) ? STORAGE_STATE_PATH : undefined;
   context = await browser.newContext({
     viewport: { width: 1280, height: 720 },
     userAgent:
       'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    storageState,
   });
+  if (storageState) console.log(`DEBUG: Restored browser storage state from ${storageState}`);
+
+  // Only matching requests are intercepted; everything else goes straight to the network
+  await context.route(BLOCKED_REQUEST_PATTERN, (route) => route.abort());
 
   context.setDefaultTimeout(DEFAULT_TIMEOUT);
   context.setDefaultNavigationTimeout(NAVIGATION_TIMEOUT);
@@ -157,6 +302,22 @@ async function ensurePage() {
   return page;
 }
 
+async function saveStorageState() {
+  if (!STORAGE_STATE_PATH || !context) return;
+  try {
+    const state = await context.storageState();
+    // Contains session cookies: the file is owner-only from creation, and the rename
+    // means readers never see a partly written file
+    const tmpPath = `${STORAGE_STATE_PATH}.tmp`;
+    fs.mkdirSync(path.dirname(STORAGE_STATE_PATH), { recursive: true });
+    fs.rmSync(tmpPath, { force: true });  // A leftover temp file would keep its old mode
+    fs.writeFileSync(tmpPath, JSON.stringify(state), { mode: 0o600 });
+    fs.renameSync(tmpPath, STORAGE_STATE_PATH);
+  } catch (e) {
+    console.log(`DEBUG: Could not save browser storage state: ${e.message}`);
+  }
+}
+
 async function resetBrowser() {
   if (browser) {
     await browser.close();
@@ -166,16 +327,48 @@ async function resetBrowser() {
   page = null;
 }
 
+// Logged-in customer session cookie present and not about to expire. Session cookies
+// (expires is -1) may have been restored from storage state saved days ago and revoked
+// since, so they are left to the /account/login redirect check to confirm
+async function hasSessionCookie() {
+  const minExpiry = Date.now() / 1000 + SESSION_COOKIE_MIN_TTL_SECONDS;
+  const cookies = await context.cookies('https://www.bittersandbottles.com');
+  return cookies.some((cookie) => cookie.name === CUSTOMER_SESSION_COOKIE && cookie.expires > minExpiry);
+}
+
+// Logged-in account page (not the account login form)
+function isAccountUrl(url) {
+  const lower = url.toLowerCase();
+  return lower.includes('/account') && !lower.includes('/login');
+}
+
 function jsonError(res, statusCode, message, errorType = 'BrowserWorkerError') {
   res.status(statusCode).json({ status: 'error', message, error_type: errorType });
 }
 
+// Race a fallback selector list under one timeout, then return the highest-priority
+// selector that matched (a plain union would return the first match in document order)
+async function waitForFirst(currentPage, selectors, timeout) {
+  const visible = (selector) => currentPage.locator(`${selector} >> visible=true`).first();
+  try {
+    await selectors.map(visible).reduce((a, b) => a.or(b)).first().waitFor({ timeout });
+  } catch (_) {
+    return null;
+  }
+  for (const selector of selectors) {
+    const locator = visible(selector);
+    if (await locator.count()) return { selector, locator };
+  }
+  return null;
+}
+
 async function verifyProductPage(currentPage) {
   const url = currentPage.url();
   if (url.includes('/products/') && !url.includes('/search') && !url.includes('/collections')) {
-    const hasPrice = !!(await currentPage.$('.price, [data-price], .product-price'));
-    const hasAddToCart = !!(await currentPage.$("button[name='add'], .add-to-cart, [data-add-to-cart]"));
-    if (hasPrice || hasAddToCart) return true;
+    // Price or add-to-cart indicators, one query for both
+    if (await currentPage.$(".price, [data-price], .product-price, button[name='add'], .add-to-cart, [data-add-to-cart]")) {
+      return true;
+    }
   }
   return false;
 }
@@ -189,23 +382,13 @@ async function handleAgeVerification(currentPage, dob) {
     '.modal-age-verification',
   ];
 
-  let overlay;
-  let matched;
-  for (const selector of overlaySelectors) {
-    try {
-      overlay = await currentPage.waitForSelector(selector, { timeout: AGE_VERIFICATION_TIMEOUT });
-      if (overlay) {
-        matched = selector;
-        break;
-      }
-    } catch (_) {
-      // continue
-    }
-  }
-
-  if (!overlay) {
+  // All overlay variants share one timeout (a page without an age gate used to wait
+  // the full timeout once per selector)
+  const overlayMatch = await waitForFirst(currentPage, overlaySelectors, AGE_VERIFICATION_TIMEOUT);
+  if (!overlayMatch) {
     return { status: 'not_found', message: 'No age verification required' };
   }
+  const matched = overlayMatch.selector;
 
   // Simple confirmation buttons
   const buttons = [
@@ -220,16 +403,14 @@ async function handleAgeVerification(currentPage, dob) {
     '[data-age-yes]',
   ];
 
-  for (const selector of buttons) {
+  const buttonMatch = await waitForFirst(currentPage, buttons, MEDIUM_TIMEOUT);
+  if (buttonMatch) {
     try {
-      const button = await currentPage.waitForSelector(selector, { timeout: MEDIUM_TIMEOUT });
-      if (button) {
-        await button.click();
-        await currentPage.waitForSelector(matched, { state: 'hidden', timeout: AGE_GATE_HIDE_TIMEOUT });
-        return { status: 'success', message: 'Age verification completed (button)' };
-      }
+      await buttonMatch.locator.click();
+      await currentPage.waitForSelector(matched, { state: 'hidden', timeout: AGE_GATE_HIDE_TIMEOUT });
+      return { status: 'success', message: 'Age verification completed (button)' };
     } catch (_) {
-      // continue
+      // Gate still showing: fall back to date entry
     }
   }
 
@@ -276,16 +457,14 @@ async function handleAgeVerification(currentPage, dob) {
     '[data-age-submit]',
   ];
 
-  for (const selector of submitSelectors) {
+  const submitMatch = await waitForFirst(currentPage, submitSelectors, MEDIUM_TIMEOUT);
+  if (submitMatch) {
     try {
-      const submit = await currentPage.waitForSelector(selector, { timeout: MEDIUM_TIMEOUT });
-      if (submit) {
-        await submit.click();
-        await currentPage.waitForSelector(matched, { state: 'hidden', timeout: AGE_GATE_HIDE_TIMEOUT });
-        return { status: 'success', message: 'Age verification completed' };
-      }
+      await submitMatch.locator.click();
+      await currentPage.waitForSelector(matched, { state: 'hidden', timeout: AGE_GATE_HIDE_TIMEOUT });
+      return { status: 'success', message: 'Age verification completed' };
     } catch (_) {
-      // continue
+      // Gate did not close
     }
   }
 
@@ -313,39 +492,22 @@ async function fillField(currentPage, selectors, value) {
 }
 
 async function searchForProduct(currentPage, productName, dob) {
-  await currentPage.goto('https://www.bittersandbottles.com', { waitUntil: 'domcontentloaded' });
+  // Reuse the current page if it is already a store page with the search icon (e.g. the
+  // failed direct link served the site's 404 page); otherwise load the homepage
+  const onStore = new URL(currentPage.url()).hostname === 'www.bittersandbottles.com';
+  if (onStore) await currentPage.waitForLoadState('domcontentloaded');  // Direct link may still be parsing
+  if (!onStore || !(await currentPage.$(SEARCH_BUTTON_SELECTORS.join(', ')))) {
+    await currentPage.goto('https://www.bittersandbottles.com', { waitUntil: 'domcontentloaded' });
+  }
   const ageResult = await handleAgeVerification(currentPage, dob);
   if (ageResult.status === 'error') return ageResult;
 
-  const searchSelectors = [
-    'svg.icon-search',
-    '.icon-search',
-    '[data-search-toggle]',
-    "button:has(svg[class*='search'])",
-    "a:has(svg[class*='search'])",
-    '.header__search',
-    "[aria-label='Search']",
-    "button[aria-label='Search']",
-  ];
+  const searchMatch = await waitForFirst(currentPage, SEARCH_BUTTON_SELECTORS, MEDIUM_TIMEOUT);
+  if (!searchMatch) return { status: 'error', message: 'Could not find search button/icon' };
 
-  let searchButton;
-  for (const selector of searchSelectors) {
-    try {
-      searchButton = await currentPage.waitForSelector(selector, { timeout: MEDIUM_TIMEOUT });
-      if (searchButton) break;
-    } catch (_) {
-      // continue
-    }
-  }
-  if (!searchButton) return { status: 'error', message: 'Could not find search button/icon' };
-
-  await searchButton.click();
-  const searchInput = await currentPage.waitForSelector(
-    "input[type='search'], input[name='q'], .search__input, input[placeholder*='Search' i]",
-    { timeout: 5000 },
-  );
+  await searchMatch.locator.click();
+  const searchInput = await currentPage.waitForSelector(SEARCH_INPUT_SELECTOR, { timeout: 5000 });
   await searchInput.fill(productName);
-  await currentPage.waitForTimeout(1000);
 
   const slug = productName.toLowerCase().replace(/\s+/g, '-');
   const suggestionSelectors = [
@@ -354,16 +516,16 @@ async function searchForProduct(currentPage, productName, dob) {
     `a[href*='products/${slug}']`,
   ];
 
-  let productLink;
-  for (const selector of suggestionSelectors) {
-    productLink = await currentPage.$(selector);
-    if (productLink) break;
-  }
+  // Returns as soon as the dropdown shows the product instead of sleeping first
+  const suggestionMatch = await waitForFirst(currentPage, suggestionSelectors, SHORT_TIMEOUT);
+  let productLink = suggestionMatch ? suggestionMatch.locator : null;
 
   if (!productLink) {
     await searchInput.press('Enter');
-    await currentPage.waitForLoadState('domcontentloaded');
-    await currentPage.waitForTimeout(MEDIUM_TIMEOUT);
+    // Wait for the results page itself (the homepage's load state is already reached)
+    await currentPage
+      .waitForURL('**/search**', { waitUntil: 'domcontentloaded', timeout: SEARCH_PAGE_TIMEOUT })
+      .catch(() => console.log(`DEBUG: Search results page did not load (${currentPage.url()})`));
 
     // Split product name into parts for scoring
     const nameParts = slug.split('-');
@@ -374,29 +536,27 @@ async function searchForProduct(currentPage, productName, dob) {
       `a[href*='${slug}'][href*='products']`,
       `.productitem a[href*='${slug}']`,
     ];
-    for (const selector of exactSelectors) {
-      try {
-        productLink = await currentPage.$(selector);
-        if (productLink) {
-          const href = await productLink.getAttribute('href');
-          console.log(`DEBUG: Found exact product match: ${href}`);
-          break;
-        }
-      } catch (_) {
-        // continue
-      }
+    // Waiting for an exact match also gives the results time to render
+    // before falling back to scoring every product link
+    const exactMatch = await waitForFirst(currentPage, exactSelectors, MEDIUM_TIMEOUT);
+    if (exactMatch) {
+      productLink = exactMatch.locator;
+      const href = await productLink.getAttribute('href');
+      console.log(`DEBUG: Found exact product match: ${href}`);
     }
 
     // If no exact match, score all product links to find best match
     if (!productLink) {
       console.log(`DEBUG: No exact match found, scoring all product links. Name parts: ${nameParts.join(', ')}`);
       try {
-        const allProductLinks = await currentPage.$$("a[href*='products']");
+        // Every product link's href in one round-trip instead of one getAttribute per link
+        const productLinks = currentPage.locator("a[href*='products']");
+        const hrefs = await productLinks.evaluateAll((links) => links.map((link) => link.getAttribute('href')));
         let bestLink = null;
+        let bestHref = null;
         let bestScore = 0;
 
-        for (const link of allProductLinks) {
-          const href = await link.getAttribute('href');
+        for (const [index, href] of hrefs.entries()) {
           if (!href || href.includes('/search') || href.includes('/collections')) {
             continue;
           }
@@ -409,7 +569,8 @@ async function searchForProduct(currentPage, productName, dob) {
 
           if (score > bestScore) {
             bestScore = score;
-            bestLink = link;
+            bestLink = productLinks.nth(index);
+            bestHref = href;
           }
         }
 
@@ -418,8 +579,7 @@ async function searchForProduct(currentPage, productName, dob) {
 
         if (bestLink && bestScore >= minThreshold) {
           productLink = bestLink;
-          const href = await productLink.getAttribute('href');
-          console.log(`DEBUG: Found best matching product: ${href} (score: ${bestScore}/${nameParts.length}, threshold: ${minThreshold})`);
+          console.log(`DEBUG: Found best matching product: ${bestHref} (score: ${bestScore}/${nameParts.length}, threshold: ${minThreshold})`);
         } else {
           console.log(`DEBUG: No good product match found (best score: ${bestScore}, threshold: ${minThreshold})`);
         }
@@ -483,18 +643,27 @@ app.post('/navigate', async (req, res) => {
     const currentPage = await ensurePage();
 
     if (directLink) {
-      const response = await currentPage.goto(directLink, { waitUntil: 'domcontentloaded' });
+      // Returns once the response commits: the 404 and tracking checks only need the status
+      // and URL, so a bad link fails over without waiting for its DOM to parse
+      const response = await currentPage.goto(directLink, { waitUntil: 'commit' });
+      if (response && response.status() === 404) {
+        return jsonError(res, 404, `Page not found: ${directLink}`, 'PageNotFound');
+      }
+
       if (currentPage.url().includes('trk.')) {
-        await currentPage.waitForTimeout(TRACKING_REDIRECT_WAIT_MS);
-        if (currentPage.url().includes('trk.')) {
+        // Returns as soon as the redirect lands instead of sleeping the full wait
+        try {
+          await currentPage.waitForURL((url) => !url.href.includes('trk.'), {
+            waitUntil: 'domcontentloaded',
+            timeout: TRACKING_REDIRECT_WAIT_MS,
+          });
+        } catch (_) {
           return jsonError(res, 400, `Tracking redirect failed: ${currentPage.url()}`, 'ProtocolError');
         }
       }
 
-      if (response && response.status() === 404) {
-        return jsonError(res, 404, `Page not found: ${directLink}`, 'PageNotFound');
-      }
-
+      // Product checks need the parsed page (resolves at once if already there)
+      await currentPage.waitForLoadState('domcontentloaded');
       const isProduct = await verifyProductPage(currentPage);
       if (isProduct) {
         return res.json({ status: 'success', method: 'direct_link', current_url: currentPage.url() });
@@ -532,123 +701,72 @@ app.post('/login', async (req, res) => {
 
   try {
     const currentPage = await ensurePage();
-    if (currentPage.url().toLowerCase().includes('/account') && !currentPage.url().toLowerCase().includes('/login')) {
+    if (isAccountUrl(currentPage.url()) || (await hasSessionCookie())) {
       return res.json({ status: 'success', message: 'Already logged in', current_url: currentPage.url() });
     }
 
     await currentPage.goto('https://www.bittersandbottles.com/account/login', {
       waitUntil: 'domcontentloaded',
     });
+    // A session restored from saved storage state redirects straight to the account page
+    if (isAccountUrl(currentPage.url())) {
+      return res.json({ status: 'success', message: 'Already logged in', current_url: currentPage.url() });
+    }
 
     const ageResult = await handleAgeVerification(currentPage, dob);
     if (ageResult.status === 'error') return jsonError(res, 400, ageResult.message);
 
-    const captchaSelectors = [
-      "iframe[src*='recaptcha']",
-      '.g-recaptcha',
-      '#g-recaptcha',
-      "iframe[src*='hcaptcha']",
-      '.h-captcha',
-      '#h-captcha',
-      '.captcha',
-      '#captcha',
-      "img[alt*='captcha' i]",
-      "img[src*='captcha' i]",
-    ];
-    for (const selector of captchaSelectors) {
-      const el = await currentPage.$(selector);
-      if (el) return jsonError(res, 400, 'CAPTCHA detected', 'CaptchaRequired');
+    if (await currentPage.$(CAPTCHA_SELECTOR)) {
+      return jsonError(res, 400, 'CAPTCHA detected', 'CaptchaRequired');
     }
 
-    const emailSelectors = [
-      "input[name='customer[email]']",
-      "input[type='email']",
-      "input[id*='email' i]",
-      "input[placeholder*='email' i]",
-    ];
-    let emailInput;
-    for (const selector of emailSelectors) {
-      try {
-        emailInput = await currentPage.waitForSelector(selector, { timeout: SELECTOR_TIMEOUT });
-        if (emailInput) break;
-      } catch (_) {}
-    }
-    if (!emailInput) return jsonError(res, 400, 'Email field not found');
-    await emailInput.fill(email);
-
-    const passwordSelectors = [
-      "input[name='customer[password]']",
-      "input[type='password']",
-      "input[id*='password' i]",
-      "input[placeholder*='password' i]",
-    ];
-    let passwordInput;
-    for (const selector of passwordSelectors) {
-      try {
-        passwordInput = await currentPage.waitForSelector(selector, { timeout: SELECTOR_TIMEOUT });
-        if (passwordInput) break;
-      } catch (_) {}
-    }
-    if (!passwordInput) return jsonError(res, 400, 'Password field not found');
-    await passwordInput.fill(password);
-
-    const submitSelectors = [
-      "button[type='submit']",
-      "input[type='submit']",
-      "button:has-text('Sign In')",
-      "button:has-text('Log In')",
-      "button:has-text('Login')",
-      '.login-button',
-      "[data-action='login']",
-    ];
-    let submitButton;
-    for (const selector of submitSelectors) {
-      try {
-        submitButton = await currentPage.waitForSelector(selector, { timeout: SELECTOR_TIMEOUT });
-        if (submitButton) break;
-      } catch (_) {}
-    }
-    if (!submitButton) return jsonError(res, 400, 'Submit button not found');
-
-    await submitButton.click();
-    await currentPage.waitForLoadState('domcontentloaded');
-
-    const twoFaSelectors = [
-      "input[name*='code' i]",
-      "input[placeholder*='code' i]",
-      'text=/verification code/i',
-      'text=/authenticator/i',
-      'text=/two.factor/i',
-      '.two-factor-form',
-      '[data-2fa]',
-    ];
-    for (const selector of twoFaSelectors) {
-      try {
-        const el = await currentPage.waitForSelector(selector, { timeout: SHORT_TIMEOUT });
-        if (el) return jsonError(res, 400, 'Two-factor required', 'TwoFactorRequired');
-      } catch (_) {}
+    // Each fallback list shares one timeout instead of one per selector, and both
+    // fields are located concurrently
+    const [emailMatch, passwordMatch] = await Promise.all([
+      waitForFirst(currentPage, EMAIL_SELECTORS, SELECTOR_TIMEOUT),
+      waitForFirst(currentPage, PASSWORD_SELECTORS, SELECTOR_TIMEOUT),
+    ]);
+    if (!emailMatch) return jsonError(res, 400, 'Email field not found');
+    await emailMatch.locator.fill(email);
+
+    if (!passwordMatch) return jsonError(res, 400, 'Password field not found');
+    await passwordMatch.locator.fill(password);
+
+    const submitMatch = await waitForFirst(currentPage, LOGIN_SUBMIT_SELECTORS, SELECTOR_TIMEOUT);
+    if (!submitMatch) return jsonError(res, 400, 'Submit button not found');
+
+    await currentPage.evaluate(markLoginErrors, LOGIN_ERROR_ARG);
+    await submitMatch.locator.click();
+    // Returns once the page leaves the login form or shows a 2FA prompt / new error (the
+    // load state alone is already reached on the login page). Promise.any: a wait that
+    // fails (e.g. the error check torn down by the redirect) doesn't end the race
+    await Promise.any([
+      currentPage.waitForURL((url) => !url.pathname.toLowerCase().includes('/login'), {
+        waitUntil: 'domcontentloaded',
+        timeout: LOGIN_SUBMIT_TIMEOUT,
+      }),
+      waitForFirst(currentPage, TWO_FACTOR_SELECTORS, LOGIN_SUBMIT_TIMEOUT),
+      currentPage.waitForFunction(newLoginError, LOGIN_ERROR_ARG, { timeout: LOGIN_SUBMIT_TIMEOUT }),
+    ]).catch(() => {});
+
+    // Both checks run concurrently, so a clean login pays one short timeout
+    const [twoFactorMatch, errorText] = await Promise.all([
+      waitForFirst(currentPage, TWO_FACTOR_SELECTORS, LOGIN_RESULT_CHECK_TIMEOUT),
+      currentPage
+        .waitForFunction(newLoginError, LOGIN_ERROR_ARG, { timeout: LOGIN_RESULT_CHECK_TIMEOUT })
+        .then((handle) => handle.jsonValue())
+        .catch(() => null),
+    ]);
+    if (twoFactorMatch) {
+      return jsonError(res, 400, 'Two-factor required', 'TwoFactorRequired');
     }
 
-    const errorSelectors = [
-      '.error-message',
-      '.alert-error',
-      '.form-error',
-      "[role='alert']",
-      'text=/incorrect password/i',
-      'text=/invalid email/i',
-      'text=/login failed/i',
-    ];
-    for (const selector of errorSelectors) {
-      try {
-        const el = await currentPage.waitForSelector(selector, { timeout: SHORT_TIMEOUT });
-        if (el) {
-          const text = (await el.innerText()) || 'Login failed';
-          return jsonError(res, 400, text);
-        }
-      } catch (_) {}
+    if (errorText) {
+      return jsonError(res, 400, errorText);
     }
 
-    if (currentPage.url().toLowerCase().includes('/account') && !currentPage.url().toLowerCase().includes('/login')) {
+    await saveStorageState();
+    if (isAccountUrl(currentPage.url())) {
       return res.json({ status: 'success', message: 'Login successful', current_url: currentPage.url() });
     }
 
@@ -662,17 +780,12 @@ app.post('/add-to-cart', async (req, res) => {
   const { proceed_to_checkout: proceedToCheckout } = req.body || {};
   try {
     const currentPage = await ensurePage();
-    const notifySelectors = [
-      "button:has-text('NOTIFY ME WHEN AVAILABLE')",
-      "button:has-text('NOTIFY ME')",
-      "button:has-text('Notify me')",
-    ];
-    for (const selector of notifySelectors) {
-      try {
-        const el = await currentPage.waitForSelector(selector, { timeout: SHORT_TIMEOUT });
-        if (el) return jsonError(res, 400, 'Product sold out - notify me button present', 'ProductSoldOut');
-      } catch (_) {}
-    }
+    // One in-page sweep for a visible NOTIFY ME button (the in-stock case no longer
+    // waits out a timeout per text variant)
+    const soldOut = await currentPage.evaluate(() => Array.from(document.querySelectorAll('button')).some(
+      (button) => /notify me/i.test(button.textContent || '') && button.getClientRects().length > 0,
+    ));
+    if (soldOut) return jsonError(res, 400, 'Product sold out - notify me button present', 'ProductSoldOut');
 
     const addSelectors = [
       "button:has-text('ADD TO CART')",
@@ -683,37 +796,23 @@ app.post('/add-to-cart', async (req, res) => {
       "[data-action='add-to-cart']",
       "input[type='submit'][value*='Add']",
     ];
-    let addButton;
-    for (const selector of addSelectors) {
-      try {
-        const btn = await currentPage.waitForSelector(selector, { timeout: SELECTOR_TIMEOUT });
-        if (btn && !(await btn.isDisabled())) {
-          addButton = btn;
-          break;
-        }
-      } catch (_) {}
-    }
-    if (!addButton) return jsonError(res, 400, 'Add to cart button missing/disabled', 'ProductSoldOut');
-
-    await addButton.click();
+    // First visible, enabled button across every variant, found with one locator. Only a
+    // missing button means sold out: a click blocked by an overlay is an ordinary error
+    const addButton = currentPage
+      .locator(addSelectors.map((selector) => `${selector}:not([disabled]):visible`).join(', '))
+      .first();
     try {
-      await currentPage.waitForSelector('text=/Added to.*cart/i', { timeout: CART_DRAWER_TIMEOUT });
+      await addButton.waitFor({ state: 'visible', timeout: SELECTOR_TIMEOUT });
     } catch (_) {
-      // continue
+      return jsonError(res, 400, 'Add to cart button missing/disabled', 'ProductSoldOut');
     }
+    await addButton.click();
 
-    const successIndicators = ['text=/Added to.*cart/i', 'text=/item.*added/i', '.cart-item', '[data-cart-item]'];
-    let added = false;
-    for (const selector of successIndicators) {
-      try {
-        const el = await currentPage.waitForSelector(selector, { timeout: SHORT_TIMEOUT });
-        if (el) {
-          added = true;
-          break;
-        }
-      } catch (_) {}
+    // Waits for the cart drawer; both phrases in one text scan, all indicators raced together
+    const successIndicators = ['text=/Added to.*cart|item.*added/i', '.cart-item', '[data-cart-item]'];
+    if (!(await waitForFirst(currentPage, successIndicators, CART_DRAWER_TIMEOUT))) {
+      return jsonError(res, 400, 'Could not verify cart add');
     }
-    if (!added) return jsonError(res, 400, 'Could not verify cart add');
 
     if (proceedToCheckout) {
       const checkoutSelectors = [
@@ -723,16 +822,14 @@ app.post('/add-to-cart', async (req, res) => {
         '.cart-drawer__checkout',
         "button[name='checkout']",
       ];
-      let checkoutButton;
-      for (const selector of checkoutSelectors) {
-        try {
-          checkoutButton = await currentPage.waitForSelector(selector, { timeout: SELECTOR_TIMEOUT });
-          if (checkoutButton) break;
-        } catch (_) {}
-      }
-      if (!checkoutButton) return jsonError(res, 400, 'Checkout button not found');
-      await checkoutButton.click();
-      await currentPage.waitForLoadState('domcontentloaded');
+      const checkoutMatch = await waitForFirst(currentPage, checkoutSelectors, SELECTOR_TIMEOUT);
+      if (!checkoutMatch) return jsonError(res, 400, 'Checkout button not found');
+      await checkoutMatch.locator.click();
+      // Wait for the checkout page itself (the product page's load state is already reached),
+      // so /checkout can start on a parsed document without waiting again
+      await currentPage
+        .waitForURL(/checkout/i, { waitUntil: 'domcontentloaded', timeout: CHECKOUT_NAVIGATION_TIMEOUT })
+        .catch(() => {});
       return res.json({
         status: 'success',
         message: 'Product added and proceeded to checkout',
@@ -760,8 +857,6 @@ app.post('/checkout', async (req, res) => {
       return jsonError(res, 400, `Not on checkout page (${currentPage.url()})`);
     }
 
-    await currentPage.waitForLoadState('domcontentloaded');
-
     await verifyPickupSelected(currentPage);
     const pickupLocation = await detectPickupLocation(currentPage);
 
@@ -775,31 +870,33 @@ app.post('/checkout', async (req, res) => {
         "button[type='submit']:has-text('Pay')",
         "button:has-text('Complete order')",
         "button:has-text('Place order')",
-        "button[type='submit']",
-        '#submit-button',
       ];
-      let submitButton;
-      for (const selector of submitSelectors) {
-        try {
-          submitButton = await currentPage.waitForSelector(selector, { timeout: SELECTOR_TIMEOUT });
-          if (submitButton) break;
-        } catch (_) {}
-      }
-      if (!submitButton) return jsonError(res, 400, "'Pay now' button not found");
-
-      await submitButton.click();
-      await currentPage.waitForTimeout(ORDER_SUBMISSION_DELAY);
-
-      const threeDs = await check3DS(currentPage);
-      if (threeDs) return jsonError(res, 400, '3D Secure verification required', 'ThreeDSecureRequired');
+      // Generic submit buttons only once no labelled button rendered in time (a bare
+      // submit button can also be e.g. the discount code "Apply" button)
+      const fallbackSelectors = ["button[type='submit']", '#submit-button'];
+      const match = (await waitForFirst(currentPage, submitSelectors, SELECTOR_TIMEOUT))
+        || (await waitForFirst(currentPage, fallbackSelectors, SELECTOR_TIMEOUT));
+      if (!match) return jsonError(res, 400, "'Pay now' button not found");
+
+      // Record indicators already on the checkout page so the outcome race ignores them
+      await currentPage.evaluate(() => {
+        document.querySelectorAll(
+          "iframe[name*='3d'], iframe[name*='secure'], #challenge-iframe, .error-message, .payment-error, [role='alert']"
+        ).forEach((el) => {
+          if (el.getClientRects().length > 0) el.dataset.preSubmitText = (el.innerText || '').trim();
+        });
+        const text = document.body ? document.body.innerText || '' : '';
+        window.__preSubmitLines = text.split('\n')
+          .filter((line) => /3d secure|payment.*failed|card.*declined/i.test(line));
+      });
+      await match.locator.click();
 
-      const paymentError = await checkPaymentError(currentPage);
-      if (paymentError) return jsonError(res, 400, `Payment failed: ${paymentError}`);
+      // Returns as soon as 3DS, a payment error or the confirmation page shows up
+      const outcome = await waitForSubmitOutcome(currentPage);
+      if (outcome.kind === '3ds') return jsonError(res, 400, '3D Secure verification required', 'ThreeDSecureRequired');
+      if (outcome.kind === 'error') return jsonError(res, 400, `Payment failed: ${outcome.detail || 'Payment error'}`);
 
-      const success =
-        currentPage.url().toLowerCase().includes('thank') ||
-        currentPage.url().toLowerCase().includes('confirmation') ||
-        currentPage.url().toLowerCase().includes('order');
+      const success = CONFIRMATION_URL_PATTERN.test(currentPage.url());
 
       return res.json({
         status: 'success',
@@ -823,53 +920,73 @@ app.post('/checkout', async (req, res) => {
 });
 
 async function verifyPickupSelected(currentPage) {
-  const pickupSelectors = [
-    "input[type='radio'][value*='pick']:checked",
-    "input[type='radio'][id*='pickup']:checked",
-    "input[type='radio']:checked + label:has-text('Pick')",
-  ];
-
-  for (const selector of pickupSelectors) {
-    const el = await currentPage.$(selector);
-    if (el) return;
-  }
+  // Single compound selector for every "pick-up already selected" variant
+  const pickupSelected =
+    "input[type='radio']:checked:is([value*='pick'], [id*='pickup']), input[type='radio']:checked + label:has-text('Pick')";
+  if (await currentPage.$(pickupSelected)) return;
 
   const clickSelectors = [
     "input[type='radio'][value*='pick']",
     "label:has-text('Pick-up')",
     "label:has-text('Pick up')",
   ];
-  for (const selector of clickSelectors) {
-    try {
-      const el = await currentPage.waitForSelector(selector, { timeout: SELECTOR_TIMEOUT });
-      if (el) {
-        await el.click();
-        await currentPage.waitForTimeout(SHORT_TIMEOUT);
-        return;
-      }
-    } catch (_) {}
+  const match = await waitForFirst(currentPage, clickSelectors, SELECTOR_TIMEOUT);
+  if (match) {
+    await match.locator.click();
+    // Returns once the radio reports checked instead of sleeping a fixed second
+    await currentPage.waitForSelector(pickupSelected, { state: 'attached', timeout: SHORT_TIMEOUT }).catch(() => {});
   }
 }
 
 async function detectPickupLocation(currentPage) {
-  const selectors = [
-    'text=/South San Francisco.*240 Grand/i',
-    'text=/San Francisco.*Fell Street/i',
-    'text=/South San Francisco/i',
-    'text=/1275 Fell Street/i',
-    'text=/240 Grand Ave/i',
-  ];
-
-  for (const selector of selectors) {
-    try {
-      const el = await currentPage.waitForSelector(selector, { timeout: MEDIUM_TIMEOUT });
-      if (el) {
-        const text = await el.innerText();
-        return text.split('\n')[0].trim().slice(0, 50);
-      }
-    } catch (_) {}
+  // Same in-page search as the Python agent: every pattern is checked in priority order
+  // against the innermost visible element whose text matches, re-checking on DOM
+  // mutations (at most once per frame) until one matches or the timeout elapses, so a
+  // missing location costs a single timeout instead of one per pattern
+  try {
+    const match = await currentPage.evaluate(({ patterns, timeout }) => new Promise((resolve) => {
+      const regexes = patterns.map((p) => new RegExp(p, 'i'));
+      const textOf = (el) => (el.textContent || '').replace(/\s+/g, ' ');
+      const find = () => {
+        if (!document.body) return null;
+        const elements = Array.from(document.body.querySelectorAll('*'))
+          .filter((el) => el.tagName !== 'SCRIPT' && el.tagName !== 'STYLE');
+        for (let i = 0; i < regexes.length; i++) {
+          const re = regexes[i];
+          const el = elements.find((e) => re.test(textOf(e))
+            && !Array.from(e.children).some((c) => re.test(textOf(c)))
+            && e.getClientRects().length > 0);
+          if (el) return { index: i, text: (el.innerText || '').split('\n')[0].trim().slice(0, 50) };
+        }
+        return null;
+      };
+      let timer = null;
+      let scheduled = false;
+      const observer = new MutationObserver(() => {
+        if (scheduled) return;
+        scheduled = true;
+        requestAnimationFrame(() => {
+          scheduled = false;
+          const result = find();
+          if (result) finish(result);
+        });
+      });
+      const finish = (result) => {
+        observer.disconnect();
+        clearTimeout(timer);
+        resolve(result);
+      };
+      const initial = find();
+      if (initial) return resolve(initial);
+      timer = setTimeout(() => finish(null), timeout);
+      observer.observe(document.documentElement, { subtree: true, childList: true, characterData: true });
+    }), { patterns: PICKUP_TEXT_PATTERNS, timeout: MEDIUM_TIMEOUT });
+    if (!match || !match.text) return 'unknown';
+    console.log(`DEBUG: Pickup location matched: ${PICKUP_TEXT_PATTERNS[match.index]}`);
+    return match.text;
+  } catch (_) {
+    return 'unknown';
   }
-  return 'unknown';
 }
 
 async function fillPayment(currentPage, paymentInfo) {
@@ -881,37 +998,84 @@ async function fillPayment(currentPage, paymentInfo) {
     cc_name: billingName,
   } = paymentInfo;
 
-  const paymentSection = await currentPage.$('text=/Payment/i');
+  // Attribute anchors first (no text-node scan), heading text as the fallback.
+  // scrollIntoViewIfNeeded already waits for the element to be stable
+  const paymentSection = (await currentPage.$(PAYMENT_SECTION_SELECTOR)) || (await currentPage.$('text=/Payment/i'));
   if (paymentSection) {
     await paymentSection.scrollIntoViewIfNeeded();
-    await currentPage.waitForTimeout(SHORT_TIMEOUT);
   }
 
-  const cardIframe = await currentPage.waitForSelector(
-    "iframe[title*='Field container for: Card number' i], iframe[name*='number' i]",
-    { timeout: AGE_VERIFICATION_TIMEOUT },
-  );
-  if (!cardIframe) throw new Error('Card number iframe not found');
-  const cardFrame = await cardIframe.contentFrame();
-  const cardInput = await cardFrame.waitForSelector('input', { timeout: AGE_VERIFICATION_TIMEOUT });
-  await cardInput.click({ force: true });
-  await currentPage.waitForTimeout(CARD_FIELD_INITIAL_DELAY);
-  await cardInput.type(ccNumber, { delay: TYPING_DELAY });
+  // Digits only: the field's "MM / YY" mask inserts the separator itself, whether the
+  // value is typed key by key or set with one fill()
+  const expValue = `${ccExpMonth.toString().padStart(2, '0')}${ccExpYear.toString().slice(-2)}`;
+  if (!HUMANIZE_TYPING && (await fillCardFields(currentPage, [ccNumber, expValue, ccCvv, billingName]))) return;
+
+  // Fallback (or humanized typing): type the card number and tab through the remaining fields
+  // A FrameLocator resolves the iframe and its input lazily with auto-wait, so no
+  // separate iframe query / contentFrame() round-trips are needed
+  const cardInput = currentPage.frameLocator(CARD_FIELD_IFRAME_SELECTORS[0]).first().locator('input').first();
+  try {
+    await cardInput.click({ force: true, timeout: AGE_VERIFICATION_TIMEOUT });
+  } catch (_) {
+    throw new Error('Card number iframe not found');
+  }
+  await cardInput.pressSequentially(ccNumber, { delay: TYPING_DELAY });
   await cardInput.press('Tab');
-  await currentPage.waitForTimeout(CARD_FIELD_TRANSITION_DELAY);
+  await waitForCardFieldFocus(currentPage, 'expir');
 
-  const expValue = `${ccExpMonth.toString().padStart(2, '0')}${ccExpYear.toString().slice(-2)}`;
   await currentPage.keyboard.type(expValue, { delay: TYPING_DELAY });
   await currentPage.keyboard.press('Tab');
-  await currentPage.waitForTimeout(CARD_FIELD_TRANSITION_DELAY);
+  await waitForCardFieldFocus(currentPage, 'security code');
 
   await currentPage.keyboard.type(ccCvv, { delay: TYPING_DELAY });
   await currentPage.keyboard.press('Tab');
-  await currentPage.waitForTimeout(CARD_FIELD_TRANSITION_DELAY);
+  await waitForCardFieldFocus(currentPage, 'name on card');
 
   await currentPage.keyboard.type(billingName, { delay: TYPING_DELAY });
 }
 
+// Fill each card field iframe with one fill() call instead of per-character typing.
+// Waits for the card number field, then probes the others briefly (they render
+// together, so a checkout without one falls back without waiting out the full
+// timeout). The fills run one after another so each field's blur and validation
+// handlers finish before the next field takes focus. Returns false (nothing
+// filled) if any field cannot be located.
+async function fillCardFields(currentPage, values) {
+  const inputs = CARD_FIELD_IFRAME_SELECTORS.map((selector) =>
+    currentPage.frameLocator(selector).first().locator('input').first(),
+  );
+  try {
+    await inputs[0].waitFor({ state: 'visible', timeout: AGE_VERIFICATION_TIMEOUT });
+    await Promise.all(
+      inputs.slice(1).map((input) => input.waitFor({ state: 'visible', timeout: CARD_FIELD_PROBE_TIMEOUT })),
+    );
+  } catch (e) {
+    console.log(`DEBUG: Card field iframes not found, falling back to keyboard entry: ${e.message}`);
+    return false;
+  }
+  for (let i = 0; i < inputs.length; i++) {
+    await inputs[i].fill(`${values[i]}`);
+  }
+  return true;
+}
+
+// Wait until Tab has moved focus into the card field iframe whose title mentions
+// `titleFragment` (returns as soon as it is ready instead of sleeping a fixed delay)
+async function waitForCardFieldFocus(currentPage, titleFragment) {
+  try {
+    await currentPage.waitForFunction(
+      (fragment) => {
+        const el = document.activeElement;
+        return el?.tagName === 'IFRAME' && (el.title || '').toLowerCase().includes(fragment);
+      },
+      titleFragment,
+      { timeout: CARD_FIELD_FOCUS_TIMEOUT },
+    );
+  } catch (_) {
+    // Field titles vary between checkouts; keep typing where the focus went
+  }
+}
+
 /**
  * Extract order quantity from checkout page using multiple strategies.
  *
@@ -923,82 +1087,55 @@ async function fillPayment(currentPage, paymentInfo) {
  * @returns {Promise<number|string>} Quantity as number, or 'unknown' if not found
  */
 async function extractOrderQuantity(currentPage) {
+  // All strategies run in one in-page pass and stop at the first that yields a
+  // positive number (previously the selector fallback cost several round-trips per node)
   try {
-    // Strategy 1: Prefer Shopify checkout line_items if available
-    // Note: This doesn't work on bittersandbottles.com but kept as an opportunistic
-    // first check - it's fast and might work on other Shopify stores
-    const qtyShopify = await currentPage.evaluate(() => {
+    const quantity = await currentPage.evaluate(() => {
+      const digits = (text) => {
+        const value = parseInt((text || '').replace(/[^0-9]/g, ''), 10);
+        return Number.isNaN(value) ? 0 : value;
+      };
+
+      // Strategy 1: Prefer Shopify checkout line_items if available
+      // Note: This doesn't work on bittersandbottles.com but kept as an opportunistic
+      // first check - it's fast and might work on other Shopify stores
       try {
         const items = window.Shopify?.checkout?.line_items || [];
-        return items.reduce((sum, item) => sum + (item.quantity || 0), 0);
-      } catch (e) {
-        return null;
+        const fromShopify = items.reduce((sum, item) => sum + (item.quantity || 0), 0);
+        if (fromShopify > 0) return fromShopify;
+      } catch (e) {}
+
+      // Strategy 2: "Quantity" label followed by aria-hidden span
+      // This is the pattern used in Shopify checkout pages
+      const qtyLabel = Array.from(document.querySelectorAll('span'))
+        .find((span) => span.textContent.trim().toLowerCase() === 'quantity');
+      const nextSibling = qtyLabel ? qtyLabel.nextElementSibling : null;
+      if (nextSibling && nextSibling.tagName === 'SPAN' && nextSibling.getAttribute('aria-hidden') === 'true') {
+        const match = nextSibling.textContent.trim().match(/\d+/);
+        if (match && parseInt(match[0], 10) > 0) return parseInt(match[0], 10);
       }
-    });
-    if (qtyShopify && qtyShopify > 0) {
-      return qtyShopify;
-    }
-
-    // Strategy 2: Try to find quantity by looking for "Quantity" label followed by aria-hidden span
-    // This is the pattern used in Shopify checkout pages
-    const qtyFromLabel = await currentPage.evaluate(() => {
-      try {
-        // Find all spans that contain "Quantity" text
-        const allSpans = Array.from(document.querySelectorAll('span'));
-        const qtyLabel = allSpans.find(span => span.textContent.trim().toLowerCase() === 'quantity');
-
-        if (qtyLabel) {
-          // Look for next sibling with aria-hidden="true"
-          let nextSibling = qtyLabel.nextElementSibling;
-          if (nextSibling && nextSibling.tagName === 'SPAN' && nextSibling.getAttribute('aria-hidden') === 'true') {
-            const qtyText = nextSibling.textContent.trim();
-            const match = qtyText.match(/\d+/);
-            return match ? parseInt(match[0], 10) : null;
-          }
-        }
-        return null;
-      } catch (e) {
-        return null;
-      }
-    });
-
-    if (qtyFromLabel && qtyFromLabel > 0) {
-      return qtyFromLabel;
-    }
 
-    // Strategy 3: Fall back to DOM element selectors
-    let qtyTotal = 0;
-    const qtyNodes = await currentPage.$$(
-      '.product__quantity, .order-summary__quantity, [data-checkout-line-item] .quantity, .product-table__quantity, '
-        + 'select[data-cartitem-quantity], [data-quantity], [data-cart-item-quantity], '
-        + "select[aria-label='Quantity'], select[id^='quantity'], select[name*='quantity'], "
-        + '.product-thumbnail__quantity, span.product-thumbnail__quantity, span[class*="thumbnail__quantity"], '
-        + "span[data-order-summary-section='line-item-quantity']",
-    );
-
-    for (const node of qtyNodes) {
-      const tag = ((await node.evaluate((el) => el.tagName)) || '').toLowerCase();
-      if (tag === 'select') {
-        const val = await node.getAttribute('value');
-        if (val && /^\d+$/.test(val)) {
-          qtyTotal += parseInt(val, 10);
+      // Strategy 3: Fall back to DOM element selectors
+      let qtyTotal = 0;
+      document.querySelectorAll(
+        '.product__quantity, .order-summary__quantity, [data-checkout-line-item] .quantity, .product-table__quantity, '
+          + 'select[data-cartitem-quantity], [data-quantity], [data-cart-item-quantity], '
+          + "select[aria-label='Quantity'], select[id^='quantity'], select[name*='quantity'], "
+          + '.product-thumbnail__quantity, span.product-thumbnail__quantity, span[class*="thumbnail__quantity"], '
+          + "span[data-order-summary-section='line-item-quantity']",
+      ).forEach((node) => {
+        if (node.tagName === 'SELECT') {
+          const option = node.querySelector('option:checked');
+          qtyTotal += /^\d+$/.test(node.value) ? parseInt(node.value, 10) : digits(option && option.innerText);
         } else {
-          const opt = await node.$('option:checked');
-          if (opt) {
-            const optText = ((await opt.innerText()) || '').trim();
-            const digitsOpt = optText.replace(/[^0-9]/g, '');
-            if (digitsOpt) qtyTotal += parseInt(digitsOpt, 10);
-          }
+          qtyTotal += digits(node.innerText);
         }
-      } else {
-        const text = ((await node.innerText()) || '').trim();
-        const digits = text.replace(/[^0-9]/g, '');
-        if (digits) qtyTotal += parseInt(digits, 10);
-      }
-    }
+      });
+      return qtyTotal > 0 ? qtyTotal : null;
+    });
 
-    if (qtyTotal > 0) {
-      return qtyTotal;
+    if (quantity) {
+      return quantity;
     }
   } catch (_) {
     // Ignore errors and return 'unknown'
@@ -1017,111 +1154,149 @@ async function getOrderSummary(currentPage, pickupLocation) {
     quantity: 'unknown',
   };
 
-  // Try to extract product name from checkout page
+  // Product and totals are read in one in-page pass instead of a query plus
+  // parent-walk round-trips per field
   try {
-    // Strategy 1: Look for product name in Shopping cart section
-    const productElem = await currentPage.$("section[aria-label='Shopping cart'] [role='cell'] p");
-    if (productElem) {
-      const text = await productElem.innerText();
-      if (text && text.trim() && !['quantity', 'price'].includes(text.trim().toLowerCase())) {
-        summary.product = text.trim().slice(0, 100);
-      }
-    }
-
-    // Strategy 2: Fallback to image alt text if not found
-    if (summary.product === 'unknown') {
-      const imgElem = await currentPage.$("section[aria-label='Shopping cart'] img[alt]");
-      if (imgElem) {
-        const altText = await imgElem.getAttribute('alt');
-        if (altText && altText.trim()) {
-          summary.product = altText.trim().slice(0, 100);
+    const extracted = await currentPage.evaluate(() => {
+      // Strategy 1: product name in Shopping cart section
+      // Strategy 2: fall back to image alt text
+      const product = () => {
+        const cell = document.querySelector("section[aria-label='Shopping cart'] [role='cell'] p");
+        const text = cell ? (cell.innerText || '').trim() : '';
+        if (text && !['quantity', 'price'].includes(text.toLowerCase())) return text;
+        const img = document.querySelector("section[aria-label='Shopping cart'] img[alt]");
+        const alt = img ? (img.getAttribute('alt') || '').trim() : '';
+        return alt || null;
+      };
+
+      const findLabel = (re) => {
+        for (const el of document.querySelectorAll('body *')) {
+          if (re.test((el.textContent || '').trim())
+            && !Array.from(el.children).some((c) => re.test((c.textContent || '').trim()))) {
+            return el;
+          }
         }
-      }
+        return null;
+      };
+      // Walk up from the label to the nearest ancestor that also holds a price
+      // (grandparent for Subtotal/Total, level 4 parent for Estimated taxes)
+      const priceNear = (labelRe) => {
+        let el = findLabel(labelRe);
+        for (let level = 0; el && level <= 6; level++, el = el.parentElement) {
+          const lines = (el.innerText || '').split('\n');
+          // Only consider the dollar amount that follows the label's own line (an
+          // ancestor can also hold earlier rows, e.g. Subtotal above Total)
+          const start = lines.findIndex((line) => labelRe.test(line.trim()));
+          if (start < 0) continue;
+          const match = lines.slice(start).join('\n').match(/\$\s*(\d[\d,]*(?:\.\d{2})?)/);
+          if (match) return `$${match[1]}`;
+        }
+        return null;
+      };
+
+      // Structured totals when the store exposes window.Shopify.checkout; DOM scraping
+      // fills in anything missing. Only decimal dollar strings ("40.11") are used: numeric
+      // prices can be cents or whole dollars depending on the store
+      const money = (value) => {
+        if (typeof value !== 'string' || value === '') return null;
+        const amount = parseFloat(value.replace(/[^\d.]/g, ''));
+        if (Number.isNaN(amount)) return null;
+        return `$${amount.toLocaleString('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 })}`;
+      };
+      let totals = {};
+      try {
+        const checkout = window.Shopify?.checkout;
+        if (checkout && checkout.total_price !== undefined) {
+          totals = {
+            subtotal: money(checkout.subtotal_price),
+            tax: money(checkout.tax_price),
+            total: money(checkout.total_price),
+          };
+        }
+      } catch (e) {}
+
+      return {
+        product: product(),
+        subtotal: totals.subtotal || priceNear(/^Subtotal$/i),
+        tax: totals.tax || priceNear(/^Estimated taxes$/i),
+        total: totals.total || priceNear(/^Total$/i),
+      };
+    });
+    for (const field of ['product', 'subtotal', 'tax', 'total']) {
+      if (extracted[field]) summary[field] = extracted[field];
     }
+    summary.product = summary.product.slice(0, 100);
   } catch (err) {
-    logger.debug('Could not extract product name', { error: err.message });
+    console.log(`DEBUG: Could not extract order summary: ${err.message}`);
   }
 
-  try {
-    const subtotalElem = await currentPage.$('text=/^Subtotal$/i');
-    if (subtotalElem) {
-      const grandparent = await subtotalElem.evaluateHandle((el) => el.parentElement.parentElement);
-      const text = await grandparent.innerText();
-      if (text.includes('$')) summary.subtotal = `$${text.split('$')[1].trim().split(/\s+/)[0]}`;
-    }
-  } catch (_) {}
-
-  try {
-    const taxElem = await currentPage.$('text=/^Estimated taxes$/i');
-    if (taxElem) {
-      const parent4 = await taxElem.evaluateHandle(
-        (el) => el.parentElement?.parentElement?.parentElement?.parentElement,
-      );
-      const text = await parent4.innerText();
-      if (text.includes('$')) {
-        // Find the dollar amount that comes AFTER "Estimated taxes" text
-        const parts = text.split('$');
-        for (let i = 0; i < parts.length; i++) {
-          if (parts[i].toLowerCase().includes('estimated tax')) {
-            // The next part should contain the tax amount
-            if (i + 1 < parts.length) {
-              summary.tax = `$${parts[i + 1].trim().split(/\s+/)[0]}`;
-              break;
-            }
-          }
-        }
-      }
-    }
-  } catch (_) {}
-
-  try {
-    const totalElem = await currentPage.$('text=/^Total$/i');
-    if (totalElem) {
-      const grandparent = await totalElem.evaluateHandle((el) => el.parentElement.parentElement);
-      const text = await grandparent.innerText();
-      if (text.includes('$')) summary.total = `$${text.split('$')[1].trim().split(/\s+/)[0]}`;
-    }
-  } catch (_) {}
-
   // Extract quantity using dedicated function with multiple strategies
   summary.quantity = await extractOrderQuantity(currentPage);
 
   return summary;
 }
 
-async function check3DS(currentPage) {
-  const selectors = [
-    "iframe[name*='3d']",
-    "iframe[name*='secure']",
-    'text=/3d secure/i',
-    'text=/verify/i',
-    '#challenge-iframe',
-  ];
-  for (const selector of selectors) {
-    try {
-      const el = await currentPage.waitForSelector(selector, { timeout: SHORT_TIMEOUT });
-      if (el) return true;
-    } catch (_) {}
-  }
-  return false;
-}
-
-async function checkPaymentError(currentPage) {
-  const selectors = [
-    '.error-message',
-    '.payment-error',
-    "[role='alert']",
-    'text=/payment.*failed/i',
-    'text=/card.*declined/i',
-    'text=/error/i',
-  ];
-  for (const selector of selectors) {
+/**
+ * Wait for the first post-submit outcome: 3D Secure challenge, payment error, or success.
+ *
+ * Races all indicators in one in-page MutationObserver instead of sleeping and then
+ * probing each selector with its own timeout. Navigations (processing / thank-you
+ * pages) restart the race on the new document within the same overall budget.
+ *
+ * @param {Page} currentPage - Playwright page object
+ * @returns {Promise<{kind: string, detail?: string}>} kind is '3ds', 'error', 'success' or 'none'
+ */
+async function waitForSubmitOutcome(currentPage) {
+  const deadline = Date.now() + ORDER_SUBMISSION_TIMEOUT;
+  for (;;) {
+    const remaining = Math.max(0, deadline - Date.now());
     try {
-      const el = await currentPage.waitForSelector(selector, { timeout: SHORT_TIMEOUT });
-      if (el) return (await el.innerText()) || 'Payment error';
-    } catch (_) {}
+      return await currentPage.evaluate((timeout) => new Promise((resolve) => {
+        // Indicators recorded before the click are ignored while unchanged
+        const baselineLines = new Set(window.__preSubmitLines || []);
+        const visible = (el) => el.getClientRects().length > 0;
+        const isNew = (el) => el.dataset.preSubmitText !== (el.innerText || '').trim();
+        const firstVisible = (selector) => Array.from(document.querySelectorAll(selector))
+          .find((el) => visible(el) && isNew(el) && (el.tagName === 'IFRAME' || (el.innerText || '').trim()));
+        const textLine = (re) => {
+          const text = document.body ? document.body.innerText || '' : '';
+          return text.split('\n').find((line) => re.test(line) && !baselineLines.has(line)) || null;
+        };
+        const check = () => {
+          if (firstVisible("iframe[name*='3d'], iframe[name*='secure'], #challenge-iframe")
+            || textLine(/3d secure/i)) {
+            return { kind: '3ds' };
+          }
+          const errorEl = firstVisible(".error-message, .payment-error, [role='alert']");
+          if (errorEl) return { kind: 'error', detail: errorEl.innerText.trim() };
+          const errorText = textLine(/payment.*failed/i) || textLine(/card.*declined/i);
+          if (errorText) return { kind: 'error', detail: errorText.trim() };
+          if (/thank|confirmation|order/i.test(location.href)) return { kind: 'success' };
+          return null;
+        };
+        let timer = null;
+        const observer = new MutationObserver(() => {
+          const result = check();
+          if (result) finish(result);
+        });
+        const finish = (result) => {
+          observer.disconnect();
+          clearTimeout(timer);
+          resolve(result);
+        };
+        const initial = check();
+        if (initial) return resolve(initial);
+        timer = setTimeout(() => finish({ kind: 'none' }), timeout);
+        observer.observe(document.documentElement, {
+          subtree: true, childList: true, attributes: true, characterData: true,
+        });
+      }), remaining);
+    } catch (e) {
+      // A navigation destroyed the execution context mid-race; re-check on the new document
+      if (Date.now() >= deadline) return { kind: 'none' };
+      await currentPage.waitForLoadState('domcontentloaded');
+    }
   }
-  return null;
 }
 
 process.on('SIGINT', async () => {
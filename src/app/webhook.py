@@ -6,7 +6,7 @@ import threading
 import time
 from typing import Dict, Set, Tuple
 
-from fastapi import APIRouter, Header, HTTPException, Request, BackgroundTasks
+from fastapi import APIRouter, Header, HTTPException, Request, Response, BackgroundTasks
 from pydantic import BaseModel, Field, field_validator
 
 from ..core.config import Mode, MODE_SAFETY
@@ -32,6 +32,9 @@ RATE_LIMIT_WINDOW = 60  # Window duration in seconds
 RATE_LIMIT_CLEANUP_INTERVAL = 300  # Cleanup every 5 minutes
 _last_rate_limit_cleanup = time.time()
 
+# Long-poll approval wait: held server-side until a decision, then 204 so the client reconnects
+APPROVAL_WAIT_TIMEOUT_SECONDS = 55  # Below the usual 60s proxy/client idle timeouts
+
 
 class WebhookPayload(BaseModel):
     """Webhook payload from Raspberry Pi Gmail monitor."""
@@ -467,6 +470,45 @@ async def get_approval_status_endpoint(run_id: str, request: Request):
     if not approval:
         raise HTTPException(status_code=404, detail=f"Approval request {run_id} not found")
 
+    return _approval_status_response(run_id, approval)
+
+
+@router.get("/approval/{run_id}/wait")
+async def wait_for_approval_endpoint(run_id: str, request: Request):
+    """
+    Long-poll for the decision on an approval request.
+
+    Blocks until the request is approved, rejected or deleted, and returns its
+    status as soon as that happens. Returns 204 if it is still pending after
+    APPROVAL_WAIT_TIMEOUT_SECONDS, so one request per minute replaces
+    polling the status endpoint.
+
+    Args:
+        run_id: Unique identifier for the agent run
+        request: FastAPI request object (for rate limiting)
+
+    Returns:
+        Approval status once decided (or expired), 204 if still pending
+    """
+    # Rate limiting (prevent brute force attacks on run_id)
+    client_ip = request.client.host if request.client else "unknown"
+    check_rate_limit(client_ip)
+
+    from ..core.approval import wait_for_decision
+
+    approval = await wait_for_decision(run_id, timeout_seconds=APPROVAL_WAIT_TIMEOUT_SECONDS)
+
+    if not approval:
+        raise HTTPException(status_code=404, detail=f"Approval request {run_id} not found")
+
+    if approval["status"] == "pending":
+        return Response(status_code=204)
+
+    return _approval_status_response(run_id, approval)
+
+
+def _approval_status_response(run_id: str, approval: dict) -> dict:
+    """Build the JSON body describing an approval request's state."""
     return {
         "run_id": run_id,
         "status": approval["status"],
@@ -1,8 +1,9 @@
 """Human approval state management for purchase decisions."""
 
+import asyncio
 import threading
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from .logging import get_logger
 
 logger = get_logger(__name__)
@@ -12,6 +13,36 @@ logger = get_logger(__name__)
 _pending_approvals: Dict[str, dict] = {}
 _approvals_lock = threading.Lock()  # Thread safety for concurrent access
 
+# Waiters for a decision, keyed by run_id (checkout and any long-poll clients can
+# wait on the same run). The loop is kept with each event so decisions recorded
+# from another thread can wake the waiter safely.
+_approval_events: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+
+
+def _notify_waiter(run_id: str) -> None:
+    """Wake the tasks waiting on this run_id, if any (caller must hold the lock)."""
+    for loop, event in _approval_events.get(run_id, []):
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # Waiting loop already closed
+            pass
+
+
+def approval_urls(base_url: str, run_id: str) -> Tuple[str, str]:
+    """
+    Build the approve/reject callback URLs for a run.
+
+    Args:
+        base_url: Public base URL of the webhook service
+        run_id: Run ID awaiting approval
+
+    Returns:
+        Tuple of (approve_url, reject_url)
+    """
+    prefix = f"{base_url}/approval/{run_id}"
+    return f"{prefix}/approve", f"{prefix}/reject"
+
 
 def create_approval_request(
     run_id: str,
@@ -72,6 +103,47 @@ def get_approval_status(run_id: str) -> Optional[dict]:
         return approval.copy() if approval else None
 
 
+async def wait_for_decision(run_id: str, timeout_seconds: float) -> Optional[dict]:
+    """
+    Wait until a decision is recorded for an approval request.
+
+    Returns as soon as the request is approved, rejected or deleted, without
+    polling. If no decision arrives within the timeout, the current state is
+    returned (marked expired once past its expiry time).
+
+    Args:
+        run_id: Unique identifier for the agent run
+        timeout_seconds: Maximum time to wait
+
+    Returns:
+        Approval state dict or None if not found
+    """
+    event = asyncio.Event()
+    with _approvals_lock:
+        approval = _pending_approvals.get(run_id)
+        if not approval:
+            return None
+        if approval["decision"] is None:
+            waiter = (asyncio.get_running_loop(), event)
+            _approval_events.setdefault(run_id, []).append(waiter)
+        else:
+            event.set()
+
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout_seconds)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        with _approvals_lock:
+            waiters = [w for w in _approval_events.get(run_id, []) if w[1] is not event]
+            if waiters:
+                _approval_events[run_id] = waiters
+            else:
+                _approval_events.pop(run_id, None)
+
+    return get_approval_status(run_id)
+
+
 def approve_request(run_id: str) -> bool:
     """
     Approve a pending purchase request.
@@ -104,6 +176,7 @@ def approve_request(run_id: str) -> bool:
         approval["decision"] = "approved"
         approval["status"] = "approved"
         approval["decided_at"] = datetime.now(timezone.utc)
+        _notify_waiter(run_id)
 
         logger.info("Purchase approved by human", run_id=run_id)
         return True
@@ -141,6 +214,7 @@ def reject_request(run_id: str) -> bool:
         approval["decision"] = "rejected"
         approval["status"] = "rejected"
         approval["decided_at"] = datetime.now(timezone.utc)
+        _notify_waiter(run_id)
 
         logger.info("Purchase rejected by human", run_id=run_id)
         return True
@@ -165,6 +239,7 @@ def cleanup_old_approvals(max_age_hours: int = 24) -> int:
 
         for run_id in to_remove:
             del _pending_approvals[run_id]
+            _notify_waiter(run_id)
 
         if to_remove:
             logger.info(
@@ -189,6 +264,7 @@ def delete_approval_request(run_id: str) -> bool:
     with _approvals_lock:
         if run_id in _pending_approvals:
             del _pending_approvals[run_id]
+            _notify_waiter(run_id)
             logger.info("Approval request deleted", run_id=run_id)
             return True
         return False
@@ -1,17 +1,61 @@
 """Playwright browser harness for managing browser lifecycle."""
 
 import asyncio
+import json
+import os
+import re
 import threading
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import List, Optional, Pattern, Sequence, Tuple
 
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+from playwright.async_api import (
+    async_playwright,
+    Browser,
+    BrowserContext,
+    Error as PlaywrightError,
+    Locator,
+    Page,
+    Playwright,
+    TimeoutError as PlaywrightTimeout,
+)
 
 from .config import get_settings
 from .logging import get_logger
 
 logger = get_logger(__name__)
 
+FONT_URL_PATTERN = r"\.(?:woff2?|ttf|otf)(?:[?#]|$)"  # Web font downloads
+# Raster images and media (SVG is kept: icon buttons may be <img src="*.svg">)
+MEDIA_URL_PATTERN = r"\.(?:png|jpe?g|gif|webp|avif|ico|mp4|webm|mp3)(?:[?#]|$)"
+
+
+def blocked_request_pattern(
+    domains: Sequence[str], block_fonts: bool = False, block_media: bool = False
+) -> Optional[Pattern[str]]:
+    """
+    Build a single URL pattern matching requests that should be aborted.
+
+    Routing with a regex (instead of "**/*" plus a Python handler) means only
+    matching requests are intercepted; everything else goes straight to the
+    network without a round-trip through the driver.
+
+    Args:
+        domains: URL fragments of analytics/tracking hosts to block
+        block_fonts: Also block web font files
+        block_media: Also block raster images and audio/video files
+
+    Returns:
+        Compiled pattern, or None if nothing should be blocked
+    """
+    alternatives = [re.escape(domain) for domain in domains if domain]
+    if block_fonts:
+        alternatives.append(FONT_URL_PATTERN)
+    if block_media:
+        alternatives.append(MEDIA_URL_PATTERN)
+    if not alternatives:
+        return None
+    return re.compile("|".join(alternatives), re.IGNORECASE)
+
 
 class BrowserManager:
     """Manages Playwright browser lifecycle."""
@@ -23,6 +67,7 @@ class BrowserManager:
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self._idle_pages: List[Page] = []  # Released pages kept warm for acquire_page()
         self._start_lock = asyncio.Lock()  # Async lock to prevent concurrent start() calls
         
     async def start(self) -> None:
@@ -49,18 +94,34 @@ class BrowserManager:
                 ]
             )
 
-            # Create context with reasonable viewport and user agent
+            # Create context with reasonable viewport and user agent, restoring cookies
+            # and local storage from the previous run (logged-in session, age gate) if saved
+            storage_state = self.settings.storage_state_path
+            if storage_state and not os.path.exists(storage_state):
+                storage_state = None
             self.context = await self.browser.new_context(
                 viewport={'width': 1280, 'height': 720},
                 user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                 java_script_enabled=True,
                 accept_downloads=False,
+                storage_state=storage_state,
             )
+            if storage_state:
+                logger.info("Restored browser storage state", path=storage_state)
 
             # Set default timeouts
             self.context.set_default_timeout(self.settings.browser_timeout)
             self.context.set_default_navigation_timeout(self.settings.navigation_timeout)
 
+            # Abort analytics/tracking requests and heavy assets that compete with checkout for bandwidth
+            blocked = blocked_request_pattern(
+                self.settings.blocked_request_domains,
+                block_fonts=self.settings.block_web_fonts,
+                block_media=self.settings.block_media,
+            )
+            if blocked:
+                await self.context.route(blocked, lambda route: route.abort())
+
             # Create initial page for agent tools to use
             self.page = await self.context.new_page()
 
@@ -74,6 +135,7 @@ class BrowserManager:
         
         logger.info("Stopping browser")
         
+        self._idle_pages.clear()  # Closed along with the context
         if self.context:
             await self.context.close()
             self.context = None
@@ -88,6 +150,32 @@ class BrowserManager:
         
         logger.info("Browser stopped")
     
+    async def save_storage_state(self) -> None:
+        """
+        Persist cookies and local storage to settings.storage_state_path.
+
+        The next run's context starts from this state, so a still-valid session
+        skips the login flow. Does nothing if no path is configured.
+        """
+        path = self.settings.storage_state_path
+        if not path or not self.context:
+            return
+
+        try:
+            state = await self.context.storage_state()
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            # Contains session cookies: the file is owner-only from creation, and the
+            # rename means readers never see a partly written file
+            tmp_path = f"{path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.fchmod(fd, 0o600)  # A leftover temp file keeps its old mode otherwise
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+            logger.debug("Saved browser storage state", path=path)
+        except (OSError, PlaywrightError) as e:
+            logger.warning("Could not save browser storage state", path=path, error=str(e))
+    
     async def new_page(self) -> Page:
         """
         Create a new page in the browser context.
@@ -105,6 +193,46 @@ class BrowserManager:
         logger.debug("Created new page")
         return page
     
+    async def acquire_page(self) -> Page:
+        """
+        Borrow an idle page released earlier, or create one if none is available.
+
+        Reusing a page skips target creation and keeps its renderer process warm.
+        Return it with release_page() when done, or close it if it is unusable.
+
+        Returns:
+            Page instance
+
+        Raises:
+            RuntimeError: If browser not started
+        """
+        while self._idle_pages:
+            page = self._idle_pages.pop()
+            if not page.is_closed():
+                logger.debug("Reusing idle page")
+                return page
+        return await self.new_page()
+
+    async def release_page(self, page: Page) -> None:
+        """
+        Return a page to the idle pool for the next acquire_page() call.
+
+        The page is blanked first so the previous site's scripts stop running;
+        a page that cannot be blanked is closed instead.
+
+        Args:
+            page: Page previously obtained from acquire_page() or new_page()
+        """
+        if page.is_closed():
+            return
+        try:
+            await page.goto("about:blank")
+        except PlaywrightError as e:
+            logger.debug("Could not reset page, closing it", error=str(e))
+            await page.close()
+            return
+        self._idle_pages.append(page)
+
     async def get_current_page(self) -> Optional[Page]:
         """
         Get the current active page.
@@ -119,6 +247,74 @@ class BrowserManager:
         return pages[0] if pages else None
 
 
+def any_of(page: Page, selectors: Sequence[str]) -> Locator:
+    """
+    Combine selectors into one locator that matches the first visible element of any of them.
+
+    Lets callers race a list of fallback selectors in a single Playwright wait
+    instead of probing each selector with its own timeout.
+
+    Args:
+        page: Playwright page
+        selectors: Selectors to combine (any Playwright selector syntax, including text=)
+
+    Returns:
+        Locator resolving to the first visible match in document order
+    """
+    locator = page.locator(f"{selectors[0]} >> visible=true")
+    for selector in selectors[1:]:
+        locator = locator.or_(page.locator(f"{selector} >> visible=true"))
+    return locator.first
+
+
+async def wait_for_any(page: Page, selectors: Sequence[str], timeout: float) -> Optional[Locator]:
+    """
+    Wait until any of the selectors matches a visible element, sharing one timeout budget.
+
+    Args:
+        page: Playwright page
+        selectors: Selectors to race
+        timeout: Overall timeout in milliseconds
+
+    Returns:
+        Locator for the first visible match, or None if nothing appeared in time
+    """
+    locator = any_of(page, selectors)
+    try:
+        await locator.wait_for(state="visible", timeout=timeout)
+    except PlaywrightTimeout:
+        return None
+    return locator
+
+
+async def wait_for_first(
+    page: Page, selectors: Sequence[str], timeout: float
+) -> Optional[Tuple[str, Locator]]:
+    """
+    Wait for any of the selectors, then return the highest-priority one that matched.
+
+    Unlike wait_for_any (first match in document order), the selector order is
+    respected among the elements visible once something has appeared. A broad
+    fallback that renders before a more specific selector still wins, so wait for
+    generic fallbacks in a separate call when picking the wrong element matters.
+
+    Args:
+        page: Playwright page
+        selectors: Selectors in priority order
+        timeout: Overall timeout in milliseconds
+
+    Returns:
+        (selector, locator) for the best visible match, or None if nothing appeared in time
+    """
+    if await wait_for_any(page, selectors, timeout) is None:
+        return None
+    for selector in selectors:
+        locator = page.locator(f"{selector} >> visible=true").first
+        if await locator.count():
+            return selector, locator
+    return None
+
+
 # Global instance with thread safety
 _browser_manager: Optional[BrowserManager] = None
 _browser_lock = threading.Lock()
@@ -3,8 +3,6 @@
 from typing import Any, Dict, Optional
 from urllib.parse import urljoin
 
-import httpx
-
 from .config import get_settings, Mode
 from .errors import (
     NavigationError,
@@ -79,6 +77,8 @@ async def _post_json(endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
             "Generate a secure token: openssl rand -hex 32"
         )
 
+    import httpx
+
     async with httpx.AsyncClient(timeout=settings.browser_worker_timeout) as client:
         resp = await client.post(url, json=payload, headers=headers)
         data = resp.json()
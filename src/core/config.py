@@ -108,6 +108,36 @@ class Settings(BaseSettings):
     browser_worker_url: Optional[str] = Field(default=None, description="Browser worker base URL (enables Node Playwright worker)")
     browser_worker_timeout: int = Field(default=900.0, description="HTTP timeout (seconds) for browser worker requests (15 min for approval flow)")
     browser_worker_auth_token: Optional[str] = Field(default=None, description="Authentication token for browser worker API (required for production)")
+    blocked_request_domains: list[str] = Field(
+        default=[
+            "google-analytics.com",
+            "googletagmanager.com",
+            "doubleclick.net",
+            "facebook.net",
+            "facebook.com/tr",
+            "klaviyo.com",
+            "hotjar.com",
+            "intercom.io",
+            "fullstory.com",
+            "segment.io",
+            "segment.com",
+            "monorail-edge.shopifysvc.com",
+        ],
+        description="URL fragments of analytics/tracking requests to abort (JSON list; empty list disables blocking)",
+    )
+    block_web_fonts: bool = Field(default=True, description="Abort web font downloads (not needed for automation)")
+    block_media: bool = Field(
+        default=True,
+        description="Abort raster image and audio/video downloads (stylesheets are kept so visibility checks still work)",
+    )
+    humanize_typing: bool = Field(
+        default=False,
+        description="Type card details key by key with a delay instead of filling them (for keystroke-timing checks)",
+    )
+    storage_state_path: Optional[str] = Field(
+        default=None,
+        description="File to persist cookies/local storage in between runs, so a still-valid session skips login",
+    )
     
     # Retry Configuration
     max_retries: int = Field(default=3, description="Maximum retry attempts")
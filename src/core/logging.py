@@ -1,18 +1,24 @@
 """Structured logging with JSON support and sensitive data redaction."""
 
 import logging
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
 
 import structlog
-from pythonjsonlogger import jsonlogger
 
 from .config import get_settings
 
 
 def setup_logging() -> None:
-    """Configure structured logging with JSON support for cloud environments."""
+    """Configure structured logging with JSON support for cloud environments.
+
+    Loggers filter by level before processing: a call below log_level (e.g.
+    logger.debug in selector loops) returns immediately, without building the
+    event dict or running the processor chain.
+    """
     settings = get_settings()
 
     # Set log level
@@ -23,7 +29,9 @@ def setup_logging() -> None:
     logs_dir.mkdir(exist_ok=True)
 
     if settings.json_logs:
-        # JSON logging for cloud environments
+        # JSON logging for cloud environments (formatter only imported when used)
+        from pythonjsonlogger import jsonlogger
+
         # Console handler
         console_handler = logging.StreamHandler(sys.stdout)
         formatter = jsonlogger.JsonFormatter(
@@ -63,7 +71,7 @@ def setup_logging() -> None:
             ],
             context_class=dict,
             logger_factory=structlog.stdlib.LoggerFactory(),
-            wrapper_class=structlog.stdlib.BoundLogger,
+            wrapper_class=structlog.make_filtering_bound_logger(log_level),
             cache_logger_on_first_use=True,
         )
     else:
@@ -106,7 +114,7 @@ def setup_logging() -> None:
             ],
             context_class=dict,
             logger_factory=structlog.stdlib.LoggerFactory(),
-            wrapper_class=structlog.stdlib.BoundLogger,
+            wrapper_class=structlog.make_filtering_bound_logger(log_level),
             cache_logger_on_first_use=True,
         )
 
@@ -128,6 +136,12 @@ class RedactSensitiveData:
         "billing_address",
         "email",
     }
+
+    # Single compiled alternation so each key is scanned once instead of per keyword
+    _SENSITIVE_RE = re.compile(
+        "|".join(re.escape(k) for k in sorted(SENSITIVE_KEYS, key=len, reverse=True)),
+        re.IGNORECASE,
+    )
     
     def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Redact sensitive fields in log events."""
@@ -137,7 +151,7 @@ class RedactSensitiveData:
         """Recursively redact sensitive keys in a dictionary."""
         redacted = {}
         for key, value in data.items():
-            if any(sensitive in key.lower() for sensitive in self.SENSITIVE_KEYS):
+            if self._SENSITIVE_RE.search(key):
                 redacted[key] = "***REDACTED***"
             elif isinstance(value, dict):
                 redacted[key] = self._redact_dict(value)
@@ -151,6 +165,7 @@ class RedactSensitiveData:
         return redacted
 
 
+@lru_cache(maxsize=256)
 def get_logger(name: str) -> structlog.BoundLogger:
-    """Get a structured logger instance."""
+    """Get a structured logger instance (cached per name)."""
     return structlog.get_logger(name)
@@ -3,8 +3,6 @@
 from enum import Enum
 from typing import Optional
 
-import httpx
-
 from .logging import get_logger
 from .secrets import get_secret_manager
 
@@ -93,6 +91,8 @@ class PushoverClient:
         if url_title:
             payload["url_title"] = url_title
         
+        import httpx
+
         try:
             response = httpx.post(self.PUSHOVER_API_URL, data=payload, timeout=10.0)
             response.raise_for_status()
@@ -104,6 +104,8 @@ class PushoverClient:
     
     def notify_start(self, run_id: str, product_name: str) -> bool:
         """Notify that agent execution has started."""
+        if not self.enabled:
+            return False
         return self.send(
             message=f"Agent run {run_id} started for product: {product_name}",
             title="🚀 Fortaleza Agent Started",
@@ -112,6 +114,8 @@ class PushoverClient:
     
     def notify_success(self, run_id: str, product_name: str, order_number: Optional[str] = None) -> bool:
         """Notify successful purchase."""
+        if not self.enabled:
+            return False
         message = f"Successfully purchased {product_name}!"
         if order_number:
             message += f"\nOrder: {order_number}"
@@ -124,6 +128,8 @@ class PushoverClient:
     
     def notify_failure(self, run_id: str, error: str, details: Optional[str] = None) -> bool:
         """Notify purchase failure."""
+        if not self.enabled:
+            return False
         message = f"Run {run_id} failed: {error}"
         if details:
             message += f"\n\nDetails: {details}"
@@ -141,6 +147,8 @@ class PushoverClient:
         details: Optional[str] = None
     ) -> bool:
         """Notify that human intervention is required."""
+        if not self.enabled:
+            return False
         message = f"Run {run_id} requires human assistance: {reason}"
         if details:
             message += f"\n\n{details}"
@@ -153,6 +161,8 @@ class PushoverClient:
     
     def notify_sold_out(self, run_id: str, product_name: str) -> bool:
         """Notify that product is sold out."""
+        if not self.enabled:
+            return False
         return self.send(
             message=f"Product {product_name} is sold out. Agent will wait for next email notification.",
             title="⏸️ Product Sold Out",
@@ -217,6 +227,8 @@ Run ID: {run_id}"""
         message += f"\n\nReject URL: {reject_url}"
         payload["message"] = message
 
+        import httpx
+
         try:
             response = httpx.post(self.PUSHOVER_API_URL, data=payload, timeout=10.0)
             response.raise_for_status()
@@ -1,15 +1,60 @@
 """GCP Secret Manager integration for secure credential storage."""
 
-from typing import Optional
-
-from google.cloud import secretmanager
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
 
 from .config import get_settings
 from .errors import SecretNotFoundError
 from .logging import get_logger
 
+if TYPE_CHECKING:
+    from google.cloud import secretmanager
+
 logger = get_logger(__name__)
 
+SECRET_CACHE_TTL_SECONDS = 900  # How long Secret Manager values are reused in-process
+MAX_CONCURRENT_SECRET_FETCHES = 5  # Parallel Secret Manager reads in get_secrets()
+
+# Secrets read during one purchase run (login, age gate, checkout), prefetched at its start
+PURCHASE_SECRET_NAMES = (
+    "bnb_email",
+    "bnb_password",
+    "dob_month",
+    "dob_day",
+    "dob_year",
+    "cc_number",
+    "cc_exp_month",
+    "cc_exp_year",
+    "cc_cvv",
+    "cc_name",
+)
+
+# Secrets that may be provided via local environment (.env.local) as a fallback
+KNOWN_SECRETS = (
+    "bnb_email",
+    "bnb_password",
+    "cc_number",
+    "cc_exp_month",
+    "cc_exp_year",
+    "cc_cvv",
+    "cc_name",
+    "billing_name",
+    "billing_address1",
+    "billing_address2",
+    "billing_city",
+    "billing_state",
+    "billing_zip",
+    "dob_month",
+    "dob_day",
+    "dob_year",
+    "pushover_app_token",
+    "pushover_user_key",
+    "pi_webhook_shared_secret",
+    "google_api_key",
+)
+
 
 class SecretManager:
     """Manager for GCP Secret Manager access."""
@@ -17,12 +62,27 @@ class SecretManager:
     def __init__(self):
         """Initialize Secret Manager client."""
         self.settings = get_settings()
-        self.client: Optional[secretmanager.SecretManagerServiceClient] = None
+        self.client: Optional["secretmanager.SecretManagerServiceClient"] = None
+
+        # secret_name -> (value, monotonic expiry) for values fetched from GCP
+        self._cache: Dict[str, Tuple[str, float]] = {}
+        self._cache_lock = threading.Lock()  # Thread safety for concurrent access
+
+        # Cache settings reads so get_secret() avoids repeated Pydantic attribute access
+        self._project_id = self.settings.gcp_project_id
+        self._name_fmt = f"projects/{self._project_id}/secrets/{{}}/versions/latest"
+        self._local_attrs = {
+            name: getattr(self.settings, name, None) for name in KNOWN_SECRETS
+        }
         
-        if self.settings.use_secret_manager and self.settings.gcp_project_id:
+        if self.settings.use_secret_manager and self._project_id:
             try:
+                # Imported lazily: the GCP client pulls in grpc/protobuf, which is
+                # only needed when Secret Manager is actually in use
+                from google.cloud import secretmanager
+
                 self.client = secretmanager.SecretManagerServiceClient()
-                logger.info("Secret Manager client initialized", project_id=self.settings.gcp_project_id)
+                logger.info("Secret Manager client initialized", project_id=self._project_id)
             except Exception as e:
                 logger.warning("Failed to initialize Secret Manager client", error=str(e))
                 self.client = None
@@ -40,12 +100,20 @@ class SecretManager:
         Raises:
             SecretNotFoundError: If secret is not found in either GCP or local env
         """
-        # Try GCP Secret Manager first if configured
-        if self.client and self.settings.gcp_project_id:
+        # Try GCP Secret Manager first if configured (cached for SECRET_CACHE_TTL_SECONDS
+        # so repeated lookups in a run or across retries skip the network call)
+        if self.client and self._project_id:
+            with self._cache_lock:
+                cached = self._cache.get(secret_name)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+
             try:
-                name = f"projects/{self.settings.gcp_project_id}/secrets/{secret_name}/versions/latest"
+                name = self._name_fmt.format(secret_name)
                 response = self.client.access_secret_version(request={"name": name})
                 secret_value = response.payload.data.decode("UTF-8")
+                with self._cache_lock:
+                    self._cache[secret_name] = (secret_value, time.monotonic() + SECRET_CACHE_TTL_SECONDS)
                 logger.debug("Retrieved secret from GCP Secret Manager", secret_name=secret_name)
                 return secret_value
             except Exception as e:
@@ -56,7 +124,10 @@ class SecretManager:
                 )
         
         # Fallback to local environment variable
-        local_value = getattr(self.settings, secret_name, None)
+        if secret_name in self._local_attrs:
+            local_value = self._local_attrs[secret_name]
+        else:
+            local_value = getattr(self.settings, secret_name, None)
         if local_value:
             logger.debug("Retrieved secret from local environment", secret_name=secret_name)
             return local_value
@@ -66,6 +137,62 @@ class SecretManager:
             f"Secret '{secret_name}' not found in GCP Secret Manager or local environment"
         )
     
+    def get_secrets(self, secret_names: Sequence[str]) -> Dict[str, str]:
+        """
+        Get several secrets at once.
+
+        Secret Manager has no batch read, so values that are not cached are
+        fetched concurrently (one round-trip of latency instead of one per secret).
+
+        Args:
+            secret_names: Names of the secrets
+
+        Returns:
+            Dictionary of secret name to value
+
+        Raises:
+            SecretNotFoundError: If any secret is not found in either GCP or local env
+        """
+        uncached = []
+        if self.client and self._project_id:
+            now = time.monotonic()
+            with self._cache_lock:
+                uncached = [
+                    name for name in secret_names
+                    if name not in self._cache or self._cache[name][1] <= now
+                ]
+
+        fetched: Dict[str, str] = {}
+        if len(uncached) > 1:
+            workers = min(MAX_CONCURRENT_SECRET_FETCHES, len(uncached))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                fetched = dict(zip(uncached, pool.map(self.get_secret, uncached)))
+
+        return {
+            name: fetched[name] if name in fetched else self.get_secret(name)
+            for name in secret_names
+        }
+
+    def prefetch(self, secret_names: Sequence[str]) -> None:
+        """
+        Warm the cache so later lookups of these secrets are served from memory.
+
+        Errors are logged, not raised: the tool that needs a missing secret
+        reports it when it actually reads it.
+
+        Args:
+            secret_names: Names of the secrets
+        """
+        try:
+            self.get_secrets(secret_names)
+        except Exception as e:
+            logger.warning("Could not prefetch secrets", error=str(e))
+
+    def clear_cache(self) -> None:
+        """Drop cached Secret Manager values (e.g. after a secret is rotated)."""
+        with self._cache_lock:
+            self._cache.clear()
+    
     def get_credentials(self) -> dict:
         """
         Get all required credentials for the agent.
@@ -95,6 +222,14 @@ class SecretManager:
         logger.info("Successfully retrieved all credentials")
         return credentials
     
+    def get_payment_credentials(self) -> dict:
+        """Get credit card details needed at checkout."""
+        return self.get_secrets(("cc_number", "cc_exp_month", "cc_exp_year", "cc_cvv", "cc_name"))
+    
+    def get_date_of_birth(self) -> dict:
+        """Get date of birth (dob_month, dob_day, dob_year) for age verification."""
+        return self.get_secrets(("dob_month", "dob_day", "dob_year"))
+    
     def get_pushover_credentials(self) -> dict:
         """Get Pushover notification credentials."""
         return {
@@ -1,8 +1,11 @@
 """Add products to shopping cart."""
 
+import re
+
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeout
 
 from ..core import browser_service
+from ..core.browser import wait_for_any
 from ..core.logging import get_logger
 from ..core.notify import send_notification
 from ..core.errors import ProductSoldOutError
@@ -11,9 +14,47 @@ logger = get_logger(__name__)
 
 # Timeout constants (in milliseconds)
 SELECTOR_WAIT_TIMEOUT = 3000  # Standard timeout for element selectors
-SOLD_OUT_CHECK_TIMEOUT = 1000  # Quick timeout for sold out indicators
 CART_DRAWER_TIMEOUT = 5000  # Timeout for cart drawer to appear
-SUCCESS_INDICATOR_TIMEOUT = 2000  # Timeout for success indicators
+CHECKOUT_NAVIGATION_TIMEOUT = 10000  # Max wait for the checkout page after clicking CHECKOUT
+
+# Selectors for the product page ADD TO CART button
+ADD_TO_CART_SELECTORS = [
+    "button:has-text('ADD TO CART')",
+    "button:has-text('Add to Cart')",
+    "button[name='add']",
+    "button[data-add-to-cart]",
+    ".product-form__submit",
+    "[data-action='add-to-cart']",
+    "input[type='submit'][value*='Add']",
+]
+
+# Selectors for the CHECKOUT button in the cart drawer
+CHECKOUT_SELECTORS = [
+    "button:has-text('CHECKOUT')",
+    "a:has-text('CHECKOUT')",
+    "[data-checkout]",
+    ".cart-drawer__checkout",
+    "button[name='checkout']",
+]
+
+# Selectors for the cart count badge in the header
+CART_COUNT_SELECTORS = [
+    ".cart-count",
+    "[data-cart-count]",
+    ".cart__item-count",
+    "#cart-count",
+    "a[href*='cart'] span",  # Generic: link to cart with span
+]
+
+# Cart drawer indicators that the product was added (both phrases in one text scan)
+SUCCESS_INDICATOR_SELECTORS = [
+    "text=/Added to.*cart|item.*added/i",
+    ".cart-item",
+    "[data-cart-item]",
+]
+
+# Matches the first run of digits in the cart count badge (e.g. "Cart (3)")
+_DIGITS_RE = re.compile(r"\d+")
 
 
 async def add_to_cart(page: Page, proceed_to_checkout: bool = False) -> dict:
@@ -53,64 +94,27 @@ async def add_to_cart(page: Page, proceed_to_checkout: bool = False) -> dict:
     try:
         # Find and click "Add to Cart" button
         # First check if product shows NOTIFY ME button (completely sold out)
-        notify_me_selectors = [
-            "button:has-text('NOTIFY ME WHEN AVAILABLE')",
-            "button:has-text('NOTIFY ME')",
-            "button:has-text('Notify me')",
-        ]
-
-        for selector in notify_me_selectors:
-            try:
-                notify_button = await page.wait_for_selector(selector, timeout=SOLD_OUT_CHECK_TIMEOUT)
-                if notify_button:
-                    logger.info("Product shows NOTIFY ME button - sold out at all locations")
-                    raise ProductSoldOutError("Product is sold out at all locations - NOTIFY ME button present")
-            except PlaywrightTimeout:
-                continue
-
-        # Look for ADD TO CART button
-        add_to_cart_selectors = [
-            "button:has-text('ADD TO CART')",
-            "button:has-text('Add to Cart')",
-            "button[name='add']",
-            "button[data-add-to-cart]",
-            ".product-form__submit",
-            "[data-action='add-to-cart']",
-            "input[type='submit'][value*='Add']",
-        ]
-
-        add_button = None
-        for selector in add_to_cart_selectors:
-            try:
-                add_button = await page.wait_for_selector(selector, timeout=SELECTOR_WAIT_TIMEOUT)
-                if add_button:
-                    # Check if button is disabled
-                    is_disabled = await add_button.is_disabled()
-                    if not is_disabled:
-                        logger.debug("Found enabled add to cart button", selector=selector)
-                        break
-                    else:
-                        logger.debug("Button found but disabled - product may be sold out", selector=selector)
-                        add_button = None
-            except PlaywrightTimeout:
-                continue
-
-        if not add_button:
+        if await _is_sold_out(page):
+            logger.info("Product shows NOTIFY ME button - sold out at all locations")
+            raise ProductSoldOutError("Product is sold out at all locations - NOTIFY ME button present")
+
+        # Wait for a visible, enabled ADD TO CART button with one locator covering every
+        # selector (no separate is_disabled probe). Only a missing button means sold out:
+        # a click blocked by an overlay surfaces as an ordinary error below
+        add_button = page.locator(
+            ", ".join(f"{selector}:not([disabled]):visible" for selector in ADD_TO_CART_SELECTORS)
+        ).first
+        try:
+            await add_button.wait_for(state="visible", timeout=SELECTOR_WAIT_TIMEOUT)
+        except PlaywrightTimeout:
             logger.error("Could not find enabled 'Add to Cart' button")
             raise ProductSoldOutError("Product cannot be added to cart - button missing or disabled")
-        
+
         logger.info("Clicking 'Add to Cart' button")
         await add_button.click()
         
-        # Wait for cart drawer to appear from top
+        # Verify item was added: waits for the cart drawer to appear from top
         # Based on screenshot: drawer has "Added to your cart:" text
-        try:
-            await page.wait_for_selector("text=/Added to.*cart/i", timeout=CART_DRAWER_TIMEOUT)
-            logger.info("Cart drawer appeared with success message")
-        except PlaywrightTimeout:
-            logger.warning("Cart drawer success message not found, but continuing")
-
-        # Verify item was added by checking for cart indicators
         item_added = await _verify_item_added(page)
         
         if not item_added:
@@ -123,29 +127,22 @@ async def add_to_cart(page: Page, proceed_to_checkout: bool = False) -> dict:
             logger.info("Proceeding to checkout from cart drawer")
             
             # Look for CHECKOUT button in the drawer
-            checkout_selectors = [
-                "button:has-text('CHECKOUT')",
-                "a:has-text('CHECKOUT')",
-                "[data-checkout]",
-                ".cart-drawer__checkout",
-                "button[name='checkout']",
-            ]
-            
-            checkout_button = None
-            for selector in checkout_selectors:
-                try:
-                    checkout_button = await page.wait_for_selector(selector, timeout=SELECTOR_WAIT_TIMEOUT)
-                    if checkout_button:
-                        logger.debug("Found checkout button", selector=selector)
-                        break
-                except PlaywrightTimeout:
-                    continue
+            checkout_button = await wait_for_any(page, CHECKOUT_SELECTORS, timeout=SELECTOR_WAIT_TIMEOUT)
             
             if not checkout_button:
                 raise Exception("Could not find CHECKOUT button in cart drawer")
             
             await checkout_button.click()
-            await page.wait_for_load_state("domcontentloaded")
+            # Wait for the checkout page itself: the load state alone is already reached
+            # on the product page, so it resolved before the navigation even started
+            try:
+                await page.wait_for_url(
+                    lambda url: "checkout" in url.lower(),
+                    wait_until="domcontentloaded",
+                    timeout=CHECKOUT_NAVIGATION_TIMEOUT,
+                )
+            except PlaywrightTimeout:
+                logger.warning("Checkout page did not load after clicking CHECKOUT", current_url=page.url)
             
             logger.info("Clicked CHECKOUT button", current_url=page.url)
             return {
@@ -174,6 +171,27 @@ async def add_to_cart(page: Page, proceed_to_checkout: bool = False) -> dict:
         raise
 
 
+async def _is_sold_out(page: Page) -> bool:
+    """
+    Check whether the product page shows a NOTIFY ME button (sold out everywhere).
+
+    Uses a single in-page DOM sweep so the common in-stock case returns in one
+    round-trip instead of waiting on each selector in turn.
+
+    Args:
+        page: Playwright page
+
+    Returns:
+        True if a visible NOTIFY ME button is present, False otherwise
+    """
+    return await page.evaluate(
+        """() => Array.from(document.querySelectorAll('button')).some(
+            (button) => /notify me/i.test(button.textContent || '')
+                && button.getClientRects().length > 0
+        )"""
+    )
+
+
 async def _verify_item_added(page: Page) -> bool:
     """
     Verify that item was successfully added to cart.
@@ -184,22 +202,10 @@ async def _verify_item_added(page: Page) -> bool:
     Returns:
         True if item was added, False otherwise
     """
-    # Look for cart drawer success indicators
-    success_indicators = [
-        "text=/Added to.*cart/i",
-        "text=/item.*added/i",
-        ".cart-item",
-        "[data-cart-item]",
-    ]
-    
-    for selector in success_indicators:
-        try:
-            element = await page.wait_for_selector(selector, timeout=SUCCESS_INDICATOR_TIMEOUT)
-            if element:
-                logger.debug("Found cart success indicator", selector=selector)
-                return True
-        except PlaywrightTimeout:
-            continue
+    # Look for cart drawer success indicators (all raced against one timeout)
+    if await wait_for_any(page, SUCCESS_INDICATOR_SELECTORS, timeout=CART_DRAWER_TIMEOUT) is not None:
+        logger.debug("Found cart success indicator")
+        return True
 
     # Check cart count as fallback
     cart_count = await _get_cart_count(page)
@@ -221,26 +227,17 @@ async def _get_cart_count(page: Page) -> int:
         Number of items in cart, or 0 if can't determine
     """
     # Based on screenshot: cart icon in header shows count
-    cart_count_selectors = [
-        ".cart-count",
-        "[data-cart-count]",
-        ".cart__item-count",
-        "#cart-count",
-        "a[href*='cart'] span",  # Generic: link to cart with span
-    ]
-    
-    for selector in cart_count_selectors:
-        element = await page.query_selector(selector)
-        if element:
-            try:
-                count_text = await element.inner_text()
-                # Remove any non-numeric characters
-                count_str = ''.join(filter(str.isdigit, count_text))
-                if count_str:
-                    count = int(count_str)
-                    logger.debug("Found cart count", selector=selector, count=count)
-                    return count
-            except (ValueError, AttributeError):
-                continue
+    # Badge text for every selector is read in one round-trip (None where nothing matches)
+    texts = await page.evaluate(
+        "(selectors) => selectors.map((s) => document.querySelector(s)?.innerText ?? null)",
+        CART_COUNT_SELECTORS,
+    )
+    for selector, count_text in zip(CART_COUNT_SELECTORS, texts):
+        # Extract the numeric count from the badge text
+        match = _DIGITS_RE.search(count_text or "")
+        if match:
+            count = int(match.group(0))
+            logger.debug("Found cart count", selector=selector, count=count)
+            return count
     
     return 0
@@ -14,48 +14,354 @@ and includes detection for 3D Secure challenges that require manual intervention
 """
 
 import asyncio
+import re
 import time
 from typing import Optional
-from playwright.async_api import Page, TimeoutError as PlaywrightTimeout
+from playwright.async_api import Error as PlaywrightError, Page, TimeoutError as PlaywrightTimeout
 
 from ..core import browser_service
+from ..core.browser import wait_for_first
 from ..core.logging import get_logger
 from ..core.notify import get_pushover_client
 from ..core.secrets import get_secret_manager
-from ..core.config import get_settings, Mode
+from ..core.config import get_settings, Mode, Settings
 from ..core.errors import ThreeDSecureRequired, ApprovalRejectedError, ApprovalTimeoutError
-from ..core.approval import create_approval_request, get_approval_status, delete_approval_request
+from ..core.approval import approval_urls, create_approval_request, delete_approval_request, wait_for_decision
 
 logger = get_logger(__name__)
 
 # Timeout constants (in milliseconds)
 SELECTOR_WAIT_TIMEOUT = 3000  # Standard timeout for element selectors
 PICKUP_LOCATION_TIMEOUT = 2000  # Timeout for pickup location detection
-PAGE_LOAD_DELAY = 1000  # Delay after clicking pickup option
-PAYMENT_SECTION_DELAY = 1000  # Delay after scrolling to payment section
+PICKUP_SELECTED_TIMEOUT = 5000  # Max wait for the pick-up radio to show as checked after clicking it
+PAYMENT_SECTION_TIMEOUT = 2000  # Max auto-wait for the payment section heading
 CARD_NUMBER_IFRAME_TIMEOUT = 5000  # Timeout for card number iframe
 CARD_INPUT_TIMEOUT = 5000  # Timeout for card input field
-FIELD_TRANSITION_DELAY = 500  # Delay between form field transitions
-TYPING_DELAY = 30  # Delay between keystrokes (ms)
-INITIAL_TYPING_DELAY = 200  # Delay before starting to type in card field
-ORDER_SUBMISSION_DELAY = 5000  # Wait time after clicking Pay now
-SECURE_CHECK_TIMEOUT = 2000  # Timeout for 3D Secure detection
-ERROR_CHECK_TIMEOUT = 2000  # Timeout for payment error detection
-
-# Approval polling constants
+CARD_FIELD_PROBE_TIMEOUT = 1000  # Remaining card fields render with the card number field
+TYPING_DELAY_MS = 30  # Per-key delay when humanize_typing is enabled
+CHECKOUT_PAGE_TIMEOUT = 10000  # Max wait for the checkout form to render
+ORDER_SUBMISSION_TIMEOUT = 10000  # Max wait for 3D Secure / payment error / confirmation after clicking Pay now
+
+# Shopify PCI card number iframe (title="Field container for: Card number")
+CARD_NUMBER_IFRAME_SELECTOR = "iframe[title*='Field container for: Card number' i], iframe[name*='number' i]"
+
+# Remaining Shopify PCI card field iframes, filled directly when found
+CARD_FIELD_IFRAME_SELECTORS = {
+    "expiry": "iframe[title*='Field container for: Expiration date' i], iframe[name*='card-fields-expiry' i]",
+    "cvv": "iframe[title*='Field container for: Security code' i], iframe[name*='card-fields-verification_value' i]",
+    "name": "iframe[title*='Field container for: Name on card' i], iframe[name*='card-fields-name' i]",
+}
+
+# Payment section container, matched by attribute before falling back to heading text
+PAYMENT_SECTION_SELECTOR = (
+    "[data-testid*='payment' i], section[aria-labelledby*='payment' i], "
+    "section[aria-label*='payment' i], #payment-section"
+)
+
+# Structural markers of a rendered checkout page (the URL alone can still match
+# "checkout" when Shopify shows an error page under /checkouts/cn/...)
+CHECKOUT_PAGE_MARKERS = (
+    "form[action*='checkout'], [data-checkout], section[aria-label='Shopping cart'], "
+    "iframe[title*='Field container for: Card number' i]"
+)
+
+# Delivery method options rendered: a pick-up radio or label
+_PICKUP_OPTION_JS = """() => !!document.querySelector("input[type='radio'][value*='pick'], input[type='radio'][id*='pickup']")
+    || Array.from(document.querySelectorAll('label')).some((l) => /pick[- ]up/i.test(l.textContent || ''))"""
+
+# A checked delivery radio is the pick-up option (by value, id, or adjacent label)
+_PICKUP_CHECKED_JS = """() => Array.from(document.querySelectorAll("input[type='radio']")).some((radio) => {
+    const next = radio.nextElementSibling;
+    const label = next && next.tagName === 'LABEL' ? next.textContent || '' : '';
+    return radio.checked
+        && ((radio.value || '').includes('pick') || (radio.id || '').includes('pickup') || /pick/i.test(label));
+})"""
+
+# Text indicating which pickup location is selected (regex sources, case-insensitive,
+# most specific first)
+PICKUP_TEXT_PATTERNS = [
+    r"South San Francisco.*240 Grand",
+    r"San Francisco.*Fell Street",
+    r"South San Francisco",
+    r"1275 Fell Street",
+    r"240 Grand Ave",
+]
+
+# In-page search for the pickup location text. Checks every pattern in priority
+# order against the innermost visible element whose text matches, re-checking on
+# DOM mutations (at most once per frame) until one matches or the timeout elapses.
+_PICKUP_LOCATION_JS = """({ patterns, timeout }) => new Promise((resolve) => {
+    const regexes = patterns.map((p) => new RegExp(p, 'i'));
+    const textOf = (el) => (el.textContent || '').replace(/\\s+/g, ' ');
+    const find = () => {
+        if (!document.body) return null;
+        const elements = Array.from(document.body.querySelectorAll('*'))
+            .filter((el) => el.tagName !== 'SCRIPT' && el.tagName !== 'STYLE');
+        for (let i = 0; i < regexes.length; i++) {
+            const re = regexes[i];
+            const el = elements.find((e) => re.test(textOf(e))
+                && !Array.from(e.children).some((c) => re.test(textOf(c)))
+                && e.getClientRects().length > 0);
+            if (el) return { index: i, text: (el.innerText || '').split('\\n')[0].trim().slice(0, 50) };
+        }
+        return null;
+    };
+    let timer = null;
+    let scheduled = false;
+    const observer = new MutationObserver(() => {
+        if (scheduled) return;
+        scheduled = true;
+        requestAnimationFrame(() => {
+            scheduled = false;
+            const result = find();
+            if (result) finish(result);
+        });
+    });
+    const finish = (result) => {
+        observer.disconnect();
+        clearTimeout(timer);
+        resolve(result);
+    };
+    const initial = find();
+    if (initial) return resolve(initial);
+    timer = setTimeout(() => finish(null), timeout);
+    observer.observe(document.documentElement, { subtree: true, childList: true, characterData: true });
+})"""
+
+# "Pay now" / place-order button
+SUBMIT_BUTTON_SELECTORS = [
+    "button:has-text('Pay now')",
+    "button[type='submit']:has-text('Pay')",
+    "button:has-text('Complete order')",
+    "button:has-text('Place order')",
+]
+
+# Generic submit buttons, tried only after no labelled button rendered in time (a bare
+# submit button can also be e.g. the discount code "Apply" button)
+SUBMIT_BUTTON_FALLBACK_SELECTORS = [
+    "button[type='submit']",
+    "#submit-button",
+]
+
+# URLs of 3D Secure challenge frames. Frame events see frames at any depth,
+# including ones nested inside cross-origin payment iframes
+THREE_DS_FRAME_URL_RE = re.compile(r"3ds|3d-?secure|threeds|cardinalcommerce|/acs[/?]", re.IGNORECASE)
+
+# URL of the page shown once the order is placed
+CONFIRMATION_URL_RE = re.compile(r"thank|confirmation|order", re.IGNORECASE)
+
+# Snapshot taken just before clicking submit: the outcome indicators already showing on
+# the checkout page (e.g. a dismissed alert or a previous decline message) are recorded
+# so the race below only reacts to ones that appear or change after the click
+_MARK_SUBMIT_BASELINE_JS = """() => {
+    document.querySelectorAll(
+        "iframe[name*='3d'], iframe[name*='secure'], #challenge-iframe, .error-message, .payment-error, [role='alert']"
+    ).forEach((el) => {
+        if (el.getClientRects().length > 0) el.dataset.preSubmitText = (el.innerText || '').trim();
+    });
+    const text = document.body ? document.body.innerText || '' : '';
+    window.__preSubmitLines = text.split('\\n')
+        .filter((line) => /3d secure|payment.*failed|card.*declined/i.test(line));
+}"""
+
+# In-page race for the post-submit outcome. Indicators are checked in priority order
+# (3D Secure, then payment errors, then confirmation URL) on every DOM mutation, and
+# the promise resolves on the first hit or with 'none' once the timeout elapses.
+# Indicators recorded by _MARK_SUBMIT_BASELINE_JS are ignored while unchanged.
+_SUBMIT_OUTCOME_JS = """(timeout) => new Promise((resolve) => {
+    const baselineLines = new Set(window.__preSubmitLines || []);
+    const visible = (el) => el.getClientRects().length > 0;
+    const isNew = (el) => el.dataset.preSubmitText !== (el.innerText || '').trim();
+    const firstVisible = (selector) => Array.from(document.querySelectorAll(selector))
+        .find((el) => visible(el) && isNew(el) && (el.tagName === 'IFRAME' || (el.innerText || '').trim()));
+    const textLine = (re) => {
+        const text = document.body ? document.body.innerText || '' : '';
+        return text.split('\\n').find((line) => re.test(line) && !baselineLines.has(line)) || null;
+    };
+    const check = () => {
+        if (firstVisible("iframe[name*='3d'], iframe[name*='secure'], #challenge-iframe")
+            || textLine(/3d secure/i)) {
+            return { kind: '3ds' };
+        }
+        const errorEl = firstVisible(".error-message, .payment-error, [role='alert']");
+        if (errorEl) return { kind: 'error', detail: errorEl.innerText.trim() };
+        const errorText = textLine(/payment.*failed/i) || textLine(/card.*declined/i);
+        if (errorText) return { kind: 'error', detail: errorText.trim() };
+        if (/thank|confirmation|order/i.test(location.href)) return { kind: 'success' };
+        return null;
+    };
+    let timer = null;
+    const observer = new MutationObserver(() => {
+        const result = check();
+        if (result) finish(result);
+    });
+    const finish = (result) => {
+        observer.disconnect();
+        clearTimeout(timer);
+        resolve(result);
+    };
+    const initial = check();
+    if (initial) return resolve(initial);
+    timer = setTimeout(() => finish({ kind: 'none' }), timeout);
+    observer.observe(document.documentElement, {
+        subtree: true, childList: true, attributes: true, characterData: true,
+    });
+})"""
+
+# One-shot cleanup run before filling the checkout form. Tracker iframes, videos and
+# CSS animations add to the cost of every later selector and text query without
+# affecting the purchase. Only iframes served from the blocked request domains are
+# removed: other hidden frames may be payment session, fraud or 3D Secure frames.
+_STRIP_HEAVY_DOM_JS = """(blockedDomains) => {
+    let removed = 0;
+    document.querySelectorAll('iframe').forEach((frame) => {
+        const src = frame.src || '';
+        if (!src || !blockedDomains.some((domain) => src.includes(domain))) return;
+        frame.remove();
+        removed++;
+    });
+    document.querySelectorAll('video').forEach((video) => {
+        video.remove();
+        removed++;
+    });
+    const style = document.createElement('style');
+    style.textContent = '*, *::before, *::after { animation: none !important; transition: none !important; }';
+    document.head.appendChild(style);
+    return removed;
+}"""
+
+# Order summary extraction, run in one page.evaluate.
+# - Product: name in the Shopping cart section, falling back to the image alt text
+# - Totals: taken from window.Shopify.checkout when the store exposes them as decimal
+#   strings (exact, no DOM traversal). Otherwise the nearest ancestor of each label
+#   holding a price:
+#   Subtotal: grandparent contains "Subtotal\n$36.50"
+#   Tax: level 4 parent contains "Estimated taxes\n$3.61"
+#   Total: grandparent contains "Total\nUSD\n$40.11"
+# - Quantity, first strategy that yields a positive number:
+#   1. Shopify checkout line_items (window.Shopify.checkout.line_items); doesn't
+#      work on bittersandbottles.com but is free to check on other Shopify stores
+#   2. "Quantity" label with an aria-hidden sibling span (common Shopify pattern)
+#   3. Sum of quantity fields/badges found by selector
+_ORDER_SUMMARY_JS = """() => {
+    const product = () => {
+        const cell = document.querySelector("section[aria-label='Shopping cart'] [role='cell'] p");
+        const text = cell ? (cell.innerText || '').trim() : '';
+        if (text && !['quantity', 'price'].includes(text.toLowerCase())) return text;
+        const img = document.querySelector("section[aria-label='Shopping cart'] img[alt]");
+        const alt = img ? (img.getAttribute('alt') || '').trim() : '';
+        return alt || null;
+    };
+
+    const findLabel = (re) => {
+        for (const el of document.querySelectorAll('body *')) {
+            if (re.test((el.textContent || '').trim())
+                && !Array.from(el.children).some((c) => re.test((c.textContent || '').trim()))) {
+                return el;
+            }
+        }
+        return null;
+    };
+    // Walk up from the label to the nearest ancestor that also holds a price
+    // (grandparent for Subtotal/Total, level 4 parent for Estimated taxes)
+    const priceNear = (labelRe) => {
+        let el = findLabel(labelRe);
+        for (let level = 0; el && level <= 6; level++, el = el.parentElement) {
+            const lines = (el.innerText || '').split('\\n');
+            // Only consider the dollar amount that follows the label's own line (an
+            // ancestor can also hold earlier rows, e.g. Subtotal above Total)
+            const start = lines.findIndex((line) => labelRe.test(line.trim()));
+            if (start < 0) continue;
+            // Amount only, e.g. "$1,234.56" (no trailing currency codes or text)
+            const match = lines.slice(start).join('\\n').match(/\\$\\s*(\\d[\\d,]*(?:\\.\\d{2})?)/);
+            if (match) return '$' + match[1];
+        }
+        return null;
+    };
+
+    // Only decimal dollar strings ("40.11") are used. Numeric prices can be cents or
+    // whole dollars depending on the store, so they are left to the DOM-scraped totals
+    const money = (value) => {
+        if (typeof value !== 'string' || value === '') return null;
+        const amount = parseFloat(value.replace(/[^\\d.]/g, ''));
+        if (Number.isNaN(amount)) return null;
+        return '$' + amount.toLocaleString('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+    };
+    const shopifyTotals = () => {
+        try {
+            const checkout = window.Shopify?.checkout;
+            if (!checkout || checkout.total_price === undefined) return {};
+            return {
+                subtotal: money(checkout.subtotal_price),
+                tax: money(checkout.tax_price),
+                total: money(checkout.total_price),
+            };
+        } catch (e) {
+            return {};
+        }
+    };
+
+    const digits = (text) => {
+        const value = parseInt((text || '').replace(/\\D/g, ''), 10);
+        return Number.isNaN(value) ? 0 : value;
+    };
+    const quantity = () => {
+        try {
+            const items = window.Shopify?.checkout?.line_items || [];
+            const fromShopify = items.reduce((sum, item) => sum + (item.quantity || 0), 0);
+            if (fromShopify > 0) return fromShopify;
+        } catch (e) {}
+
+        const label = Array.from(document.querySelectorAll('span'))
+            .find((span) => span.textContent.trim().toLowerCase() === 'quantity');
+        const sibling = label ? label.nextElementSibling : null;
+        if (sibling && sibling.tagName === 'SPAN' && sibling.getAttribute('aria-hidden') === 'true') {
+            const match = sibling.textContent.trim().match(/\\d+/);
+            if (match && parseInt(match[0], 10) > 0) return parseInt(match[0], 10);
+        }
+
+        let total = 0;
+        document.querySelectorAll(
+            ".product__quantity, .order-summary__quantity, [data-checkout-line-item] .quantity, "
+            + ".product-table__quantity, select[data-cartitem-quantity], [data-quantity], [data-cart-item-quantity], "
+            + "select[aria-label='Quantity'], select[id^='quantity'], select[name*='quantity'], "
+            + ".product-thumbnail__quantity, span.product-thumbnail__quantity, span[class*='thumbnail__quantity'], "
+            + "span[data-order-summary-section='line-item-quantity']"
+        ).forEach((node) => {
+            if (node.tagName === 'SELECT') {
+                const option = node.querySelector('option:checked');
+                total += /^\\d+$/.test(node.value) ? parseInt(node.value, 10) : digits(option && option.innerText);
+            } else {
+                total += digits(node.innerText);
+            }
+        });
+        return total > 0 ? total : null;
+    };
+
+    const totals = shopifyTotals();
+    return {
+        product: product(),
+        subtotal: totals.subtotal || priceNear(/^Subtotal$/i),
+        tax: totals.tax || priceNear(/^Estimated taxes$/i),
+        total: totals.total || priceNear(/^Total$/i),
+        quantity: quantity(),
+    };
+}"""
+
+# Approval constants
 APPROVAL_TIMEOUT_MINUTES = 10  # Total time to wait for human approval
-APPROVAL_POLL_INTERVAL_SECONDS = 2  # How often to check approval status
 
 
-async def _request_human_approval(run_id: Optional[str], order_summary: dict) -> None:
+async def _request_human_approval(run_id: Optional[str], order_summary: dict, settings: Settings) -> None:
     """
     Request human approval for purchase via Pushover notification.
 
-    Polls for approval decision and raises appropriate exceptions if rejected or timeout.
+    Waits for the approval decision and raises appropriate exceptions if rejected or timeout.
 
     Args:
         run_id: Unique identifier for this purchase run
         order_summary: Order details to display in approval request
+        settings: Application settings (webhook config already validated by the caller)
 
     Raises:
         ApprovalRejectedError: If human rejects the purchase
@@ -77,21 +383,28 @@ async def _request_human_approval(run_id: Optional[str], order_summary: dict) ->
 
     # Send Pushover notification with approval request
     pushover_client = get_pushover_client()
-    settings = get_settings()
-
-    # Validate webhook configuration before proceeding
-    settings.validate_webhook_config()
 
     # Construct approval callback URLs using configured base URL
-    approve_url = f"{settings.webhook_base_url}/approval/{run_id}/approve"
-    reject_url = f"{settings.webhook_base_url}/approval/{run_id}/reject"
-
-    notification_sent = pushover_client.send_approval_request(
-        run_id=run_id,
-        order_summary=order_summary,
-        approve_url=approve_url,
-        reject_url=reject_url
-    )
+    approve_url, reject_url = approval_urls(settings.webhook_base_url, run_id)
+
+    # Pushover failures are usually transient (rate limit, 5xx, network blip), so retry
+    # with exponential backoff before giving up on the checkout. The blocking HTTP
+    # call runs in a thread to keep the event loop (and browser) responsive
+    notification_sent = False
+    for attempt in range(settings.max_retries + 1):
+        notification_sent = await asyncio.to_thread(
+            pushover_client.send_approval_request,
+            run_id=run_id,
+            order_summary=order_summary,
+            approve_url=approve_url,
+            reject_url=reject_url
+        )
+        if notification_sent or not pushover_client.enabled or attempt == settings.max_retries:
+            break
+        delay = settings.retry_delay * 2 ** attempt
+        logger.warning("Approval notification failed, retrying",
+                      run_id=run_id, attempt=attempt + 1, retry_in_seconds=delay)
+        await asyncio.sleep(delay)
 
     if not notification_sent:
         # Clean up approval request if notification failed
@@ -103,12 +416,10 @@ async def _request_human_approval(run_id: Optional[str], order_summary: dict) ->
         delete_approval_request(run_id)
         raise Exception("Failed to send approval notification via Pushover. Checkout aborted to prevent accidental purchase.")
 
-    # Poll for approval
-    logger.info("Polling for approval decision",
-               timeout_minutes=APPROVAL_TIMEOUT_MINUTES,
-               poll_interval_seconds=APPROVAL_POLL_INTERVAL_SECONDS)
+    # Wait for approval
+    logger.info("Waiting for approval decision", timeout_minutes=APPROVAL_TIMEOUT_MINUTES)
 
-    approval_status = await _poll_for_approval(run_id)
+    approval_status = await _wait_for_approval(run_id)
 
     if approval_status["decision"] == "approved":
         logger.info("Purchase approved by human", run_id=run_id)
@@ -123,6 +434,39 @@ async def _request_human_approval(run_id: Optional[str], order_summary: dict) ->
         raise Exception(f"Unexpected approval status: {approval_status['decision']}")
 
 
+def _raise_for_worker_error(result: dict) -> None:
+    """Raise the matching exception for a browser worker checkout error result."""
+    if result.get("status") == "error":
+        if result.get("error_type") == "ThreeDSecureRequired":
+            raise ThreeDSecureRequired(result.get("message", "3DS required"))
+        raise Exception(result.get("message", "Checkout failed"))
+
+
+async def _prepare_checkout_page(page: Page) -> bool:
+    """Wait for the checkout form, strip heavy DOM and make sure pick-up is selected.
+
+    Returns:
+        True if pick-up had to be selected (order totals may still be recalculating)
+    """
+    # Wait for the checkout form itself rather than a whole-page load state; this is
+    # the only barrier needed before the selector probes (Shopify SPA transitions can
+    # re-trigger DOMContentLoaded on a page that is already usable)
+    try:
+        await page.wait_for_function(
+            "(markers) => !!document.querySelector(markers)",
+            arg=CHECKOUT_PAGE_MARKERS,
+            timeout=CHECKOUT_PAGE_TIMEOUT,
+        )
+    except PlaywrightTimeout:
+        logger.warning("Aborting checkout - checkout form not found", current_url=page.url)
+        raise Exception(f"Not on checkout page (checkout form not found). Current URL: {page.url}")
+
+    await _strip_heavy_dom(page)
+
+    # Verify pick-up is selected (should be default)
+    return await _verify_pickup_selected(page)
+
+
 async def checkout_and_pay(page: Page, submit_order: bool = None, run_id: str = None) -> dict:
     """
     Complete checkout process with payment information.
@@ -160,70 +504,68 @@ async def checkout_and_pay(page: Page, submit_order: bool = None, run_id: str =
 
     logger.info("Starting checkout process", submit_order=submit_order, mode=settings.mode.value, run_id=run_id)
 
+    # Validate webhook configuration up front, before any checkout work, since
+    # approval callbacks can't reach us without it
+    if submit_order and run_id:
+        settings.validate_webhook_config()
+
     # Guard early when running local Python Playwright: must already be on checkout
     if not browser_service.is_enabled() and "checkout" not in page.url.lower():
         logger.warning("Aborting checkout - not on checkout page", current_url=page.url)
         raise Exception(f"Not on checkout page. Current URL: {page.url}")
 
+    # Payment details are fetched once for whichever path runs below. Secret Manager
+    # lookups block, so they run in a thread (overlapping page preparation locally)
+    fetch_payment = get_secret_manager().get_payment_credentials
+
     # Browser worker path (Node Playwright)
     if browser_service.is_enabled():
-        secret_manager = get_secret_manager()
-        payment = {
-            "cc_number": secret_manager.get_secret("cc_number"),
-            "cc_exp_month": secret_manager.get_secret("cc_exp_month"),
-            "cc_exp_year": secret_manager.get_secret("cc_exp_year"),
-            "cc_cvv": secret_manager.get_secret("cc_cvv"),
-            "cc_name": secret_manager.get_secret("cc_name"),
-        }
+        payment = await asyncio.to_thread(fetch_payment)
 
         # First, get order summary without submitting (submit_order=False temporarily)
         result = await browser_service.checkout(False, payment)
-        status = result.get("status")
-        if status == "error":
-            error_type = result.get("error_type")
-            if error_type == "ThreeDSecureRequired":
-                raise ThreeDSecureRequired(result.get("message", "3DS required"))
-            raise Exception(result.get("message", "Checkout failed"))
+        _raise_for_worker_error(result)
 
         order_summary = result.get("order_summary", {})
         logger.info("Order summary from browser worker", **order_summary)
 
         # Request human approval if submitting order
         if submit_order:
-            await _request_human_approval(run_id, order_summary)
+            await _request_human_approval(run_id, order_summary, settings)
 
             # Now submit the order for real
             logger.info("Submitting order via browser worker")
             result = await browser_service.checkout(True, payment)
-            status = result.get("status")
-            if status == "error":
-                error_type = result.get("error_type")
-                if error_type == "ThreeDSecureRequired":
-                    raise ThreeDSecureRequired(result.get("message", "3DS required"))
-                raise Exception(result.get("message", "Checkout failed"))
+            _raise_for_worker_error(result)
 
         return result
     
     try:
-        # Wait for page to fully load
-        await page.wait_for_load_state("domcontentloaded")
+        # Secret Manager lookups overlap the checkout form wait and pick-up check
+        pickup_changed, payment = await asyncio.gather(
+            _prepare_checkout_page(page), asyncio.to_thread(fetch_payment)
+        )
 
-        # Verify pick-up is selected (should be default)
-        await _verify_pickup_selected(page)
-        
-        # Detect pickup location (returns location string or None)
-        pickup_location = await _select_pickup_location(page)
-        
-        # Fill in payment information
-        await _fill_payment_info(page)
+        # Detect pickup location, fill in payment information and read the order summary
+        # concurrently - they touch independent parts of the page. If pick-up had to be
+        # selected, the totals may still be recalculating, so read them afterwards
+        tasks = [
+            _select_pickup_location(page),
+            _fill_payment_info(page, payment, slow_type=settings.humanize_typing),
+        ]
+        if not pickup_changed:
+            tasks.append(_get_order_summary(page))
+        pickup_location, _, *summaries = await asyncio.gather(*tasks)
+        order_summary = summaries[0] if summaries else await _get_order_summary(page)
         
-        # Get order summary before submitting
-        order_summary = await _get_order_summary(page, pickup_location=pickup_location)
+        order_summary["pickup_location"] = pickup_location or "unknown"
+        if not pickup_location:
+            logger.warning("Could not determine pickup location")
         logger.info("Order summary", **order_summary)
         
         if submit_order:
             # Request human approval before submitting
-            await _request_human_approval(run_id, order_summary)
+            await _request_human_approval(run_id, order_summary, settings)
 
             # Submit the order
             logger.info("Submitting order for real")
@@ -259,11 +601,11 @@ async def checkout_and_pay(page: Page, submit_order: bool = None, run_id: str =
         raise
 
 
-async def _poll_for_approval(run_id: str) -> dict:
+async def _wait_for_approval(run_id: str) -> dict:
     """
-    Poll for human approval decision.
+    Wait for human approval decision.
 
-    Polls the approval status every APPROVAL_POLL_INTERVAL_SECONDS
+    Woken by the approve/reject webhook as soon as a decision is recorded,
     for up to APPROVAL_TIMEOUT_MINUTES.
 
     Args:
@@ -273,180 +615,102 @@ async def _poll_for_approval(run_id: str) -> dict:
         dict with approval status (includes 'decision' field)
 
     Raises:
-        Exception: If approval request not found or polling fails
+        Exception: If approval request not found or no decision was made
     """
-    timeout_seconds = APPROVAL_TIMEOUT_MINUTES * 60
-    poll_count = 0
-    max_polls = timeout_seconds // APPROVAL_POLL_INTERVAL_SECONDS
-
-    while poll_count < max_polls:
-        approval_status = get_approval_status(run_id)
-
-        if not approval_status:
-            raise Exception(f"Approval request {run_id} not found")
-
-        # Check if decision has been made
-        if approval_status["decision"] is not None:
-            logger.info("Approval decision received",
-                       run_id=run_id,
-                       decision=approval_status["decision"],
-                       polls=poll_count)
-            return approval_status
-
-        # Wait before next poll
-        await asyncio.sleep(APPROVAL_POLL_INTERVAL_SECONDS)
-        poll_count += 1
-
-        if poll_count % 30 == 0:  # Log every minute
-            logger.debug("Still waiting for approval",
-                        run_id=run_id,
-                        elapsed_minutes=poll_count * APPROVAL_POLL_INTERVAL_SECONDS / 60)
-
-    # Timeout reached - check one final time
-    final_status = get_approval_status(run_id)
-    if final_status and final_status["decision"] is not None:
-        return final_status
-
-    logger.warning("Approval polling timed out", run_id=run_id)
-    raise Exception(f"Approval polling timed out after {APPROVAL_TIMEOUT_MINUTES} minutes")
-
-
-async def _verify_pickup_selected(page: Page) -> None:
-    """Verify that Pick-up delivery option is selected."""
-    # Look for selected pickup radio button
-    pickup_selectors = [
-        "input[type='radio'][value*='pick']:checked",
-        "input[type='radio'][id*='pickup']:checked",
-        "input[type='radio']:checked + label:has-text('Pick')",
-    ]
-    
-    pickup_selected = False
-    for selector in pickup_selectors:
-        element = await page.query_selector(selector)
-        if element:
-            logger.debug("Pick-up is selected", selector=selector)
-            pickup_selected = True
-            break
-    
-    if not pickup_selected:
-        # Try to find and click pickup option
-        logger.info("Pick-up not selected, attempting to select it")
-        pickup_click_selectors = [
-            "input[type='radio'][value*='pick']",
-            "label:has-text('Pick-up')",
-            "label:has-text('Pick up')",
-        ]
-        
-        for selector in pickup_click_selectors:
-            try:
-                element = await page.wait_for_selector(selector, timeout=SELECTOR_WAIT_TIMEOUT)
-                if element:
-                    await element.click()
-                    logger.info("Selected pick-up option")
-                    await page.wait_for_timeout(PAGE_LOAD_DELAY)
-                    return
-            except PlaywrightTimeout:
-                continue
-        
-        logger.warning("Could not verify pick-up is selected")
+    started = time.monotonic()
+    approval_status = await wait_for_decision(run_id, timeout_seconds=APPROVAL_TIMEOUT_MINUTES * 60)
 
+    if not approval_status:
+        raise Exception(f"Approval request {run_id} not found")
 
-async def _extract_order_quantity(page: Page) -> int | str:
-    """
-    Extract order quantity from checkout page using multiple strategies.
+    if approval_status["decision"] is not None:
+        logger.info("Approval decision received",
+                   run_id=run_id,
+                   decision=approval_status["decision"],
+                   waited_seconds=round(time.monotonic() - started, 1))
+        return approval_status
 
-    Strategy 1: Shopify checkout line_items API (window.Shopify.checkout.line_items)
-    Strategy 2: "Quantity" label with aria-hidden sibling (common Shopify pattern)
-    Strategy 3: DOM element selectors (quantity fields, spans, etc.)
+    logger.warning("Approval wait timed out", run_id=run_id)
+    raise Exception(f"Approval wait timed out after {APPROVAL_TIMEOUT_MINUTES} minutes")
 
-    Args:
-        page: Playwright page object
 
-    Returns:
-        Quantity as integer, or 'unknown' if not found
+async def _strip_heavy_dom(page: Page) -> None:
+    """Remove tracker iframes and videos and freeze animations on the checkout page.
+
+    Best effort: failures are logged and ignored.
+
+    Args:
+        page: Playwright page (on checkout)
     """
     try:
-        # Strategy 1: Prefer Shopify checkout line_items if available
-        # Note: This doesn't work on bittersandbottles.com but kept as an opportunistic
-        # first check - it's fast and might work on other Shopify stores
-        qty_from_shopify = await page.evaluate(
-            """() => {
-                try {
-                    const li = window.Shopify?.checkout?.line_items || [];
-                    return li.reduce((sum, item) => sum + (item.quantity || 0), 0);
-                } catch (e) {
-                    return null;
-                }
-            }"""
-        )
-        if qty_from_shopify and qty_from_shopify > 0:
-            return qty_from_shopify
-
-        # Strategy 2: Try to find quantity by looking for "Quantity" label followed by aria-hidden span
-        # This is the pattern used in Shopify checkout pages
-        qty_from_label = await page.evaluate(
-            """() => {
-                try {
-                    // Find all spans that contain "Quantity" text
-                    const allSpans = Array.from(document.querySelectorAll('span'));
-                    const qtyLabel = allSpans.find(span => span.textContent.trim().toLowerCase() === 'quantity');
-
-                    if (qtyLabel) {
-                        // Look for next sibling with aria-hidden="true"
-                        let nextSibling = qtyLabel.nextElementSibling;
-                        if (nextSibling && nextSibling.tagName === 'SPAN' && nextSibling.getAttribute('aria-hidden') === 'true') {
-                            const qtyText = nextSibling.textContent.trim();
-                            const match = qtyText.match(/\\d+/);
-                            return match ? parseInt(match[0], 10) : null;
-                        }
-                    }
-                    return null;
-                } catch (e) {
-                    return null;
-                }
-            }"""
-        )
+        removed = await page.evaluate(_STRIP_HEAVY_DOM_JS, get_settings().blocked_request_domains)
+        logger.debug("Stripped heavy checkout DOM", removed_elements=removed)
+    except PlaywrightError as e:
+        logger.debug("Could not strip checkout DOM", error=str(e))
 
-        if qty_from_label and qty_from_label > 0:
-            return qty_from_label
 
-        # Strategy 3: Fall back to DOM element selectors
-        qty_total = 0
-        qty_nodes = await page.query_selector_all(
-            ".product__quantity, .order-summary__quantity, [data-checkout-line-item] .quantity, "
-            ".product-table__quantity, select[data-cartitem-quantity], [data-quantity], [data-cart-item-quantity], "
-            "select[aria-label='Quantity'], select[id^='quantity'], select[name*='quantity'], "
-            ".product-thumbnail__quantity, span.product-thumbnail__quantity, span[class*='thumbnail__quantity'], "
-            "span[data-order-summary-section='line-item-quantity']"
-        )
-        for node in qty_nodes:
-            # For select elements, use value attribute; otherwise parse inner text
-            tag = (await node.evaluate("el => el.tagName")).lower()
-            if tag == "select":
-                value = await node.get_attribute("value")
-                if value and value.isdigit():
-                    qty_total += int(value)
-                else:
-                    # try selected option text
-                    option = await node.query_selector("option:checked")
-                    if option:
-                        opt_text = (await option.inner_text() or "").strip()
-                        digits = "".join(ch for ch in opt_text if ch.isdigit())
-                        if digits:
-                            qty_total += int(digits)
-            else:
-                text = (await node.inner_text() or "").strip()
-                digits = "".join(ch for ch in text if ch.isdigit())
-                if digits:
-                    qty_total += int(digits)
-
-        if qty_total > 0:
-            return qty_total
+async def _verify_pickup_selected(page: Page) -> bool:
+    """Verify that Pick-up delivery option is selected.
 
-    except Exception as e:
-        logger.debug("Could not extract quantity", error=str(e))
+    Waits for the delivery method options to render, then checks the selected
+    delivery radio and, if Pick-up is not selected, clicks it - all in one in-page
+    DOM sweep instead of probing each selector over CDP. After a click, waits for
+    the pick-up radio to show as checked before returning.
 
-    return "unknown"
+    Returns:
+        True if Pick-up had to be selected (the page is updating), False otherwise
+    """
+    try:
+        await page.wait_for_function(_PICKUP_OPTION_JS, timeout=SELECTOR_WAIT_TIMEOUT)
+    except PlaywrightTimeout:
+        logger.debug("Delivery method options not found")
+
+    status = await page.evaluate(
+        """() => {
+            const radios = Array.from(document.querySelectorAll("input[type='radio']"));
+            const labelFor = (radio) => {
+                const next = radio.nextElementSibling;
+                return next && next.tagName === 'LABEL' ? next.textContent || '' : '';
+            };
+
+            // Already selected: checked pickup radio (by value, id, or adjacent label)
+            const selected = radios.some((radio) => radio.checked && (
+                (radio.value || '').includes('pick')
+                || (radio.id || '').includes('pickup')
+                || /pick/i.test(labelFor(radio))
+            ));
+            if (selected) return 'selected';
+
+            // Not selected: click the pickup radio, or its label
+            const radio = radios.find((r) => (r.value || '').includes('pick'));
+            if (radio) {
+                radio.click();
+                return 'clicked';
+            }
+            const label = Array.from(document.querySelectorAll('label'))
+                .find((l) => /pick[- ]up/i.test(l.textContent || ''));
+            if (label) {
+                label.click();
+                return 'clicked';
+            }
+            return null;
+        }"""
+    )
+
+    if status == "selected":
+        logger.debug("Pick-up is selected")
+    elif status == "clicked":
+        logger.info("Selected pick-up option")
+        # Shopify re-renders the form after the change; the caller's concurrent pickup,
+        # payment and summary steps start only once it reports pick-up as checked
+        try:
+            await page.wait_for_function(_PICKUP_CHECKED_JS, timeout=PICKUP_SELECTED_TIMEOUT)
+        except PlaywrightTimeout:
+            logger.warning("Pick-up option did not show as selected after clicking")
+        return True
+    else:
+        logger.warning("Could not verify pick-up is selected")
+    return False
 
 
 async def _select_pickup_location(page: Page) -> Optional[str]:
@@ -460,75 +724,86 @@ async def _select_pickup_location(page: Page) -> Optional[str]:
     
     logger.info("Checking selected pickup location")
     
-    # Try to find text indicating which location is selected
-    # Look for the pickup location section
-    pickup_text_selectors = [
-        "text=/South San Francisco.*240 Grand/i",
-        "text=/San Francisco.*Fell Street/i",
-        "text=/South San Francisco/i",
-        "text=/1275 Fell Street/i",
-        "text=/240 Grand Ave/i",
-    ]
-    
-    for selector in pickup_text_selectors:
-        try:
-            element = await page.wait_for_selector(selector, timeout=PICKUP_LOCATION_TIMEOUT)
-            if element:
-                location_text = await element.inner_text()
-                # Extract just the first line (location name)
-                location = location_text.split("\n")[0].strip()[:50]
-                logger.info("Pickup location detected", location=location)
-                return location
-        except Exception:
-            continue
+    # Try to find text indicating which location is selected, racing all patterns
+    # in one in-page search (most specific pattern first)
+    try:
+        match = await page.evaluate(
+            _PICKUP_LOCATION_JS, {"patterns": PICKUP_TEXT_PATTERNS, "timeout": PICKUP_LOCATION_TIMEOUT}
+        )
+        if match and match["text"]:
+            location = match["text"]
+            logger.info("Pickup location detected", location=location)
+            return location
+    except PlaywrightError as e:
+        logger.debug("Could not read pickup location", error=str(e))
     
     logger.info("Using auto-selected pickup location (unable to verify which)")
     return None
 
 
-async def _fill_payment_info(page: Page) -> None:
-    """Fill in credit card payment information."""
+async def _fill_payment_info(page: Page, payment: dict, slow_type: bool = False) -> None:
+    """Fill in credit card payment information.
+
+    Each card field iframe is filled directly with locator.fill(). If the field
+    iframes cannot be located, falls back to filling the card number and tabbing
+    through the remaining fields with keyboard input. With slow_type (settings.
+    humanize_typing, for merchants that check keystroke timing) every field is
+    typed key by key with a delay instead.
+
+    Args:
+        page: Playwright page (on checkout)
+        payment: Card details from SecretManager.get_payment_credentials()
+        slow_type: Type every field with per-key delays via the keyboard fallback
+    """
     logger.info("Filling payment information")
     
-    # Scroll to payment section to ensure fields are loaded
-    payment_section = await page.query_selector("text=/Payment/i")
-    if payment_section:
-        await payment_section.scroll_into_view_if_needed()
-        await page.wait_for_timeout(PAYMENT_SECTION_DELAY)
+    # Scroll to payment section to ensure fields are loaded. The card iframe lookup
+    # below auto-waits, so no settle delay is needed after scrolling. Attribute
+    # anchors resolve without scanning every text node; the heading text is the fallback
+    payment_section = page.locator(PAYMENT_SECTION_SELECTOR).or_(page.get_by_text("Payment")).first
+    try:
+        await payment_section.scroll_into_view_if_needed(timeout=PAYMENT_SECTION_TIMEOUT)
         logger.debug("Scrolled to payment section")
+    except PlaywrightTimeout:
+        logger.debug("Payment section heading not found, continuing")
     
-    # Get payment info from secrets
-    secret_manager = get_secret_manager()
-    cc_number = secret_manager.get_secret("cc_number")
-    cc_exp_month = secret_manager.get_secret("cc_exp_month")
-    cc_exp_year = secret_manager.get_secret("cc_exp_year")
-    cc_cvv = secret_manager.get_secret("cc_cvv")
-    billing_name = secret_manager.get_secret("cc_name")
+    cc_number = payment["cc_number"]
+    cc_exp_month = payment["cc_exp_month"]
+    cc_exp_year = payment["cc_exp_year"]
+    cc_cvv = payment["cc_cvv"]
+    billing_name = payment["cc_name"]
+    # Digits only: the field's "MM / YY" mask inserts the separator itself, whether
+    # the value is typed key by key or set with one fill()
+    exp_value = f"{cc_exp_month.zfill(2)}{cc_exp_year[-2:]}"
     
     # Payment fields are in iframes (Shopify PCI-compliant checkout)
     # We need to find the iframes and fill them
     # Important: The iframe title="Field container for: Card number" etc.
+    if not slow_type:
+        if await _fill_card_fields(page, [cc_number, exp_value, cc_cvv, billing_name]):
+            logger.info("Payment information filled successfully", last_4=cc_number[-4:])
+            return
     
     # Fill card number (in iframe)
     logger.debug("Looking for card number iframe")
     try:
-        # Look for iframe with title containing "Card number"
-        card_number_iframe = await page.wait_for_selector(
-            "iframe[title*='Field container for: Card number' i], iframe[name*='number' i]",
-            timeout=CARD_NUMBER_IFRAME_TIMEOUT
-        )
-        if card_number_iframe:
-            card_frame = await card_number_iframe.content_frame()
-            card_input = await card_frame.wait_for_selector("input", timeout=CARD_INPUT_TIMEOUT)
-            await card_input.click(force=True)
-            await page.wait_for_timeout(INITIAL_TYPING_DELAY)
-            await card_input.type(cc_number, delay=TYPING_DELAY)
-            logger.info("Filled card number", last_4=cc_number[-4:])
-            # Press Tab to move to expiration field
-            await card_input.press("Tab")
-            await page.wait_for_timeout(FIELD_TRANSITION_DELAY)
+        # Look for iframe with title containing "Card number". A FrameLocator resolves
+        # the iframe and its input lazily with auto-wait, so no separate iframe
+        # query / content_frame() round-trips are needed
+        card_input = page.frame_locator(CARD_NUMBER_IFRAME_SELECTOR).first.locator("input").first
+        await card_input.focus(timeout=CARD_NUMBER_IFRAME_TIMEOUT + CARD_INPUT_TIMEOUT)
+        if slow_type:
+            await card_input.press_sequentially(cc_number, delay=TYPING_DELAY_MS)
         else:
-            raise Exception("Could not find card number iframe")
+            try:
+                await card_input.fill(cc_number)
+            except PlaywrightError:
+                # Field's focus handling needs a real pointer event
+                await card_input.click()
+                await card_input.fill(cc_number)
+        logger.info("Filled card number", last_4=cc_number[-4:])
+        # Press Tab to move to expiration field
+        await card_input.press("Tab")
     except Exception as e:
         logger.error("Failed to fill card number", error=str(e))
         raise
@@ -536,30 +811,34 @@ async def _fill_payment_info(page: Page) -> None:
     # Fill expiration date (focus should already be here after Tab)
     logger.debug("Filling expiration date")
     try:
-        exp_value = f"{cc_exp_month.zfill(2)}{cc_exp_year[-2:]}"
-        await page.keyboard.type(exp_value, delay=TYPING_DELAY)
+        await page.keyboard.type(exp_value, delay=TYPING_DELAY_MS if slow_type else 0)
         logger.info("Filled expiration date", value=f"{cc_exp_month}/{cc_exp_year[-2:]}")
         # Tab to CVV field
         await page.keyboard.press("Tab")
-        await page.wait_for_timeout(FIELD_TRANSITION_DELAY)
     except Exception as e:
         logger.warning("Could not fill expiration date", error=str(e))
 
     # Fill security code (CVV, focus should already be here after Tab)
     logger.debug("Filling CVV")
     try:
-        await page.keyboard.type(cc_cvv, delay=TYPING_DELAY)
+        # Single input event instead of one keydown/keyup per character
+        if slow_type:
+            await page.keyboard.type(cc_cvv, delay=TYPING_DELAY_MS)
+        else:
+            await page.keyboard.insert_text(cc_cvv)
         logger.info("Filled CVV")
         # Tab to name on card field
         await page.keyboard.press("Tab")
-        await page.wait_for_timeout(FIELD_TRANSITION_DELAY)
     except Exception as e:
         logger.warning("Could not fill CVV", error=str(e))
 
     # Fill name on card (focus should already be here after Tab)
     logger.debug("Filling name on card")
     try:
-        await page.keyboard.type(billing_name, delay=TYPING_DELAY)
+        if slow_type:
+            await page.keyboard.type(billing_name, delay=TYPING_DELAY_MS)
+        else:
+            await page.keyboard.insert_text(billing_name)
         logger.info("Filled name on card")
     except Exception as e:
         logger.warning("Could not fill name on card", error=str(e))
@@ -567,94 +846,67 @@ async def _fill_payment_info(page: Page) -> None:
     logger.info("Payment information filled successfully")
 
 
-async def _get_order_summary(page: Page, pickup_location: str | None = None) -> dict:
+async def _fill_card_fields(page: Page, values: list[str]) -> bool:
+    """Fill the card number, expiry, CVV and name iframes directly.
+
+    Waits for the card number field, then probes the other three briefly (they
+    render together, so a checkout without one of them falls back to keyboard
+    entry without waiting out the full timeout). The fills run one after another
+    so each field's blur and validation handlers finish before the next field
+    takes focus.
+
+    Args:
+        page: Playwright page (on checkout)
+        values: Card number, expiry, CVV and name on card, in that order
+
+    Returns:
+        True if all fields were filled, False if any field could not be located
+        (nothing is filled in that case)
+    """
+    selectors = [CARD_NUMBER_IFRAME_SELECTOR, *CARD_FIELD_IFRAME_SELECTORS.values()]
+    inputs = [page.frame_locator(selector).first.locator("input").first for selector in selectors]
+    try:
+        await inputs[0].wait_for(state="visible", timeout=CARD_NUMBER_IFRAME_TIMEOUT + CARD_INPUT_TIMEOUT)
+        await asyncio.gather(*(
+            field.wait_for(state="visible", timeout=CARD_FIELD_PROBE_TIMEOUT) for field in inputs[1:]
+        ))
+    except PlaywrightTimeout as e:
+        logger.debug("Card field iframes not found, falling back to keyboard entry", error=str(e))
+        return False
+
+    for field, value in zip(inputs, values):
+        await field.fill(value)
+    return True
+
+
+async def _get_order_summary(page: Page) -> dict:
     """Extract order summary information from checkout page.
 
+    The pickup location is detected separately (_select_pickup_location) and
+    filled in by the caller.
+
     Args:
         page: The Playwright page object
-        pickup_location: The pickup location string (if already detected), or None
     """
     summary = {
         "product": "unknown",
         "subtotal": "unknown",
         "tax": "unknown",
         "total": "unknown",
-        "pickup_location": pickup_location or "unknown",
+        "pickup_location": "unknown",
         "quantity": "unknown",
     }
 
-    # Try to extract product name from checkout page
+    # Product, totals and quantity are extracted in one in-page pass instead of a
+    # CDP round-trip per field (and per quantity node)
     try:
-        # Strategy 1: Look for product name in Shopping cart section
-        product_elem = await page.query_selector("section[aria-label='Shopping cart'] [role='cell'] p")
-        if product_elem:
-            text = await product_elem.inner_text()
-            if text and text.strip() and not text.strip().lower() in ['quantity', 'price']:
-                summary["product"] = text.strip()[:100]
-
-        # Strategy 2: Fallback to image alt text if not found
-        if summary["product"] == "unknown":
-            img_elem = await page.query_selector("section[aria-label='Shopping cart'] img[alt]")
-            if img_elem:
-                alt_text = await img_elem.get_attribute("alt")
-                if alt_text and alt_text.strip():
-                    summary["product"] = alt_text.strip()[:100]
+        extracted = await page.evaluate(_ORDER_SUMMARY_JS)
+        for field in ("product", "subtotal", "tax", "total", "quantity"):
+            if extracted.get(field):
+                summary[field] = extracted[field]
+        summary["product"] = summary["product"][:100]
     except Exception as e:
-        logger.debug("Could not extract product name", error=str(e))
-
-    # Try to get subtotal - grandparent contains "Subtotal\n$36.50"
-    try:
-        subtotal_elem = await page.query_selector("text=/^Subtotal$/i")
-        if subtotal_elem:
-            grandparent = await subtotal_elem.evaluate_handle("el => el.parentElement.parentElement")
-            text = await grandparent.inner_text()
-            # Extract price from text like "Subtotal\n$36.50"
-            if "$" in text:
-                price = text.split("$")[1].strip().split()[0]
-                summary["subtotal"] = f"${price}"
-    except Exception as e:
-        logger.debug("Could not get subtotal", error=str(e))
-
-    # Try to get tax - level 4 parent contains "Estimated taxes\n$3.61"
-    try:
-        tax_elem = await page.query_selector("text=/^Estimated taxes$/i")
-        if tax_elem:
-            # Go up 4 levels to find the container with both label and value
-            parent4 = await tax_elem.evaluate_handle(
-                "el => el.parentElement?.parentElement?.parentElement?.parentElement"
-            )
-            text = await parent4.inner_text()
-            # Extract price from text like "Estimated taxes\n$3.61"
-            if "$" in text:
-                # Find the dollar amount that comes AFTER "Estimated taxes" text
-                parts = text.split("$")
-                for i, part in enumerate(parts):
-                    if "estimated tax" in part.lower():
-                        # The next part should contain the tax amount
-                        if i + 1 < len(parts):
-                            price = parts[i + 1].strip().split()[0]
-                            summary["tax"] = f"${price}"
-                            break
-    except Exception as e:
-        logger.debug("Could not get tax", error=str(e))
-
-    # Try to get total - grandparent contains "Total\nUSD\n$40.11"
-    try:
-        total_elem = await page.query_selector("text=/^Total$/i")
-        if total_elem:
-            grandparent = await total_elem.evaluate_handle("el => el.parentElement.parentElement")
-            text = await grandparent.inner_text()
-            # Extract price from text like "Total\nUSD\n$40.11"
-            if "$" in text:
-                price = text.split("$")[1].strip().split()[0]
-                summary["total"] = f"${price}"
-    except Exception as e:
-        logger.debug("Could not get total", error=str(e))
-
-    # Note: pickup_location is passed in as a parameter (already detected earlier)
-
-    # Extract quantity using dedicated function with multiple strategies
-    summary["quantity"] = await _extract_order_quantity(page)
+        logger.debug("Could not extract order summary", error=str(e))
 
     # Log warnings for any fields that could not be extracted
     if summary["subtotal"] == "unknown":
@@ -663,8 +915,6 @@ async def _get_order_summary(page: Page, pickup_location: str | None = None) ->
         logger.warning("Could not extract tax from order summary")
     if summary["total"] == "unknown":
         logger.warning("Could not extract total from order summary")
-    if summary["pickup_location"] == "unknown":
-        logger.warning("Could not determine pickup location")
 
     return summary
 
@@ -674,46 +924,55 @@ async def _submit_order(page: Page) -> dict:
     logger.info("Looking for 'Pay now' button")
     
     # Based on screenshot: blue button with "Pay now"
-    submit_selectors = [
-        "button:has-text('Pay now')",
-        "button[type='submit']:has-text('Pay')",
-        "button:has-text('Complete order')",
-        "button:has-text('Place order')",
-        "button[type='submit']",
-        "#submit-button",
-    ]
-    
-    submit_button = None
-    for selector in submit_selectors:
-        try:
-            submit_button = await page.wait_for_selector(selector, timeout=SELECTOR_WAIT_TIMEOUT)
-            if submit_button:
-                logger.debug("Found submit button", selector=selector)
-                break
-        except PlaywrightTimeout:
-            continue
+    match = await wait_for_first(page, SUBMIT_BUTTON_SELECTORS, timeout=SELECTOR_WAIT_TIMEOUT)
+    if match is None:
+        logger.debug("No labelled submit button found, trying generic submit buttons")
+        match = await wait_for_first(page, SUBMIT_BUTTON_FALLBACK_SELECTORS, timeout=SELECTOR_WAIT_TIMEOUT)
 
-    if not submit_button:
+    if match is None:
         raise Exception("Could not find 'Pay now' button")
+    selector, submit_button = match
+    logger.debug("Found submit button", selector=selector)
 
-    logger.info("Clicking 'Pay now' button")
-    await submit_button.click()
+    # Flag 3D Secure challenge frames as soon as they attach or load (registered
+    # before the click so an immediate challenge is not missed)
+    three_ds_frame = asyncio.get_running_loop().create_future()
 
-    # Wait for navigation or processing
-    await page.wait_for_timeout(ORDER_SUBMISSION_DELAY)
-    
-    # Check for 3D Secure
-    if await _check_for_3d_secure(page):
+    def on_frame(frame) -> None:
+        if not three_ds_frame.done() and THREE_DS_FRAME_URL_RE.search(frame.url or ""):
+            three_ds_frame.set_result(frame.url)
+
+    page.on("frameattached", on_frame)
+    page.on("framenavigated", on_frame)
+    try:
+        await page.evaluate(_MARK_SUBMIT_BASELINE_JS)
+        logger.info("Clicking 'Pay now' button")
+        await submit_button.click()
+
+        # Wait for the order to process: returns as soon as the confirmation page loads or
+        # a 3D Secure challenge / payment error appears, instead of sleeping a fixed time
+        outcome_task = asyncio.ensure_future(_wait_for_submit_outcome(page))
+        done, _ = await asyncio.wait({outcome_task, three_ds_frame}, return_when=asyncio.FIRST_COMPLETED)
+        if outcome_task in done:
+            outcome = outcome_task.result()
+        else:
+            outcome_task.cancel()
+            logger.debug("3D Secure frame detected", frame_url=three_ds_frame.result())
+            outcome = {"kind": "3ds"}
+    finally:
+        page.remove_listener("frameattached", on_frame)
+        page.remove_listener("framenavigated", on_frame)
+        three_ds_frame.cancel()
+
+    if outcome["kind"] == "3ds":
         logger.warning("3D Secure verification required - human intervention needed")
         raise ThreeDSecureRequired("3D Secure verification required - manual intervention needed")
-    
-    # Check for errors
-    error = await _check_for_payment_error(page)
-    if error:
-        raise Exception(f"Payment failed: {error}")
+    if outcome["kind"] == "error":
+        logger.debug("Found error message", error=outcome.get("detail"))
+        raise Exception(f"Payment failed: {outcome.get('detail')}")
     
     # Verify order was placed
-    if "thank" in page.url.lower() or "confirmation" in page.url.lower() or "order" in page.url.lower():
+    if CONFIRMATION_URL_RE.search(page.url):
         logger.info("Order submitted successfully", confirmation_url=page.url)
         return {
             "confirmation_url": page.url,
@@ -727,47 +986,25 @@ async def _submit_order(page: Page) -> dict:
         }
 
 
-async def _check_for_3d_secure(page: Page) -> bool:
-    """Check if 3D Secure verification is required."""
-    secure_selectors = [
-        "iframe[name*='3d']",
-        "iframe[name*='secure']",
-        "text=/3d secure/i",
-        "text=/verify/i",
-        "#challenge-iframe",
-    ]
-    
-    for selector in secure_selectors:
-        try:
-            element = await page.wait_for_selector(selector, timeout=SECURE_CHECK_TIMEOUT)
-            if element:
-                logger.debug("Found 3D Secure indicator", selector=selector)
-                return True
-        except PlaywrightTimeout:
-            continue
+async def _wait_for_submit_outcome(page: Page) -> dict:
+    """Wait for the first post-submit outcome: 3D Secure challenge, payment error, or success.
 
-    return False
+    Races all indicators in one in-page MutationObserver instead of probing each
+    3D Secure and error selector with its own timeout. Navigations (e.g. to the
+    processing and thank-you pages) restart the race on the new document within
+    the same overall ORDER_SUBMISSION_TIMEOUT budget.
 
-
-async def _check_for_payment_error(page: Page) -> str | None:
-    """Check for payment error messages."""
-    error_selectors = [
-        ".error-message",
-        ".payment-error",
-        "[role='alert']",
-        "text=/payment.*failed/i",
-        "text=/card.*declined/i",
-        "text=/error/i",
-    ]
-
-    for selector in error_selectors:
+    Returns:
+        dict with 'kind' ('3ds', 'error', 'success', or 'none') and optional 'detail'
+    """
+    deadline = time.monotonic() + ORDER_SUBMISSION_TIMEOUT / 1000
+    while True:
+        remaining_ms = max(0, int((deadline - time.monotonic()) * 1000))
         try:
-            element = await page.wait_for_selector(selector, timeout=ERROR_CHECK_TIMEOUT)
-            if element:
-                error_text = await element.inner_text()
-                logger.debug("Found error message", selector=selector, error=error_text)
-                return error_text
-        except PlaywrightTimeout:
-            continue
-
-    return None
+            return await page.evaluate(_SUBMIT_OUTCOME_JS, remaining_ms)
+        except PlaywrightError as e:
+            # A navigation destroyed the execution context mid-race; re-check on the new document
+            if time.monotonic() >= deadline:
+                return {"kind": "none"}
+            logger.debug("Page navigated while waiting for submit outcome, re-checking", error=str(e))
+            await page.wait_for_load_state("domcontentloaded")
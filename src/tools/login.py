@@ -1,8 +1,12 @@
 """Login to Bitters & Bottles account."""
 
-from playwright.async_api import Page, TimeoutError as PlaywrightTimeout
+import asyncio
+import time
+
+from playwright.async_api import Error as PlaywrightError, Page
 
 from ..core import browser_service
+from ..core.browser import get_browser_manager, wait_for_any, wait_for_first
 from ..core.logging import get_logger
 from ..core.notify import send_notification
 from ..core.secrets import get_secret_manager
@@ -13,11 +17,123 @@ logger = get_logger(__name__)
 
 BASE_URL = "https://www.bittersandbottles.com"
 
+# Shopify sets this cookie only for a logged-in customer (unlike _secure_session_id,
+# which every visitor gets); restored with the saved storage state
+CUSTOMER_SESSION_COOKIE = "_secure_customer_sig"
+SESSION_COOKIE_MIN_TTL_SECONDS = 60  # Treat a session this close to expiry as logged out
+
 # Timeout constants (in milliseconds)
 SELECTOR_WAIT_TIMEOUT = 3000  # Standard timeout for element selectors
-TWO_FACTOR_CHECK_TIMEOUT = 1000  # Quick timeout for 2FA indicators
-ERROR_CHECK_TIMEOUT = 1000  # Quick timeout for error messages
+# 2FA/error checks run after _wait_for_login_outcome has already waited for them to appear
+TWO_FACTOR_CHECK_TIMEOUT = 500  # Quick timeout for 2FA indicators
+ERROR_CHECK_TIMEOUT = 500  # Quick timeout for error messages
 CAPTCHA_CHECK_TIMEOUT = 1000  # Quick timeout for CAPTCHA detection
+CAPTCHA_LATE_CHECK_TIMEOUT = 500  # Login form without CAPTCHA signals: catches widgets injected late
+LOGIN_SUBMIT_TIMEOUT = 20000  # Max wait for the login result (B&B takes ~14s server-side)
+
+# Login form fields and submit button (in priority order)
+EMAIL_SELECTORS = [
+    "input[name='customer[email]']",
+    "input[type='email']",
+    "input[id*='email' i]",
+    "input[placeholder*='email' i]",
+]
+
+PASSWORD_SELECTORS = [
+    "input[name='customer[password]']",
+    "input[type='password']",
+    "input[id*='password' i]",
+    "input[placeholder*='password' i]",
+]
+
+SUBMIT_SELECTORS = [
+    "button[type='submit']",
+    "input[type='submit']",
+    "button:has-text('Sign In')",
+    "button:has-text('Log In')",
+    "button:has-text('Login')",
+    ".login-button",
+    "[data-action='login']",
+]
+
+# 2FA indicators
+TWO_FACTOR_SELECTORS = [
+    "input[name*='code' i]",
+    "input[placeholder*='code' i]",
+    "text=/verification code|authenticator|two.factor/i",  # One text scan for all phrases
+    ".two-factor-form",
+    "[data-2fa]",
+]
+
+# Login error messages: message elements, and page text lines matching the phrases
+LOGIN_ERROR_ELEMENT_SELECTOR = ".error-message, .alert-error, .form-error, [role='alert']"
+LOGIN_ERROR_TEXT_PATTERN = r"incorrect password|invalid email|login failed"
+
+# Recorded just before submitting: error elements and phrases already on the login page
+# (e.g. a generic alert region or a previous attempt's message) are not new errors
+_MARK_LOGIN_ERRORS_JS = """({ selector, pattern }) => {
+    document.querySelectorAll(selector).forEach((el) => {
+        if (el.getClientRects().length > 0) el.dataset.preSubmitText = (el.innerText || '').trim();
+    });
+    const re = new RegExp(pattern, 'i');
+    const text = document.body ? document.body.innerText || '' : '';
+    window.__preSubmitLines = text.split('\\n').filter((line) => re.test(line));
+}"""
+
+# Text of the first login error that appeared or changed since _MARK_LOGIN_ERRORS_JS
+# ran, or null (a new document after navigation has no baseline)
+_NEW_LOGIN_ERROR_JS = """({ selector, pattern }) => {
+    const el = Array.from(document.querySelectorAll(selector)).find((e) => {
+        const text = (e.innerText || '').trim();
+        return text && e.getClientRects().length > 0 && e.dataset.preSubmitText !== text;
+    });
+    if (el) return el.innerText.trim();
+    const re = new RegExp(pattern, 'i');
+    const baseline = new Set(window.__preSubmitLines || []);
+    const text = document.body ? document.body.innerText || '' : '';
+    return text.split('\\n').find((line) => re.test(line) && !baseline.has(line)) || null;
+}"""
+_LOGIN_ERROR_ARG = {"selector": LOGIN_ERROR_ELEMENT_SELECTOR, "pattern": LOGIN_ERROR_TEXT_PATTERN}
+
+# CAPTCHA indicators: reCAPTCHA, hCaptcha, and generic CAPTCHA implementations
+CAPTCHA_SELECTORS = [
+    # Google reCAPTCHA v2 (checkbox and image challenge)
+    "iframe[src*='recaptcha']",
+    ".g-recaptcha",
+    "#g-recaptcha",
+    "[data-sitekey]",  # reCAPTCHA site key attribute
+
+    # hCaptcha
+    "iframe[src*='hcaptcha']",
+    ".h-captcha",
+    "#h-captcha",
+
+    # Generic CAPTCHA
+    ".captcha",
+    "#captcha",
+    "img[alt*='captcha' i]",
+    "img[src*='captcha' i]",
+    "[class*='captcha' i]",
+    "[id*='captcha' i]",
+
+    # Text indicators (one text scan for all phrases)
+    "text=/verify you are human|captcha|prove you're not a robot/i",
+]
+
+# Cheap in-page check for anything that could render a CAPTCHA: widget scripts or
+# globals, widget markers (site key, captcha classes/ids) or Shopify's bot-protection
+# challenge page. Also reports whether a login form is present, since a widget script
+# can still be injected into it after DOMContentLoaded
+_CAPTCHA_SIGNALS_JS = """() => ({
+    signals: !!(
+        window.grecaptcha || window.hcaptcha
+        || document.querySelector(
+            "script[src*='captcha' i], [data-sitekey], [class*='captcha' i], [id*='captcha' i]"
+        )
+        || location.pathname.includes('/challenge')
+    ),
+    loginForm: !!document.querySelector("input[type='password']"),
+})"""
 
 
 async def login_to_account(page: Page) -> dict:
@@ -45,18 +161,20 @@ async def login_to_account(page: Page) -> dict:
 
     # Browser worker path (Node Playwright)
     if browser_service.is_enabled():
-        secret_manager = get_secret_manager()
-        dob = {
-            "dob_month": secret_manager.get_secret("dob_month"),
-            "dob_day": secret_manager.get_secret("dob_day"),
-            "dob_year": secret_manager.get_secret("dob_year"),
-        }
-        email = secret_manager.get_secret("bnb_email")
-        password = secret_manager.get_secret("bnb_password")
-        return await browser_service.login(email, password, dob)
+        # All five lookups fetched concurrently, off the event loop
+        secrets = await asyncio.to_thread(
+            get_secret_manager().get_secrets,
+            ("bnb_email", "bnb_password", "dob_month", "dob_day", "dob_year"),
+        )
+        dob = {name: secrets[name] for name in ("dob_month", "dob_day", "dob_year")}
+        return await browser_service.login(secrets["bnb_email"], secrets["bnb_password"], dob)
     
     try:
-        # Check if already logged in
+        # Check if already logged in (a restored session cookie needs no navigation at all)
+        if await _has_session_cookie(page):
+            logger.info("Already logged in (session cookie)")
+            return {"status": "success", "message": "Already logged in"}
+
         if await _is_logged_in(page):
             logger.info("Already logged in")
             return {"status": "success", "message": "Already logged in"}
@@ -73,126 +191,94 @@ async def login_to_account(page: Page) -> dict:
         if not any(path in current_url for path in login_url_paths):
             logger.info("Navigating to login page")
             await page.goto(f"{BASE_URL}/account/login", wait_until="domcontentloaded")
+
+            # A session restored from saved storage state redirects straight to the account page
+            if await _is_logged_in(page):
+                logger.info("Already logged in (restored session)")
+                return {"status": "success", "message": "Already logged in"}
         
-        # Handle age verification if present
-        age_result = await verify_age(page)
+        # Handle age verification if present, fetching credentials from secrets meanwhile
+        age_result, credentials = await asyncio.gather(
+            verify_age(page),
+            asyncio.to_thread(get_secret_manager().get_secrets, ("bnb_email", "bnb_password")),
+        )
         if age_result["status"] == "success":
             logger.info("Age verification completed before login")
         elif age_result["status"] == "error":
             raise Exception(f"Age verification failed: {age_result['message']}")
 
-        # Get credentials from secrets
-        secret_manager = get_secret_manager()
-        email = secret_manager.get_secret("bnb_email")
-        password = secret_manager.get_secret("bnb_password")
+        email = credentials["bnb_email"]
+        password = credentials["bnb_password"]
 
         logger.info("Filling login form", email=email[:3] + "***")
 
-        # Check for CAPTCHA before attempting to find login fields
+        # Check for CAPTCHA while locating the login fields, so the CAPTCHA check's
+        # timeout (the normal case: no CAPTCHA) overlaps the field lookups
         # CAPTCHA can appear on login page and overlay/replace the form
-        if await _check_for_captcha(page):
+        captcha, email_match, password_match = await asyncio.gather(
+            _check_for_captcha(page),
+            wait_for_first(page, EMAIL_SELECTORS, timeout=SELECTOR_WAIT_TIMEOUT),
+            wait_for_first(page, PASSWORD_SELECTORS, timeout=SELECTOR_WAIT_TIMEOUT),
+        )
+        if captcha:
             logger.warning("CAPTCHA detected on login page - human intervention needed")
             raise CaptchaRequired("CAPTCHA challenge detected - manual intervention needed")
 
-        # Find and fill email field
-        email_selectors = [
-            "input[name='customer[email]']",
-            "input[type='email']",
-            "input[id*='email' i]",
-            "input[placeholder*='email' i]",
-        ]
-        
-        email_input = None
-        for selector in email_selectors:
-            try:
-                email_input = await page.wait_for_selector(selector, timeout=SELECTOR_WAIT_TIMEOUT)
-                if email_input:
-                    logger.debug("Found email input", selector=selector)
-                    break
-            except PlaywrightTimeout:
-                continue
-        
-        if not email_input:
+        # Fill email field
+        if email_match is None:
             raise Exception("Could not find email input field")
+        selector, email_input = email_match
+        logger.debug("Found email input", selector=selector)
         
         await email_input.fill(email)
         
-        # Find and fill password field
-        password_selectors = [
-            "input[name='customer[password]']",
-            "input[type='password']",
-            "input[id*='password' i]",
-            "input[placeholder*='password' i]",
-        ]
-        
-        password_input = None
-        for selector in password_selectors:
-            try:
-                password_input = await page.wait_for_selector(selector, timeout=SELECTOR_WAIT_TIMEOUT)
-                if password_input:
-                    logger.debug("Found password input", selector=selector)
-                    break
-            except PlaywrightTimeout:
-                continue
-        
-        if not password_input:
+        # Fill password field
+        if password_match is None:
             raise Exception("Could not find password input field")
+        selector, password_input = password_match
+        logger.debug("Found password input", selector=selector)
         
         await password_input.fill(password)
         
         # Find and click submit button
-        submit_selectors = [
-            "button[type='submit']",
-            "input[type='submit']",
-            "button:has-text('Sign In')",
-            "button:has-text('Log In')",
-            "button:has-text('Login')",
-            ".login-button",
-            "[data-action='login']",
-        ]
-        
-        submit_button = None
-        for selector in submit_selectors:
-            try:
-                submit_button = await page.wait_for_selector(selector, timeout=SELECTOR_WAIT_TIMEOUT)
-                if submit_button:
-                    logger.debug("Found submit button", selector=selector)
-                    break
-            except PlaywrightTimeout:
-                continue
-        
-        if not submit_button:
+        match = await wait_for_first(page, SUBMIT_SELECTORS, timeout=SELECTOR_WAIT_TIMEOUT)
+        if match is None:
             raise Exception("Could not find submit button")
+        selector, submit_button = match
+        logger.debug("Found submit button", selector=selector)
         
         logger.info("Submitting login form")
+        await page.evaluate(_MARK_LOGIN_ERRORS_JS, _LOGIN_ERROR_ARG)
         await submit_button.click()
 
-        # Wait for navigation to complete
+        # Wait for navigation away from the login page (or a 2FA prompt / error)
         # Note: B&B website takes ~14s to process login server-side
-        await page.wait_for_load_state("domcontentloaded")
+        await _wait_for_login_outcome(page)
 
-        # Check for 2FA
-        if await _check_for_2fa(page):
+        # Check for 2FA and login errors (concurrently, so a clean login pays one short timeout)
+        needs_2fa, error = await asyncio.gather(_check_for_2fa(page), _check_for_login_error(page))
+        if needs_2fa:
             logger.warning("2FA required - human intervention needed")
             raise TwoFactorRequired("Two-factor authentication required - manual intervention needed")
 
-        # Check for login errors
-        error = await _check_for_login_error(page)
         if error:
             raise Exception(f"Login failed: {error}")
 
         # Verify login was successful by checking URL
         # The logout link is hidden in hamburger menu, so URL is more reliable
-        if "/account" in page.url.lower():
+        url = page.url.lower()
+        if "/account" in url:
             logger.info("Login successful", current_url=page.url)
+            await get_browser_manager().save_storage_state()
             return {"status": "success", "message": "Login successful"}
 
         # Fallback: still on login page means login failed
-        if "/login" in page.url.lower():
+        if "/login" in url:
             raise Exception("Login failed - still on login page")
 
         # If we're somewhere else, assume success
         logger.info("Login appears successful", current_url=page.url)
+        await get_browser_manager().save_storage_state()
         return {"status": "success", "message": "Login successful"}
 
     except CaptchaRequired as e:
@@ -229,7 +315,8 @@ async def _is_logged_in(page: Page) -> bool:
         True if logged in, False otherwise
     """
     # First check URL - most reliable indicator
-    if "/account" in page.url.lower() and "/login" not in page.url.lower():
+    url = page.url.lower()
+    if "/account" in url and "/login" not in url:
         logger.debug("Detected logged in via URL", url=page.url)
         return True
     
@@ -238,6 +325,63 @@ async def _is_logged_in(page: Page) -> bool:
     return False
 
 
+async def _has_session_cookie(page: Page) -> bool:
+    """
+    Check the browser context for a logged-in customer session cookie.
+
+    Only a cookie with an expiry counts. A session cookie (expires == -1) may have
+    been restored from storage state saved days ago and revoked since, so it is
+    left to the /account/login redirect check to confirm.
+
+    Args:
+        page: Playwright page
+
+    Returns:
+        True if the cookie is present and not about to expire, False otherwise
+    """
+    min_expiry = time.time() + SESSION_COOKIE_MIN_TTL_SECONDS
+    for cookie in await page.context.cookies(BASE_URL):
+        if cookie["name"] == CUSTOMER_SESSION_COOKIE and cookie["expires"] > min_expiry:
+            logger.debug("Found customer session cookie")
+            return True
+    return False
+
+
+async def _wait_for_login_outcome(page: Page) -> None:
+    """
+    Wait until the login submission leaves the login page or shows a 2FA prompt or a new error.
+
+    Returns as soon as one of them happens (waiting on the load state alone resolves
+    immediately, since the login page itself is already loaded). Error messages
+    already on the page before submitting don't count. The caller's 2FA, error and
+    URL checks then classify the result.
+
+    Args:
+        page: Playwright page
+    """
+    left_login = asyncio.ensure_future(page.wait_for_url(
+        lambda url: "/login" not in url.lower(),
+        wait_until="domcontentloaded",
+        timeout=LOGIN_SUBMIT_TIMEOUT,
+    ))
+    two_factor = asyncio.ensure_future(wait_for_any(page, TWO_FACTOR_SELECTORS, timeout=LOGIN_SUBMIT_TIMEOUT))
+    new_error = asyncio.ensure_future(
+        page.wait_for_function(_NEW_LOGIN_ERROR_JS, arg=_LOGIN_ERROR_ARG, timeout=LOGIN_SUBMIT_TIMEOUT)
+    )
+    pending = {left_login, two_factor, new_error}
+    try:
+        # A wait that fails (e.g. the error check torn down by the redirect) doesn't end the race
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if [task for task in done if task.exception() is None]:
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+    if left_login.done() and not left_login.cancelled() and left_login.exception() is not None:
+        logger.debug("Still on login page after submitting", error=str(left_login.exception()))
+
+
 async def _check_for_2fa(page: Page) -> bool:
     """
     Check if 2FA is required.
@@ -248,25 +392,10 @@ async def _check_for_2fa(page: Page) -> bool:
     Returns:
         True if 2FA is required, False otherwise
     """
-    # Look for 2FA indicators
-    twofa_selectors = [
-        "input[name*='code' i]",
-        "input[placeholder*='code' i]",
-        "text=/verification code/i",
-        "text=/authenticator/i",
-        "text=/two.factor/i",
-        ".two-factor-form",
-        "[data-2fa]",
-    ]
-    
-    for selector in twofa_selectors:
-        try:
-            element = await page.wait_for_selector(selector, timeout=TWO_FACTOR_CHECK_TIMEOUT)
-            if element:
-                logger.debug("Found 2FA indicator", selector=selector)
-                return True
-        except PlaywrightTimeout:
-            continue
+    # Look for 2FA indicators (one wait for any indicator instead of a timeout per selector)
+    if await wait_for_any(page, TWO_FACTOR_SELECTORS, timeout=TWO_FACTOR_CHECK_TIMEOUT) is not None:
+        logger.debug("Found 2FA indicator")
+        return True
 
     return False
 
@@ -281,28 +410,14 @@ async def _check_for_login_error(page: Page) -> str | None:
     Returns:
         Error message if found, None otherwise
     """
-    # Look for error messages
-    error_selectors = [
-        ".error-message",
-        ".alert-error",
-        ".form-error",
-        "[role='alert']",
-        "text=/incorrect password/i",
-        "text=/invalid email/i",
-        "text=/login failed/i",
-    ]
-
-    for selector in error_selectors:
-        try:
-            element = await page.wait_for_selector(selector, timeout=ERROR_CHECK_TIMEOUT)
-            if element:
-                error_text = await element.inner_text()
-                logger.debug("Found error message", selector=selector, error=error_text)
-                return error_text
-        except PlaywrightTimeout:
-            continue
-
-    return None
+    # Look for error messages that were not on the page before submitting
+    try:
+        handle = await page.wait_for_function(_NEW_LOGIN_ERROR_JS, arg=_LOGIN_ERROR_ARG, timeout=ERROR_CHECK_TIMEOUT)
+    except PlaywrightError:
+        return None
+    error_text = await handle.json_value()
+    logger.debug("Found error message", error=error_text)
+    return error_text
 
 
 async def _check_for_captcha(page: Page) -> bool:
@@ -315,44 +430,22 @@ async def _check_for_captcha(page: Page) -> bool:
     Returns:
         True if CAPTCHA is detected, False otherwise
     """
+    # Skip the selector probe (and its timeout) when nothing on the page can render a
+    # CAPTCHA; a login form still gets a short probe for a widget injected late
+    timeout = CAPTCHA_CHECK_TIMEOUT
+    try:
+        signals = await page.evaluate(_CAPTCHA_SIGNALS_JS)
+        if not signals["signals"]:
+            if not signals["loginForm"]:
+                return False
+            timeout = CAPTCHA_LATE_CHECK_TIMEOUT
+    except PlaywrightError as e:
+        logger.debug("Could not check for CAPTCHA scripts, probing selectors", error=str(e))
+
     # Look for common CAPTCHA indicators
-    # Covers reCAPTCHA, hCaptcha, and generic CAPTCHA implementations
-    captcha_selectors = [
-        # Google reCAPTCHA v2 (checkbox and image challenge)
-        "iframe[src*='recaptcha']",
-        ".g-recaptcha",
-        "#g-recaptcha",
-        "[data-sitekey]",  # reCAPTCHA site key attribute
-
-        # hCaptcha
-        "iframe[src*='hcaptcha']",
-        ".h-captcha",
-        "#h-captcha",
-
-        # Generic CAPTCHA
-        ".captcha",
-        "#captcha",
-        "img[alt*='captcha' i]",
-        "img[src*='captcha' i]",
-        "[class*='captcha' i]",
-        "[id*='captcha' i]",
-
-        # Text indicators
-        "text=/verify you are human/i",
-        "text=/captcha/i",
-        "text=/prove you're not a robot/i",
-    ]
-
-    for selector in captcha_selectors:
-        try:
-            # Use shorter timeout for CAPTCHA check
-            element = await page.wait_for_selector(selector, timeout=CAPTCHA_CHECK_TIMEOUT)
-            if element:
-                # Additional check: ensure element is visible
-                if await element.is_visible():
-                    logger.debug("Found CAPTCHA indicator", selector=selector)
-                    return True
-        except PlaywrightTimeout:
-            continue
+    # Only visible indicators count; all selectors share one short timeout
+    if await wait_for_any(page, CAPTCHA_SELECTORS, timeout=timeout) is not None:
+        logger.debug("Found CAPTCHA indicator")
+        return True
 
     return False
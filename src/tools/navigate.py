@@ -2,26 +2,65 @@
 
 import re
 from typing import Optional
+from urllib.parse import urlparse
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeout
 
 from ..core import browser_service
-from ..core.browser import get_browser_manager
+from ..core.browser import get_browser_manager, wait_for_any, wait_for_first
 from ..core.config import get_settings
 from ..core.errors import NavigationError, ProtocolError, PageNotFoundError, UnexpectedPageError
 from ..core.secrets import get_secret_manager
 from ..core.logging import get_logger
-from .verify_age import verify_age
+from .verify_age import AGE_OVERLAY_SELECTORS, verify_age
 
 logger = get_logger(__name__)
 
 BASE_URL = "https://www.bittersandbottles.com"
 
 # Timeout constants (in milliseconds)
-TRACKING_REDIRECT_WAIT_MS = 5000  # Wait for trk.bittersandbottles.com redirects to complete
+TRACKING_REDIRECT_WAIT_MS = 5000  # Max wait for trk.bittersandbottles.com redirects to complete
 SEARCH_BUTTON_TIMEOUT = 2000  # Timeout for finding search button/icon
 SEARCH_INPUT_TIMEOUT = 5000  # Timeout for search input field to appear
-SEARCH_SUGGESTIONS_WAIT_MS = 1000  # Wait for search suggestions dropdown to populate
-SEARCH_RESULTS_WAIT_MS = 2000  # Wait for search results page to load
+SEARCH_SUGGESTIONS_TIMEOUT = 1000  # Max wait for the product to show up in search suggestions
+SEARCH_RESULTS_TIMEOUT = 2000  # Max wait for an exact match on the search results page
+SEARCH_PAGE_TIMEOUT = 10000  # Max wait for the search results page to load after pressing Enter
+AGE_MODAL_PROBE_TIMEOUT = 500  # Short wait for an age gate overlay injected after DOMContentLoaded
+
+# Selectors for the search icon (magnifying glass), in priority order:
+# 1. SVG icon with search-related class
+# 2. Button/link with search icon
+# 3. Data attributes
+# 4. Role-based selectors
+SEARCH_BUTTON_SELECTORS = [
+    "svg.icon-search",  # SVG with search class
+    ".icon-search",  # Any element with search class
+    "[data-search-toggle]",  # Data attribute
+    "button:has(svg[class*='search'])",  # Button containing search SVG
+    "a:has(svg[class*='search'])",  # Link containing search SVG
+    ".header__search",  # Header search element
+    "[aria-label='Search']",  # Accessible label
+    "button[aria-label='Search']",
+]
+
+# Search box revealed by the search icon
+SEARCH_INPUT_SELECTOR = "input[type='search'], input[name='q'], .search__input, input[placeholder*='Search' i]"
+
+# Product links for a product slug, filled in with str.format(slug=...)
+# Suggestions dropdown: product links (/products/), not search query links (/search?q=)
+SUGGESTION_SELECTOR_TEMPLATES = (
+    "a[href^='/products/'][href*='{slug}']",  # Product link (not search)
+    ".predictive-search a[href^='/products/'][href*='{slug}']",
+    "a[href*='products/{slug}']",  # More specific product path
+)
+# Full search results page
+RESULT_SELECTOR_TEMPLATES = (
+    "a[href*='{slug}'][href*='products']",  # Exact match
+    ".productitem a[href*='{slug}']",  # Product item with exact
+)
+
+# Product page indicators: price and add-to-cart button
+PRODUCT_PRICE_SELECTOR = ".price, [data-price], .product-price"
+PRODUCT_ADD_TO_CART_SELECTOR = "button[name='add'], .add-to-cart, [data-add-to-cart]"
 
 # Product scoring constants
 MIN_WORD_MATCH_THRESHOLD = 2  # Minimum number of matching words required for product scoring
@@ -35,9 +74,9 @@ async def navigate_to_product(
     Navigate to product page using direct link with search fallback.
 
     Page Lifecycle:
-    - Creates a new page via browser.new_page()
+    - Borrows a page via browser.acquire_page() (an idle released page, or a new one)
     - Returns page in result dict
-    - Caller MUST manage page lifecycle (close old page before assigning new one)
+    - Caller MUST manage page lifecycle (release old page before assigning new one)
     - On failure, page is closed automatically before raising NavigationError
 
     Args:
@@ -56,11 +95,7 @@ async def navigate_to_product(
     # Remote browser worker path (Node Playwright on Pi)
     if browser_service.is_enabled():
         secret_manager = get_secret_manager()
-        dob = {
-            "dob_month": secret_manager.get_secret("dob_month"),
-            "dob_day": secret_manager.get_secret("dob_day"),
-            "dob_year": secret_manager.get_secret("dob_year"),
-        }
+        dob = secret_manager.get_date_of_birth()
         result = await browser_service.navigate(direct_link, product_name, dob)
         return {
             "status": result.get("status", "error"),
@@ -71,29 +106,38 @@ async def navigate_to_product(
         }
 
     browser = get_browser_manager()
-    page = await browser.new_page()
+    page = await browser.acquire_page()
 
     try:
         logger.info("Navigating to direct link", url=direct_link)
 
-        # Navigate and wait for redirects to complete (tracking links may redirect multiple times)
-        response = await page.goto(direct_link, wait_until="domcontentloaded")
+        # Returns once the response commits: the 404 and tracking-domain checks only need the
+        # status and URL, so a bad link fails over without waiting for its DOM to parse
+        response = await page.goto(direct_link, wait_until="commit")
+
+        # Check for 404
+        if response and response.status == 404:
+            logger.warning("Direct link returned 404", url=direct_link)
+            raise PageNotFoundError(f"Page not found: {direct_link}")
 
         # Only wait for JavaScript redirects if we're on a tracking domain
         # Direct product links don't need this wait (saves 5 seconds per navigation)
         if "trk." in page.url:
             logger.debug("On tracking domain, waiting for redirect", url=page.url)
-            await page.wait_for_timeout(TRACKING_REDIRECT_WAIT_MS)
-
-            # Check if we're still on tracking domain after wait (shouldn't happen)
-            if "trk." in page.url:
+            try:
+                # Returns as soon as the redirect lands instead of sleeping the full wait
+                await page.wait_for_url(
+                    lambda url: "trk." not in url,
+                    wait_until="domcontentloaded",
+                    timeout=TRACKING_REDIRECT_WAIT_MS,
+                )
+            except PlaywrightTimeout:
+                # Still on tracking domain after wait (shouldn't happen)
                 logger.warning("Stuck on tracking domain after redirect wait", url=page.url)
                 raise ProtocolError(f"Failed to redirect from tracking link: {page.url}")
-        
-        # Check for 404
-        if response and response.status == 404:
-            logger.warning("Direct link returned 404", url=direct_link)
-            raise PageNotFoundError(f"Page not found: {direct_link}")
+
+        # Product checks need the parsed page (resolves at once if already there)
+        await page.wait_for_load_state("domcontentloaded")
         
         # Verify we're on a product page
         is_product_page = await _verify_product_page(page)
@@ -158,9 +202,11 @@ async def _verify_product_page(page: Page) -> bool:
         if '/products/' in url and '/search' not in url and '/collections' not in url:
             logger.debug("URL indicates product page", url=url)
 
-            # Check for essential product page indicators
-            has_price = await page.query_selector(".price, [data-price], .product-price") is not None
-            has_add_to_cart = await page.query_selector("button[name='add'], .add-to-cart, [data-add-to-cart]") is not None
+            # Check for essential product page indicators (both in one round-trip)
+            has_price, has_add_to_cart = await page.evaluate(
+                "(selectors) => selectors.map((selector) => !!document.querySelector(selector))",
+                [PRODUCT_PRICE_SELECTOR, PRODUCT_ADD_TO_CART_SELECTOR],
+            )
 
             # If we have price or add to cart button, it's a product page
             if has_price or has_add_to_cart:
@@ -174,6 +220,43 @@ async def _verify_product_page(page: Page) -> bool:
         return False
 
 
+async def _has_search_button(page: Page) -> bool:
+    """
+    Check (without waiting) whether the page's header has a search icon.
+
+    Args:
+        page: Playwright page
+
+    Returns:
+        True if any search icon selector matches, False otherwise
+    """
+    try:
+        return await page.evaluate(
+            "(selector) => !!document.querySelector(selector)", ", ".join(SEARCH_BUTTON_SELECTORS)
+        )
+    except Exception as e:
+        logger.debug("Could not check for search button", error=str(e))
+        return False
+
+
+async def _age_modal_present(page: Page) -> bool:
+    """
+    Briefly wait for a visible age verification overlay.
+
+    verify_age waits up to 5s for an overlay to become visible, which is pure
+    overhead once the age gate cookie is set and no overlay is shown. The short
+    wait still catches age gate apps that inject their overlay just after
+    DOMContentLoaded, and gates left in the DOM but hidden don't count.
+
+    Args:
+        page: Playwright page
+
+    Returns:
+        True if an overlay became visible within AGE_MODAL_PROBE_TIMEOUT, False otherwise
+    """
+    return await wait_for_any(page, AGE_OVERLAY_SELECTORS, timeout=AGE_MODAL_PROBE_TIMEOUT) is not None
+
+
 async def _search_for_product(page: Page, product_name: str) -> dict:
     """
     Navigate to homepage and search for product.
@@ -196,14 +279,20 @@ async def _search_for_product(page: Page, product_name: str) -> dict:
     Raises:
         NavigationError: If search fails
     """
-    logger.info("Navigating to homepage for search", product_name=product_name)
-    
-    # Navigate to homepage
-    await page.goto(BASE_URL, wait_until="domcontentloaded")
+    # Reuse the current page if it is already a store page with the search icon (e.g. the
+    # failed direct link served the site's 404 page); otherwise load the homepage
+    on_store = urlparse(page.url).netloc == urlparse(BASE_URL).netloc
+    if on_store:
+        await page.wait_for_load_state("domcontentloaded")  # Direct link may still be parsing
+    if on_store and await _has_search_button(page):
+        logger.info("Searching from current page", url=page.url, product_name=product_name)
+    else:
+        logger.info("Navigating to homepage for search", product_name=product_name)
+        await page.goto(BASE_URL, wait_until="domcontentloaded")
     
-    # Handle age verification if present
-    age_result = await verify_age(page)
+    # Handle age verification if present (skip the full check when no overlay is in the DOM)
     age_verified = False
+    age_result = await verify_age(page) if await _age_modal_present(page) else {"status": "not_found"}
     if age_result["status"] == "success":
         logger.info("Age verification completed before search")
         age_verified = True
@@ -213,115 +302,86 @@ async def _search_for_product(page: Page, product_name: str) -> dict:
     # Find and click search icon/button
     try:
         # Try multiple selector strategies for search icon (magnifying glass)
-        # 1. SVG icon with search-related class
-        # 2. Button/link with search icon
-        # 3. Data attributes
-        # 4. Role-based selectors
-        search_selectors = [
-            "svg.icon-search",  # SVG with search class
-            ".icon-search",  # Any element with search class
-            "[data-search-toggle]",  # Data attribute
-            "button:has(svg[class*='search'])",  # Button containing search SVG
-            "a:has(svg[class*='search'])",  # Link containing search SVG  
-            ".header__search",  # Header search element
-            "[aria-label='Search']",  # Accessible label
-            "button[aria-label='Search']",
-        ]
-        
-        search_button = None
-        for selector in search_selectors:
-            try:
-                search_button = await page.wait_for_selector(selector, timeout=SEARCH_BUTTON_TIMEOUT)
-                if search_button:
-                    logger.debug("Found search button", selector=selector)
-                    break
-            except PlaywrightTimeout:
-                continue
-        
-        if not search_button:
+        match = await wait_for_first(page, SEARCH_BUTTON_SELECTORS, timeout=SEARCH_BUTTON_TIMEOUT)
+        if match is None:
             raise NavigationError("Could not find search button/icon")
+        selector, search_button = match
+        logger.debug("Found search button", selector=selector)
         
         await search_button.click()
         
         # Check for age verification again after clicking (modal may appear now)
-        # But skip if we already verified - no need to wait for a modal that won't appear
-        if not age_verified:
+        # But skip if we already verified or no overlay is in the DOM - no need to wait for a modal that won't appear
+        if not age_verified and await _age_modal_present(page):
             age_result = await verify_age(page)
             if age_result["status"] == "success":
                 logger.info("Age verification completed after search click")
             elif age_result["status"] == "error":
                 raise NavigationError(f"Age verification failed: {age_result['message']}")
         else:
-            logger.debug("Skipping second age verification check (already verified)")
+            logger.debug("Skipping second age verification check (already verified or no overlay)")
         
         # Wait for search input to appear
-        search_input = await page.wait_for_selector(
-            "input[type='search'], input[name='q'], .search__input, input[placeholder*='Search' i]",
-            timeout=SEARCH_INPUT_TIMEOUT
-        )
+        search_input = await page.wait_for_selector(SEARCH_INPUT_SELECTOR, timeout=SEARCH_INPUT_TIMEOUT)
         
         # Type product name to show search suggestions
         await search_input.fill(product_name)
 
-        # Wait for search suggestions dropdown to populate
-        await page.wait_for_timeout(SEARCH_SUGGESTIONS_WAIT_MS)
-        
         # Look for product in the suggestions dropdown (under "Products" section)
         # Note: Suggestions contain both search queries (/search?q=) and products (/products/)
         # We want the product link, not the search query link
         product_name_lower = re.sub(r'\s+', '-', product_name.lower())
-        suggestion_selectors = [
-            f"a[href^='/products/'][href*='{product_name_lower}']",  # Product link (not search)
-            f".predictive-search a[href^='/products/'][href*='{product_name_lower}']",
-            f"a[href*='products/{product_name_lower}']",  # More specific product path
-        ]
+        suggestion_selectors = [template.format(slug=product_name_lower) for template in SUGGESTION_SELECTOR_TEMPLATES]
         
+        # Returns as soon as the dropdown shows the product instead of sleeping first
         product_link = None
-        for selector in suggestion_selectors:
-            product_link = await page.query_selector(selector)
-            if product_link:
-                logger.info("Found product in search suggestions", selector=selector)
-                break
+        match = await wait_for_first(page, suggestion_selectors, timeout=SEARCH_SUGGESTIONS_TIMEOUT)
+        if match is not None:
+            selector, product_link = match
+            logger.info("Found product in search suggestions", selector=selector)
         
         if not product_link:
             # Fallback: press Enter and go to search results page
             logger.info("Product not in suggestions, trying full search results")
             await search_input.press("Enter")
-            await page.wait_for_load_state("domcontentloaded")
-            await page.wait_for_timeout(SEARCH_RESULTS_WAIT_MS)
+            # Wait for the results page itself: the homepage's load state is already reached,
+            # so waiting on it alone could scan the old page's links
+            try:
+                await page.wait_for_url("**/search**", wait_until="domcontentloaded", timeout=SEARCH_PAGE_TIMEOUT)
+            except PlaywrightTimeout:
+                logger.warning("Search results page did not load", current_url=page.url)
             
             # Try to find in search results with word-based scoring
             # Split product name into words for flexible matching
             name_parts = product_name_lower.split('-')
 
             # First try exact match
-            result_selectors = [
-                f"a[href*='{product_name_lower}'][href*='products']",  # Exact match
-                f".productitem a[href*='{product_name_lower}']",       # Product item with exact
-            ]
+            result_selectors = [template.format(slug=product_name_lower) for template in RESULT_SELECTOR_TEMPLATES]
 
-            for selector in result_selectors:
-                try:
-                    product_link = await page.query_selector(selector)
-                    if product_link:
-                        href = await product_link.get_attribute('href')
-                        logger.debug("Found exact product match", selector=selector, href=href)
-                        break
-                except Exception:
-                    continue
+            # Waiting for an exact match also gives the results time to render
+            # before falling back to scoring every product link
+            match = await wait_for_first(page, result_selectors, timeout=SEARCH_RESULTS_TIMEOUT)
+            if match is not None:
+                selector, product_link = match
+                href = await product_link.get_attribute('href')
+                logger.debug("Found exact product match", selector=selector, href=href)
 
             # If no exact match, find best partial match by scoring all product links
             if not product_link:
                 logger.info("No exact match, scoring all product links", name_parts=name_parts)
                 try:
-                    # Get all product links from search results
-                    all_product_links = await page.query_selector_all("a[href*='products']")
+                    # Get every product link's href from search results in one round-trip
+                    # (instead of one get_attribute call per link)
+                    product_links = page.locator("a[href*='products']")
+                    hrefs = await product_links.evaluate_all(
+                        "links => links.map((link) => link.getAttribute('href'))"
+                    )
 
                     best_link = None
+                    best_href = None
                     best_score = 0
 
-                    for link in all_product_links:
-                        href = await link.get_attribute('href')
+                    for index, href in enumerate(hrefs):
                         if not href or '/search' in href or '/collections' in href:
                             continue
 
@@ -332,15 +392,15 @@ async def _search_for_product(page: Page, product_name: str) -> dict:
 
                         if score > best_score:
                             best_score = score
-                            best_link = link
+                            best_link = product_links.nth(index)
+                            best_href = href
 
                     # Adjust threshold dynamically for single-word products
                     min_threshold = min(MIN_WORD_MATCH_THRESHOLD, len(name_parts))
 
                     if best_link and best_score >= min_threshold:
                         product_link = best_link
-                        href = await product_link.get_attribute('href')
-                        logger.info("Found best matching product", href=href, score=best_score, max_score=len(name_parts), threshold=min_threshold)
+                        logger.info("Found best matching product", href=best_href, score=best_score, max_score=len(name_parts), threshold=min_threshold)
                     else:
                         logger.warning("No good product match found", best_score=best_score, threshold=min_threshold)
 
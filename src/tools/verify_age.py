@@ -3,11 +3,52 @@
 from playwright.async_api import Page, TimeoutError as PlaywrightTimeout
 
 from ..core import browser_service
+from ..core.browser import wait_for_first
 from ..core.logging import get_logger
 from ..core.secrets import get_secret_manager
 
 logger = get_logger(__name__)
 
+# Age verification overlays
+AGE_OVERLAY_SELECTORS = [
+    ".age-verification",  # BittersAndBottles specific
+    ".m-a-v-overlay",
+    ".age-verification-overlay",
+    ".age-gate",
+    "[data-age-verification]",
+    ".modal-age-verification",
+]
+
+# Simple "I am over 21" confirmation buttons
+AGE_CONFIRM_BUTTON_SELECTORS = [
+    "button.age-verification__popup-close",  # BittersAndBottles specific
+    "button:has-text('Yes I am')",
+    "button:has-text('Over 21')",
+    "button:has-text('OVER 21')",
+    "button:has-text('Yes')",
+    "button:has-text('YES')",
+    "a:has-text('Enter')",
+    "button:has-text('Enter')",
+    "button:has-text('I am 21')",
+    ".age-verification-yes",
+    "[data-age-yes]",
+]
+
+# Date of birth fields (date entry style gates)
+DOB_MONTH_SELECTORS = ["select[name='month']", "input[name='month']", "#age-month", "[placeholder*='Month' i]"]
+DOB_DAY_SELECTORS = ["select[name='day']", "input[name='day']", "#age-day", "[placeholder*='Day' i]"]
+DOB_YEAR_SELECTORS = ["select[name='year']", "input[name='year']", "#age-year", "[placeholder*='Year' i]"]
+
+# Date entry form submit button
+AGE_SUBMIT_SELECTORS = [
+    "button[type='submit']",
+    "button:has-text('Enter')",
+    "button:has-text('Confirm')",
+    "button:has-text('Yes')",
+    ".age-verification-submit",
+    "[data-age-submit]",
+]
+
 
 async def verify_age(page: Page) -> dict:
     """
@@ -27,91 +68,49 @@ async def verify_age(page: Page) -> dict:
     # Browser worker path (Node Playwright)
     if browser_service.is_enabled():
         secret_manager = get_secret_manager()
-        dob = {
-            "dob_month": secret_manager.get_secret("dob_month"),
-            "dob_day": secret_manager.get_secret("dob_day"),
-            "dob_year": secret_manager.get_secret("dob_year"),
-        }
+        dob = secret_manager.get_date_of_birth()
         return await browser_service.verify_age(dob)
 
     try:
         # Check if age verification overlay is present
-        # Common selectors for age verification modals
-        overlay_selectors = [
-            ".age-verification",  # BittersAndBottles specific
-            ".m-a-v-overlay",
-            ".age-verification-overlay",
-            ".age-gate",
-            "[data-age-verification]",
-            ".modal-age-verification",
-        ]
-
-        overlay = None
-        matched_selector = None
-        for selector in overlay_selectors:
-            try:
-                # Increase timeout - modal may take a moment to appear
-                overlay = await page.wait_for_selector(selector, timeout=5000)
-                if overlay:
-                    matched_selector = selector
-                    logger.info("Age verification overlay found", selector=selector)
-                    break
-            except PlaywrightTimeout:
-                continue
-
-        if not overlay:
+        # Modal may take a moment to appear; all selectors share one wait
+        match = await wait_for_first(page, AGE_OVERLAY_SELECTORS, timeout=5000)
+        if match is None:
             logger.info("No age verification modal found")
             return {"status": "not_found", "message": "No age verification required"}
+        matched_selector, _ = match
+        logger.info("Age verification overlay found", selector=matched_selector)
         
         logger.info("Handling age verification")
         
         # First try the common simple confirmation buttons
-        simple_button_selectors = [
-            "button.age-verification__popup-close",  # BittersAndBottles specific
-            "button:has-text('Yes I am')",
-            "button:has-text('Over 21')",
-            "button:has-text('OVER 21')",
-            "button:has-text('Yes')",
-            "button:has-text('YES')",
-            "a:has-text('Enter')",
-            "button:has-text('Enter')",
-            "button:has-text('I am 21')",
-            ".age-verification-yes",
-            "[data-age-yes]",
-        ]
-        
-        simple_button = None
-        for selector in simple_button_selectors:
+        match = await wait_for_first(page, AGE_CONFIRM_BUTTON_SELECTORS, timeout=2000)
+        if match is not None:
+            selector, simple_button = match
+            logger.info("Found age confirmation button", selector=selector)
+            await simple_button.click()
+            logger.info("Clicked age confirmation button")
+
+            # Wait for modal to disappear - use the selector that matched
             try:
-                simple_button = await page.wait_for_selector(selector, timeout=2000)
-                if simple_button:
-                    logger.info("Found age confirmation button", selector=selector)
-                    await simple_button.click()
-                    logger.info("Clicked age confirmation button")
-
-                    # Wait for modal to disappear - use the selector that matched
-                    try:
-                        await page.wait_for_selector(matched_selector, state="hidden", timeout=10000)
-                        logger.info("Age verification modal closed")
-                    except PlaywrightTimeout:
-                        logger.error("Age verification modal did not close after clicking button")
-                        return {
-                            "status": "error",
-                            "message": "Modal did not close after submission - may need manual intervention"
-                        }
-
-                    return {"status": "success", "message": "Age verification completed (button)"}
+                await page.wait_for_selector(matched_selector, state="hidden", timeout=10000)
+                logger.info("Age verification modal closed")
             except PlaywrightTimeout:
-                continue
+                logger.error("Age verification modal did not close after clicking button")
+                return {
+                    "status": "error",
+                    "message": "Modal did not close after submission - may need manual intervention"
+                }
+
+            return {"status": "success", "message": "Age verification completed (button)"}
         
         # Fallback: date entry style gates
         logger.info("No simple confirmation button found, trying date entry form")
         
         # Get date of birth from secrets
         secret_manager = get_secret_manager()
-        dob_month = secret_manager.get_secret("dob_month")
-        dob_day = secret_manager.get_secret("dob_day")
-        dob_year = secret_manager.get_secret("dob_year")
+        dob = secret_manager.get_date_of_birth()
+        dob_month, dob_day, dob_year = dob["dob_month"], dob["dob_day"], dob["dob_year"]
         
         logger.info("Filling age verification form")
         
@@ -119,23 +118,9 @@ async def verify_age(page: Page) -> dict:
         # Different sites use different input patterns
         
         # Pattern 1: Separate dropdowns/inputs for month, day, year
-        month_filled = await _fill_field(
-            page,
-            ["select[name='month']", "input[name='month']", "#age-month", "[placeholder*='Month' i]"],
-            dob_month
-        )
-        
-        day_filled = await _fill_field(
-            page,
-            ["select[name='day']", "input[name='day']", "#age-day", "[placeholder*='Day' i]"],
-            dob_day
-        )
-        
-        year_filled = await _fill_field(
-            page,
-            ["select[name='year']", "input[name='year']", "#age-year", "[placeholder*='Year' i]"],
-            dob_year
-        )
+        month_filled = await _fill_field(page, DOB_MONTH_SELECTORS, dob_month)
+        day_filled = await _fill_field(page, DOB_DAY_SELECTORS, dob_day)
+        year_filled = await _fill_field(page, DOB_YEAR_SELECTORS, dob_year)
         
         if not (month_filled and day_filled and year_filled):
             logger.warning("Could not find all date fields")
@@ -147,28 +132,12 @@ async def verify_age(page: Page) -> dict:
                 logger.info("Filled single date input")
         
         # Look for submit button
-        submit_selectors = [
-            "button[type='submit']",
-            "button:has-text('Enter')",
-            "button:has-text('Confirm')",
-            "button:has-text('Yes')",
-            ".age-verification-submit",
-            "[data-age-submit]",
-        ]
-        
-        submit_button = None
-        for selector in submit_selectors:
-            try:
-                submit_button = await page.wait_for_selector(selector, timeout=2000)
-                if submit_button:
-                    logger.debug("Found submit button", selector=selector)
-                    break
-            except PlaywrightTimeout:
-                continue
-        
-        if not submit_button:
+        match = await wait_for_first(page, AGE_SUBMIT_SELECTORS, timeout=2000)
+        if match is None:
             logger.error("Could not find age verification submit button")
             return {"status": "error", "message": "Submit button not found"}
+        selector, submit_button = match
+        logger.debug("Found submit button", selector=selector)
         
         # Click submit
         await submit_button.click()
@@ -210,22 +179,25 @@ async def _fill_field(page: Page, selectors: list[str], value: str) -> bool:
     Returns:
         True if field was found and filled, False otherwise
     """
-    for selector in selectors:
+    # Find which selectors match and the tag of each match in one round-trip
+    matches = await page.evaluate(
+        """(selectors) => selectors
+            .map((selector) => [selector, document.querySelector(selector)?.tagName])
+            .filter(([, tag]) => tag)""",
+        selectors,
+    )
+    for selector, tag_name in matches:
         try:
-            element = await page.query_selector(selector)
-            if element:
-                # Check if it's a select or input
-                tag_name = await element.evaluate("el => el.tagName")
-                
-                if tag_name.lower() == "select":
-                    # For select, use selectOption
-                    await element.select_option(value=value)
-                else:
-                    # For input, use fill
-                    await element.fill(value)
-                
-                logger.debug("Filled field", selector=selector, tag=tag_name)
-                return True
+            element = page.locator(selector).first
+            if tag_name.lower() == "select":
+                # For select, use selectOption
+                await element.select_option(value=value)
+            else:
+                # For input, use fill
+                await element.fill(value)
+
+            logger.debug("Filled field", selector=selector, tag=tag_name)
+            return True
         except Exception as e:
             logger.debug("Could not fill field", selector=selector, error=str(e))
             continue
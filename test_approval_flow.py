@@ -21,7 +21,7 @@ from datetime import datetime
 # Add to path
 sys.path.insert(0, '.')
 
-from src.core.approval import create_approval_request, get_approval_status
+from src.core.approval import create_approval_request, wait_for_decision
 from src.core.notify import get_pushover_client
 from src.core.secrets import get_secret_manager
 
@@ -112,16 +112,16 @@ async def test_approval_flow():
         print(f"❌ Error sending notification: {e}")
         return
 
-    # Poll for decision
+    # Wait for decision
     print("Waiting for your decision...")
-    print("(Will check every 2 seconds for up to 5 minutes)")
+    print("(Returns as soon as you decide, for up to 5 minutes)")
     print()
 
-    max_polls = 150  # 5 minutes
-    poll_count = 0
+    progress_interval = 20  # seconds between progress messages
+    max_waits = 15  # 5 minutes
 
-    while poll_count < max_polls:
-        status = get_approval_status(run_id)
+    for wait_count in range(max_waits):
+        status = await wait_for_decision(run_id, timeout_seconds=progress_interval)
 
         if status and status["decision"] is not None:
             print()
@@ -148,12 +148,8 @@ async def test_approval_flow():
             return
 
         # Progress indicator
-        if poll_count % 10 == 0:
-            elapsed = poll_count * 2
-            print(f"  Still waiting... ({elapsed}s elapsed)")
-
-        await asyncio.sleep(2)
-        poll_count += 1
+        elapsed = (wait_count + 1) * progress_interval
+        print(f"  Still waiting... ({elapsed}s elapsed)")
 
     print()
     print("⏱️  Timeout reached (5 minutes)")
@@ -1,13 +1,20 @@
 """Unit tests for approval module."""
+import asyncio
+import threading
+
 import pytest
 from datetime import datetime, timezone, timedelta
 
 from src.core.approval import (
+    approval_urls,
     create_approval_request,
     approve_request,
     reject_request,
     get_approval_status,
     cleanup_old_approvals,
+    delete_approval_request,
+    wait_for_decision,
+    _approval_events,
     _pending_approvals,
     _approvals_lock
 )
@@ -43,6 +50,17 @@ class TestApprovalCreation:
         assert status2["order_summary"]["total"] == "$60"
 
 
+class TestApprovalUrls:
+    """Tests for approval callback URLs."""
+
+    def test_approval_urls(self):
+        """Test approve/reject URLs match the webhook routes."""
+        approve_url, reject_url = approval_urls("https://agent.run.app", "run-1")
+
+        assert approve_url == "https://agent.run.app/approval/run-1/approve"
+        assert reject_url == "https://agent.run.app/approval/run-1/reject"
+
+
 class TestApprovalDecisions:
     """Tests for approval and rejection."""
 
@@ -169,6 +187,75 @@ class TestCleanup:
         assert status is not None
 
 
+class TestWaitForDecision:
+    """Tests for waiting on an approval decision."""
+
+    async def test_wait_returns_when_approved(self):
+        """Test the waiter wakes up as soon as the request is approved."""
+        create_approval_request("test-wait-approve", {"total": "$40"})
+
+        asyncio.get_running_loop().call_later(0.05, approve_request, "test-wait-approve")
+        status = await wait_for_decision("test-wait-approve", timeout_seconds=5)
+
+        assert status["decision"] == "approved"
+        assert "test-wait-approve" not in _approval_events
+
+    async def test_wait_woken_from_another_thread(self):
+        """Test a rejection recorded on another thread wakes the waiter."""
+        create_approval_request("test-wait-thread", {"total": "$40"})
+
+        timer = threading.Timer(0.05, reject_request, args=("test-wait-thread",))
+        timer.start()
+        status = await wait_for_decision("test-wait-thread", timeout_seconds=5)
+        timer.join()
+
+        assert status["decision"] == "rejected"
+
+    async def test_wait_returns_immediately_if_already_decided(self):
+        """Test no waiting happens when the decision already exists."""
+        create_approval_request("test-wait-decided", {"total": "$40"})
+        approve_request("test-wait-decided")
+
+        status = await wait_for_decision("test-wait-decided", timeout_seconds=5)
+
+        assert status["decision"] == "approved"
+
+    async def test_wait_times_out_without_decision(self):
+        """Test the current pending state is returned on timeout."""
+        create_approval_request("test-wait-timeout", {"total": "$40"})
+
+        status = await wait_for_decision("test-wait-timeout", timeout_seconds=0.05)
+
+        assert status["decision"] is None
+        assert "test-wait-timeout" not in _approval_events
+
+    async def test_wait_unknown_request(self):
+        """Test waiting on an unknown run_id returns None."""
+        assert await wait_for_decision("test-wait-unknown", timeout_seconds=0.05) is None
+
+    async def test_wait_woken_by_delete(self):
+        """Test deleting the request wakes the waiter."""
+        create_approval_request("test-wait-delete", {"total": "$40"})
+
+        asyncio.get_running_loop().call_later(0.05, delete_approval_request, "test-wait-delete")
+        status = await asyncio.wait_for(wait_for_decision("test-wait-delete", timeout_seconds=5), timeout=1)
+
+        assert status is None
+
+    async def test_concurrent_waiters_all_woken(self):
+        """Test every waiter on the same run_id is woken by one decision."""
+        create_approval_request("test-wait-many", {"total": "$40"})
+
+        asyncio.get_running_loop().call_later(0.05, approve_request, "test-wait-many")
+        statuses = await asyncio.gather(
+            wait_for_decision("test-wait-many", timeout_seconds=5),
+            wait_for_decision("test-wait-many", timeout_seconds=5),
+        )
+
+        assert [s["decision"] for s in statuses] == ["approved", "approved"]
+        assert "test-wait-many" not in _approval_events
+
+
 class TestThreadSafety:
     """Tests for thread safety."""
 
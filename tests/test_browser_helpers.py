@@ -0,0 +1,197 @@
+"""Unit tests for Playwright selector helpers in src.core.browser."""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeout
+
+from src.core.browser import BrowserManager, any_of, blocked_request_pattern, wait_for_any, wait_for_first
+
+
+def _mock_page():
+    """Create a mock page whose locators chain via or_()."""
+    page = MagicMock()
+    locators = {}
+
+    def make_locator(selector):
+        locator = MagicMock(name=selector)
+        locator.or_.side_effect = lambda other: locator
+        locator.first.wait_for = AsyncMock()
+        locators[selector] = locator
+        return locator
+
+    page.locator.side_effect = make_locator
+    return page, locators
+
+
+def test_any_of_combines_all_selectors_as_visible():
+    """Test any_of builds one locator covering every selector."""
+    page, locators = _mock_page()
+
+    any_of(page, [".a", "text=/b/i", "#c"])
+
+    assert list(locators) == [
+        ".a >> visible=true",
+        "text=/b/i >> visible=true",
+        "#c >> visible=true",
+    ]
+    assert locators[".a >> visible=true"].or_.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_wait_for_any_returns_locator_on_match():
+    """Test wait_for_any returns the combined locator when something appears."""
+    page, locators = _mock_page()
+
+    result = await wait_for_any(page, [".a", ".b"], timeout=1000)
+
+    first = locators[".a >> visible=true"].first
+    assert result is first
+    first.wait_for.assert_awaited_once_with(state="visible", timeout=1000)
+
+
+@pytest.mark.asyncio
+async def test_wait_for_any_returns_none_on_timeout():
+    """Test wait_for_any returns None instead of raising on timeout."""
+    page = MagicMock()
+    locator = MagicMock()
+    locator.or_.return_value = locator
+    locator.first.wait_for = AsyncMock(side_effect=PlaywrightTimeout("timeout"))
+    page.locator.return_value = locator
+
+    assert await wait_for_any(page, [".a", ".b"], timeout=10) is None
+
+
+@pytest.mark.asyncio
+async def test_wait_for_first_prefers_selector_order():
+    """Test wait_for_first returns the highest-priority visible selector."""
+    page, locators = _mock_page()
+
+    def make_locator(selector):
+        locator = MagicMock(name=selector)
+        locator.or_.side_effect = lambda other: locator
+        locator.first.wait_for = AsyncMock()
+        # Only the second and third selectors are on the page
+        locator.first.count = AsyncMock(return_value=0 if selector.startswith(".a") else 1)
+        locators[selector] = locator
+        return locator
+
+    page.locator.side_effect = make_locator
+
+    selector, locator = await wait_for_first(page, [".a", ".b", ".c"], timeout=1000)
+
+    assert selector == ".b"
+    assert locator is locators[".b >> visible=true"].first
+
+
+@pytest.mark.asyncio
+async def test_wait_for_first_returns_none_on_timeout():
+    """Test wait_for_first returns None when nothing appears."""
+    page = MagicMock()
+    locator = MagicMock()
+    locator.or_.return_value = locator
+    locator.first.wait_for = AsyncMock(side_effect=PlaywrightTimeout("timeout"))
+    page.locator.return_value = locator
+
+    assert await wait_for_first(page, [".a", ".b"], timeout=10) is None
+
+
+def test_blocked_request_pattern_matches_trackers_and_fonts():
+    """Test blocked_request_pattern matches configured domains and font files."""
+    pattern = blocked_request_pattern(["google-analytics.com", "facebook.com/tr"], block_fonts=True)
+
+    assert pattern.search("https://www.google-analytics.com/g/collect?v=2")
+    assert pattern.search("https://www.facebook.com/tr?id=1")
+    assert pattern.search("https://cdn.shopify.com/fonts/inter.woff2?v=3")
+    assert not pattern.search("https://www.bittersandbottles.com/checkouts/cn/abc")
+    assert not pattern.search("https://www.facebook.com/bittersandbottles")
+
+
+def test_blocked_request_pattern_matches_media():
+    """Test blocked_request_pattern blocks raster images and media but not SVG icons."""
+    pattern = blocked_request_pattern([], block_media=True)
+
+    assert pattern.search("https://cdn.shopify.com/s/files/1/products/fortaleza.jpg?v=17")
+    assert pattern.search("https://cdn.shopify.com/videos/promo.mp4")
+    assert not pattern.search("https://cdn.shopify.com/s/files/1/icon-search.svg")
+    assert not pattern.search("https://checkout.pci.shopifyinc.com/build/card-fields.js")
+
+
+def test_blocked_request_pattern_disabled():
+    """Test no pattern is built when nothing is blocked."""
+    assert blocked_request_pattern([], block_fonts=False) is None
+
+
+@pytest.mark.asyncio
+async def test_save_storage_state_writes_private_file(tmp_path):
+    """Test the saved session state is written to the configured path, owner-only."""
+    path = tmp_path / "state" / "storage.json"
+    manager = BrowserManager()
+    manager.settings = MagicMock(storage_state_path=str(path))
+    manager.context = MagicMock()
+    manager.context.storage_state = AsyncMock(return_value={"cookies": [], "origins": []})
+
+    await manager.save_storage_state()
+
+    assert json.loads(path.read_text()) == {"cookies": [], "origins": []}
+    assert path.stat().st_mode & 0o777 == 0o600
+
+
+@pytest.mark.asyncio
+async def test_save_storage_state_swallows_playwright_errors(tmp_path):
+    """Test a failure to read the context state does not escape (login already succeeded)."""
+    manager = BrowserManager()
+    manager.settings = MagicMock(storage_state_path=str(tmp_path / "storage.json"))
+    manager.context = MagicMock()
+    manager.context.storage_state = AsyncMock(side_effect=PlaywrightError("Target closed"))
+
+    await manager.save_storage_state()
+
+    assert not (tmp_path / "storage.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_save_storage_state_disabled_without_path():
+    """Test nothing is saved when no storage state path is configured."""
+    manager = BrowserManager()
+    manager.settings = MagicMock(storage_state_path=None)
+    manager.context = MagicMock()
+    manager.context.storage_state = AsyncMock()
+
+    await manager.save_storage_state()
+
+    manager.context.storage_state.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_released_page_is_reused():
+    """Test acquire_page hands back a released page instead of creating one."""
+    manager = BrowserManager()
+    manager.context = MagicMock()
+    page = MagicMock()
+    page.is_closed.return_value = False
+    page.goto = AsyncMock()
+    manager.context.new_page = AsyncMock(return_value=page)
+
+    first = await manager.acquire_page()
+    await manager.release_page(first)
+    second = await manager.acquire_page()
+
+    assert second is first
+    page.goto.assert_awaited_once_with("about:blank")
+    manager.context.new_page.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_acquire_page_skips_closed_idle_pages():
+    """Test idle pages closed since release are discarded."""
+    manager = BrowserManager()
+    manager.context = MagicMock()
+    stale = MagicMock()
+    stale.is_closed.return_value = True
+    manager._idle_pages.append(stale)
+    fresh = MagicMock()
+    manager.context.new_page = AsyncMock(return_value=fresh)
+
+    assert await manager.acquire_page() is fresh
@@ -1,6 +1,11 @@
 """Pytest tests for checkout functionality."""
 
 import pytest
+from unittest.mock import MagicMock
+
+from src.core.config import Settings
+from src.core.approval import delete_approval_request, get_approval_status
+from src.tools import checkout
 from src.tools.checkout import checkout_and_pay
 
 
@@ -42,3 +47,40 @@ async def test_checkout_verifies_on_checkout_page(page):
         await checkout_and_pay(page, submit_order=False)
 
 
+@pytest.fixture
+def approval_settings():
+    """Settings with a webhook URL and no retry delay."""
+    return Settings(webhook_base_url="https://agent.example.com", retry_delay=0, max_retries=3)
+
+
+async def test_approval_notification_retried_until_sent(monkeypatch, approval_settings):
+    """Test transient Pushover failures are retried before waiting for approval."""
+    pushover = MagicMock(enabled=True)
+    pushover.send_approval_request.side_effect = [False, False, True]
+    monkeypatch.setattr(checkout, "get_pushover_client", lambda: pushover)
+
+    async def approved(run_id):
+        return {"decision": "approved"}
+
+    monkeypatch.setattr(checkout, "_wait_for_approval", approved)
+
+    try:
+        await checkout._request_human_approval("test-retry-1", {"total": "$40"}, approval_settings)
+
+        assert pushover.send_approval_request.call_count == 3
+    finally:
+        delete_approval_request("test-retry-1")
+    assert get_approval_status("test-retry-1") is None
+
+
+async def test_approval_notification_gives_up_after_max_retries(monkeypatch, approval_settings):
+    """Test checkout aborts and cleans up once all notification attempts fail."""
+    pushover = MagicMock(enabled=True)
+    pushover.send_approval_request.return_value = False
+    monkeypatch.setattr(checkout, "get_pushover_client", lambda: pushover)
+
+    with pytest.raises(Exception, match="Failed to send approval notification"):
+        await checkout._request_human_approval("test-retry-2", {"total": "$40"}, approval_settings)
+
+    assert pushover.send_approval_request.call_count == 4
+    assert get_approval_status("test-retry-2") is None
@@ -1,7 +1,18 @@
 """Pytest tests for login functionality."""
 
+import time
+
 import pytest
-from src.tools.login import login_to_account
+from unittest.mock import AsyncMock, MagicMock, patch
+from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+from src.tools.login import (
+    CAPTCHA_LATE_CHECK_TIMEOUT,
+    _check_for_captcha,
+    _check_for_login_error,
+    _has_session_cookie,
+    login_to_account,
+)
 
 
 @pytest.mark.integration
@@ -20,3 +31,49 @@ async def test_login_success(page):
     
     # Verify we're on account page after login
     assert "/account" in page.url.lower(), f"Should be on account page, but at: {page.url}"
+
+
+async def test_check_for_captcha_skips_probe_without_captcha_scripts():
+    """Test the selector probe is skipped when no CAPTCHA script or login form is on the page."""
+    page = MagicMock()
+    page.evaluate = AsyncMock(return_value={"signals": False, "loginForm": False})
+
+    assert await _check_for_captcha(page) is False
+    page.locator.assert_not_called()
+
+
+async def test_check_for_captcha_probes_login_form_briefly():
+    """Test a login form is still probed for a late-injected CAPTCHA, with the short timeout."""
+    page = MagicMock()
+    page.evaluate = AsyncMock(return_value={"signals": False, "loginForm": True})
+
+    with patch("src.tools.login.wait_for_any", AsyncMock(return_value=MagicMock())) as probe:
+        assert await _check_for_captcha(page) is True
+
+    assert probe.await_args.kwargs["timeout"] == CAPTCHA_LATE_CHECK_TIMEOUT
+
+
+async def test_has_session_cookie_requires_unexpired_customer_cookie():
+    """Test only a customer session cookie with time left counts as logged in."""
+    page = MagicMock()
+    page.context.cookies = AsyncMock(return_value=[
+        {"name": "_secure_session_id", "expires": time.time() + 3600},
+        {"name": "_secure_customer_sig", "expires": time.time() + 5},
+        {"name": "_secure_customer_sig", "expires": -1},  # Possibly restored and revoked
+    ])
+    assert await _has_session_cookie(page) is False
+
+    page.context.cookies.return_value.append({"name": "_secure_customer_sig", "expires": time.time() + 3600})
+    assert await _has_session_cookie(page) is True
+
+
+async def test_check_for_login_error_only_reports_new_errors():
+    """Test the error check returns the new message, and None when nothing new appears."""
+    page = MagicMock()
+    handle = MagicMock()
+    handle.json_value = AsyncMock(return_value="Incorrect email or password.")
+    page.wait_for_function = AsyncMock(return_value=handle)
+    assert await _check_for_login_error(page) == "Incorrect email or password."
+
+    page.wait_for_function = AsyncMock(side_effect=PlaywrightTimeout("Timeout 500ms exceeded"))
+    assert await _check_for_login_error(page) is None
@@ -0,0 +1,74 @@
+"""Unit tests for SecretManager caching."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core import secrets
+from src.core.secrets import SecretManager
+
+
+@pytest.fixture
+def manager():
+    """SecretManager with a fake GCP client."""
+    manager = SecretManager()
+    manager._project_id = "test-project"
+    manager._name_fmt = "projects/test-project/secrets/{}/versions/latest"
+    manager.client = MagicMock()
+    manager.client.access_secret_version.return_value.payload.data = b"4111111111111111"
+    return manager
+
+
+def test_gcp_secret_is_cached(manager):
+    """Test repeated lookups are served from memory."""
+    assert manager.get_secret("cc_number") == "4111111111111111"
+    assert manager.get_secret("cc_number") == "4111111111111111"
+
+    manager.client.access_secret_version.assert_called_once()
+
+
+def test_cached_secret_expires(manager, monkeypatch):
+    """Test values are fetched again once the TTL has passed."""
+    monkeypatch.setattr(secrets, "SECRET_CACHE_TTL_SECONDS", -1)
+
+    manager.get_secret("cc_number")
+    manager.get_secret("cc_number")
+
+    assert manager.client.access_secret_version.call_count == 2
+
+
+def test_clear_cache_forces_refetch(manager):
+    """Test clear_cache drops cached values."""
+    manager.get_secret("cc_number")
+    manager.clear_cache()
+    manager.get_secret("cc_number")
+
+    assert manager.client.access_secret_version.call_count == 2
+
+
+def test_failed_lookup_is_not_cached(manager):
+    """Test a GCP failure falls back to local settings without caching."""
+    manager.client.access_secret_version.side_effect = RuntimeError("unavailable")
+    manager._local_attrs["cc_cvv"] = "123"
+
+    assert manager.get_secret("cc_cvv") == "123"
+    assert "cc_cvv" not in manager._cache
+
+
+def test_get_secrets_fetches_each_secret_once(manager):
+    """Test batch lookups return every value and reuse the cache."""
+    manager.get_secret("cc_cvv")
+
+    values = manager.get_secrets(["cc_number", "cc_cvv", "cc_name"])
+
+    assert values == {name: "4111111111111111" for name in ("cc_number", "cc_cvv", "cc_name")}
+    assert manager.client.access_secret_version.call_count == 3
+
+
+def test_prefetch_warms_cache_and_swallows_errors(manager):
+    """Test prefetch caches values and never raises for a missing secret."""
+    manager.prefetch(["cc_number", "cc_cvv"])
+    assert {"cc_number", "cc_cvv"} <= set(manager._cache)
+
+    manager.client.access_secret_version.side_effect = Exception("not found")
+    manager.prefetch(["not_a_real_secret"])
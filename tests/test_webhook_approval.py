@@ -2,8 +2,10 @@
 import pytest
 from fastapi.testclient import TestClient
 
+from src.app import webhook
 from src.app.main import app
 from src.core.approval import (
+    approve_request,
     create_approval_request,
     get_approval_status,
     _pending_approvals,
@@ -144,6 +146,41 @@ class TestApprovalEndpoints:
         assert response.status_code == 404
 
 
+class TestWaitEndpoint:
+    """Tests for the long-poll approval wait endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def reset_rate_limit(self):
+        """Start each test with an empty rate limit window."""
+        with webhook._rate_limit_lock:
+            webhook._rate_limit_store.clear()
+
+    def test_wait_returns_decision(self, client):
+        """Test the wait endpoint returns the decision once recorded."""
+        create_approval_request("test-wait-1", {"total": "$40"})
+        approve_request("test-wait-1")
+
+        response = client.get("/approval/test-wait-1/wait")
+
+        assert response.status_code == 200
+        assert response.json()["decision"] == "approved"
+
+    def test_wait_returns_204_while_pending(self, client, monkeypatch):
+        """Test a still-pending request returns 204 after the server-side timeout."""
+        monkeypatch.setattr(webhook, "APPROVAL_WAIT_TIMEOUT_SECONDS", 0.05)
+        create_approval_request("test-wait-2", {"total": "$40"})
+
+        response = client.get("/approval/test-wait-2/wait")
+
+        assert response.status_code == 204
+
+    def test_wait_nonexistent(self, client):
+        """Test the wait endpoint for a non-existent request."""
+        response = client.get("/approval/nonexistent-id/wait")
+
+        assert response.status_code == 404
+
+
 @pytest.mark.rate_limit
 class TestRateLimiting:
     """Tests for rate limiting on approval endpoints."""